@@ -5,6 +5,7 @@ def prep_args():
     parcer = argparse.ArgumentParser(description="Allied Camera homebrew application")
     parcer.add_argument('--id')
     parcer.add_argument('--zmq')
+    parcer.add_argument('--fps', type=float, help="target frame rate (Hz), <=0 - maximum rate of the camera")
 
     return parcer.parse_args()
 
@@ -47,7 +48,8 @@ def test_params(params):
         msg = msg + """
 Typical examples:
  --id DEV_000F314C6B39 - DEV_+12 alpha-numerical characters
- --zmq tcp://*:5555 - protocol name, IP address and port values"""
+ --zmq tcp://*:5555 - protocol name, IP address and port values
+ --fps 2.5 - optional target frame rate, overrides the configuration file"""
         QtWidgets.QMessageBox.critical(None, "Error with starting parameters", msg)
         print(msg)
 
@@ -22,6 +22,94 @@ CAMERA_INTERFACE = "CAMERA_INTERFACE"
 CAMERA_CURRENTIP = "GevCurrentIPAddress"
 CAMERA_CAPTURE_ALLOWED = "CAMERA_CAPTURE_ALLOWED"
 CAMERA_PIXELFORMAT = "PixelFormat"
+CAMERA_FRAMES_DROPPED = "FramesDropped"
+CAMERA_FRAMES_MEMORY = "FramesMemory"
+CAMERA_FRAMES_ACQUIRED = "FramesAcquired"
+CAMERA_FRAMES_DISPLAYED = "FramesDisplayed"
+CAMERA_FRAMES_SUPERSEDED = "FramesSuperseded"
+CAMERA_COMMAND_LATENCY = "CommandLatency"
+CAMERA_FRAME_RATE = "FrameRate"
+CAMERA_BURST = "Burst"
+CAMERA_PIPELINE = "Pipeline"
+CAMERA_CORRECTION = "Correction"
+CAMERA_REFERENCE_DARK = "ReferenceDark"
+CAMERA_REFERENCE_FLAT = "ReferenceFlat"
+CAMERA_REFERENCE_CLEAR = "ReferenceClear"
+
+STAGE_DARK_FLAT = "dark_flat"
+STAGE_AVERAGE = "average"
+
+CAMERA_AVERAGE = "Average"
+CAMERA_AVERAGE_LENGTH = "AverageLength"
+CAMERA_AVERAGE_ALPHA = "AverageAlpha"
+
+STAGE_SPOT = "spot"
+
+CAMERA_SPOT = "Spot"
+CAMERA_SPOT_THRESHOLD = "SpotThreshold"
+CAMERA_SPOT_ROI = "SpotRoi"
+CAMERA_SPOT_GAUSSIAN = "SpotGaussian"
+CAMERA_SPOT_EVERY = "SpotEvery"
+
+STAGE_HOLE = "hole"
+
+CAMERA_HOLE = "Hole"
+CAMERA_HOLE_LEVELS = "HoleLevels"
+
+CAMERA_PIXEL_BITS = "PixelBits"
+CAMERA_DISPLAY = "Display"
+CAMERA_DISPLAY_WINDOW = "DisplayWindow"
+CAMERA_DISPLAY_GAMMA = "DisplayGamma"
+CAMERA_DISPLAY_RATE = "DisplayRate"
+
+CAMERA_ROI = "Roi"
+CAMERA_BINNING = "Binning"
+CAMERA_OFFSETX = "OffsetX"
+CAMERA_OFFSETY = "OffsetY"
+CAMERA_ROI_WIDTH = "Width"
+CAMERA_ROI_HEIGHT = "Height"
+CAMERA_WIDTHMAX = "WidthMax"
+CAMERA_HEIGHTMAX = "HeightMax"
+CAMERA_BINNING_HORIZONTAL = "BinningHorizontal"
+CAMERA_BINNING_VERTICAL = "BinningVertical"
+
+STAGE_FOCUS = "focus"
+
+CAMERA_FOCUS = "Focus"
+CAMERA_FOCUS_ROI = "FocusRoi"
+CAMERA_AUTOFOCUS = "Autofocus"
+
+CAMERA_PAINT_TIME = "PaintTime"
+CAMERA_FRAME_META = "FrameMeta"
+CAMERA_ACQ_FRAMERATEABS = "AcquisitionFrameRateAbs"
+CAMERA_ACQ_FRAMERATE = "AcquisitionFrameRate"
+CAMERA_ACQ_FRAMERATE_ENABLE = "AcquisitionFrameRateEnable"
 
 FRAME_REFERENCE = "FRAME_REFERENCE"
-MARKER_REFERENCE = "MARKER_REFERENCE"
\ No newline at end of file
+MARKER_REFERENCE = "MARKER_REFERENCE"
+
+ACQUISITION_STREAM = "stream"
+ACQUISITION_SINGLE = "single"
+ACQUISITION_ASYNC = "async"
+ACQUISITION_MODES = (ACQUISITION_STREAM, ACQUISITION_SINGLE, ACQUISITION_ASYNC)
+
+AVERAGE_OFF = "off"
+AVERAGE_BOXCAR = "boxcar"
+AVERAGE_EMA = "ema"
+AVERAGE_MODES = (AVERAGE_OFF, AVERAGE_BOXCAR, AVERAGE_EMA)
+
+FOCUS_OFF = "off"
+FOCUS_LAPLACIAN = "laplacian"
+FOCUS_TENENGRAD = "tenengrad"
+FOCUS_BRENNER = "brenner"
+FOCUS_METHODS = (FOCUS_OFF, FOCUS_LAPLACIAN, FOCUS_TENENGRAD, FOCUS_BRENNER)
+
+# channel order of color frames - OpenCV and the camera deliver BGR, Qt < 5.14 displays only RGB
+COLOR_ORDER_BGR = "bgr"
+COLOR_ORDER_RGB = "rgb"
+
+# display clock (Hz), 0 - every acquired frame is displayed
+DISPLAY_RATES = (0, 15, 30, 60)
+
+PAINT_FAST = "fast"
+PAINT_SMOOTH = "smooth"
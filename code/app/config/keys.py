@@ -47,4 +47,42 @@ FRAME_COLORINDEX = "FRAME_COLORINDEX"
 MARKER_DISPLAY = "MARKER_DISPLAY"
 FRAME_DISPLAY = "FRAME_DISPLAY"
 CAMERA_NICKNAME = "CAMERA_NICKNAME"
-CAMERA_DIRNAME = "CAMERA_DIRNAME"
\ No newline at end of file
+CAMERA_DIRNAME = "CAMERA_DIRNAME"
+
+# configuration Acquisition
+ACQUISITION_MODE = "ACQUISITION_MODE"
+FRAMEQUEUE_SIZE = "FRAMEQUEUE_SIZE"
+FRAMEQUEUE_POLICY = "FRAMEQUEUE_POLICY"
+FRAMEPOOL_SIZE = "FRAMEPOOL_SIZE"
+FRAME_RATE = "FRAME_RATE"
+BURST_SIZE = "BURST_SIZE"
+DEMOSAIC_PREVIEW = "DEMOSAIC_PREVIEW"
+DEMOSAIC_SNAPSHOT = "DEMOSAIC_SNAPSHOT"
+DEMOSAIC_BANDS = "DEMOSAIC_BANDS"
+PIPELINE = "PIPELINE"
+AVERAGE_MODE = "AVERAGE_MODE"
+AVERAGE_LENGTH = "AVERAGE_LENGTH"
+AVERAGE_ALPHA = "AVERAGE_ALPHA"
+SPOT_DETECTION = "SPOT_DETECTION"
+SPOT_THRESHOLD = "SPOT_THRESHOLD"
+SPOT_ROI = "SPOT_ROI"
+SPOT_GAUSSIAN = "SPOT_GAUSSIAN"
+SPOT_EVERY = "SPOT_EVERY"
+HOLE_DETECTION = "HOLE_DETECTION"
+HOLE_LEVELS = "HOLE_LEVELS"
+MONO_BITS = "MONO_BITS"
+DISPLAY_WINDOW = "DISPLAY_WINDOW"
+DISPLAY_GAMMA = "DISPLAY_GAMMA"
+ROI_ACQUISITION = "ROI_ACQUISITION"
+ROI_RECT = "ROI_RECT"
+ROI_BINNING = "ROI_BINNING"
+FOCUS_METHOD = "FOCUS_METHOD"
+AUTOFOCUS_RANGE = "AUTOFOCUS_RANGE"
+AUTOFOCUS_TOLERANCE = "AUTOFOCUS_TOLERANCE"
+AUTOFOCUS_FRAMES = "AUTOFOCUS_FRAMES"
+AUTOFOCUS_SKIP = "AUTOFOCUS_SKIP"
+OPENGL_VIEWPORT = "OPENGL_VIEWPORT"
+ADAPTIVE_RENDER = "ADAPTIVE_RENDER"
+DISPLAY_RATE = "DISPLAY_RATE"
+LATENCY_STATS = "LATENCY_STATS"
+LATENCY_OVERLAY = "LATENCY_OVERLAY"
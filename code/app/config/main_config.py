@@ -85,7 +85,43 @@ class Config(object):
             MARKER_DISPLAY: "0",
             FRAME_DISPLAY: "1",
             CAMERA_NICKNAME: "Nickname",
-            CAMERA_DIRNAME: "None"
+            CAMERA_DIRNAME: "None",
+            ACQUISITION_MODE: '"{}"'.format(ACQUISITION_STREAM),
+            FRAMEQUEUE_SIZE: "2",
+            FRAMEQUEUE_POLICY: '"drop_oldest"',
+            FRAMEPOOL_SIZE: "6",
+            FRAME_RATE: "10.0",
+            BURST_SIZE: "100",
+            DEMOSAIC_PREVIEW: '"bilinear"',
+            DEMOSAIC_SNAPSHOT: '"vng"',
+            DEMOSAIC_BANDS: "0",
+            PIPELINE: "[]",
+            AVERAGE_MODE: '"{}"'.format(AVERAGE_OFF),
+            AVERAGE_LENGTH: "8",
+            AVERAGE_ALPHA: "0.2",
+            SPOT_DETECTION: "0",
+            SPOT_THRESHOLD: "0.5",
+            SPOT_ROI: "null",
+            SPOT_GAUSSIAN: "0",
+            SPOT_EVERY: "1",
+            HOLE_DETECTION: "0",
+            HOLE_LEVELS: "2",
+            MONO_BITS: "8",
+            DISPLAY_WINDOW: "null",
+            DISPLAY_GAMMA: "1.0",
+            ROI_ACQUISITION: "0",
+            ROI_RECT: "null",
+            ROI_BINNING: "1",
+            FOCUS_METHOD: '"{}"'.format(FOCUS_OFF),
+            AUTOFOCUS_RANGE: "0.2",
+            AUTOFOCUS_TOLERANCE: "0.005",
+            AUTOFOCUS_FRAMES: "2",
+            AUTOFOCUS_SKIP: "1",
+            OPENGL_VIEWPORT: "0",
+            ADAPTIVE_RENDER: "1",
+            DISPLAY_RATE: "0",
+            LATENCY_STATS: "0",
+            LATENCY_OVERLAY: "0",
         }
 
         bwrite = False
@@ -224,6 +260,62 @@ class Config(object):
         """
         self.setcfValue(FRAME_DISPLAY, v)
 
+    def setcfAverageMode(self, v):
+        """
+        Sets config value for the temporal averaging mode
+        :param v:
+        :return:
+        """
+        self.setcfValue(AVERAGE_MODE, v)
+
+    def setcfSpotDetection(self, v):
+        """
+        Sets config value for the spot detection on/off
+        :param v:
+        :return:
+        """
+        self.setcfValue(SPOT_DETECTION, v)
+
+    def setcfHoleDetection(self, v):
+        """
+        Sets config value for the gasket hole detection on/off
+        :param v:
+        :return:
+        """
+        self.setcfValue(HOLE_DETECTION, v)
+
+    def setcfRoiAcquisition(self, v):
+        """
+        Sets config value for the acquisition of the marker region only on/off
+        :param v:
+        :return:
+        """
+        self.setcfValue(ROI_ACQUISITION, v)
+
+    def setcfRoiRect(self, v):
+        """
+        Sets config value for the acquired region - [x, y, width, height] in sensor pixels
+        :param v:
+        :return:
+        """
+        self.setcfValue(ROI_RECT, v)
+
+    def setcfFocusMethod(self, v):
+        """
+        Sets config value for the focus metric - off, laplacian, tenengrad, brenner
+        :param v:
+        :return:
+        """
+        self.setcfValue(FOCUS_METHOD, v)
+
+    def setcfDisplayRate(self, v):
+        """
+        Sets config value for the display clock (Hz), 0 - every acquired frame is displayed
+        :param v:
+        :return:
+        """
+        self.setcfValue(DISPLAY_RATE, v)
+
     def setcfCameraDirname(self, v):
         """
         Sets config value for frame display on/off
@@ -305,6 +397,296 @@ class Config(object):
         """
         return self.getcfValue(CAMERA_DIRNAME)
 
+    def getcfAcquisitionMode(self):
+        """
+        Returns acquisition mode - continuous stream or frame by frame
+        :return:
+        """
+        res = self.getcfValue(ACQUISITION_MODE)
+        if res not in ACQUISITION_MODES:
+            res = ACQUISITION_STREAM
+        return res
+
+    def getcfFrameQueueSize(self):
+        """
+        Returns maximum number of frames waiting between the camera callback and the consumer
+        :return:
+        """
+        return self.getcfValue(FRAMEQUEUE_SIZE)
+
+    def getcfFrameQueuePolicy(self):
+        """
+        Returns policy of the frame queue on overflow - drop_oldest or drop_newest
+        :return:
+        """
+        return self.getcfValue(FRAMEQUEUE_POLICY)
+
+    def getcfFramePoolSize(self):
+        """
+        Returns number of preallocated frame buffers
+        :return:
+        """
+        return self.getcfValue(FRAMEPOOL_SIZE)
+
+    def getcfFrameRate(self):
+        """
+        Returns target frame rate (Hz), <=0 - maximum rate of the camera
+        A value passed on the command line overrides the configuration file
+        :return:
+        """
+        try:
+            res = self.getConfiguration(FRAME_RATE)
+        except KeyError:
+            res = None
+
+        if res is None:
+            res = self.getcfValue(FRAME_RATE)
+        return res
+
+    def getcfBurstSize(self):
+        """
+        Returns number of frames captured by a burst triggered from the toolbar
+        :return:
+        """
+        return self.getcfValue(BURST_SIZE)
+
+    def getcfDemosaicPreview(self):
+        """
+        Returns demosaicing of the displayed bayer frames - nearest, bilinear, vng, ea, superpixel
+        :return:
+        """
+        return self.getcfValue(DEMOSAIC_PREVIEW)
+
+    def getcfDemosaicSnapshot(self):
+        """
+        Returns demosaicing of the saved bayer frames - nearest, bilinear, vng, ea, superpixel
+        :return:
+        """
+        return self.getcfValue(DEMOSAIC_SNAPSHOT)
+
+    def getcfDemosaicBands(self):
+        """
+        Returns number of row bands demosaiced in parallel, <=0 - number of cpu cores
+        :return:
+        """
+        return self.getcfValue(DEMOSAIC_BANDS)
+
+    def getcfPipeline(self):
+        """
+        Returns processing stages between acquisition and display - names or [name, {parameters}] pairs
+        :return:
+        """
+        res = self.getcfValue(PIPELINE)
+        if not isinstance(res, list):
+            res = []
+        return res
+
+    def getcfAverageMode(self):
+        """
+        Returns temporal averaging mode - off, boxcar, ema
+        :return:
+        """
+        res = self.getcfValue(AVERAGE_MODE)
+        if res not in AVERAGE_MODES:
+            res = AVERAGE_OFF
+        return res
+
+    def getcfAverageLength(self):
+        """
+        Returns number of frames of the boxcar average
+        :return:
+        """
+        return self.getcfValue(AVERAGE_LENGTH)
+
+    def getcfAverageAlpha(self):
+        """
+        Returns weight of the last frame of the exponential moving average
+        :return:
+        """
+        return self.getcfValue(AVERAGE_ALPHA)
+
+    def getcfSpotDetection(self):
+        """
+        Returns state of the laser spot detection
+        :return:
+        """
+        return self.getcfValue(SPOT_DETECTION)
+
+    def getcfSpotThreshold(self):
+        """
+        Returns threshold of the spot detection - fraction of the peak above the background
+        :return:
+        """
+        return self.getcfValue(SPOT_THRESHOLD)
+
+    def getcfSpotRoi(self):
+        """
+        Returns region of interest of the spot detection - [x, y, width, height] in frame pixels, None - full frame
+        :return:
+        """
+        res = self.getcfValue(SPOT_ROI)
+        if not isinstance(res, list) or len(res) != 4:
+            res = None
+        return res
+
+    def getcfSpotGaussian(self):
+        """
+        Returns state of the gaussian refinement of the spot position
+        :return:
+        """
+        return self.getcfValue(SPOT_GAUSSIAN)
+
+    def getcfSpotEvery(self):
+        """
+        Returns minimum frame step between frames analysed by the spot detection
+        :return:
+        """
+        return self.getcfValue(SPOT_EVERY)
+
+    def getcfHoleDetection(self):
+        """
+        Returns state of the gasket hole detection
+        :return:
+        """
+        return self.getcfValue(HOLE_DETECTION)
+
+    def getcfHoleLevels(self):
+        """
+        Returns pyramid level of the gasket hole detection - every level halves the frame size
+        :return:
+        """
+        return self.getcfValue(HOLE_LEVELS)
+
+    def getcfMonoBits(self):
+        """
+        Returns maximum bit depth of mono pixel formats - 8, 10, 12, 14, 16
+        :return:
+        """
+        res = self.getcfValue(MONO_BITS)
+        if not isinstance(res, int):
+            res = 8
+        return res
+
+    def getcfDisplayWindow(self):
+        """
+        Returns [black, white] display levels of high bit depth frames, None - full range of the bit depth
+        :return:
+        """
+        res = self.getcfValue(DISPLAY_WINDOW)
+        if not isinstance(res, list) or len(res) != 2:
+            res = None
+        return res
+
+    def getcfDisplayGamma(self):
+        """
+        Returns display gamma of high bit depth frames
+        :return:
+        """
+        return self.getcfValue(DISPLAY_GAMMA)
+
+    def getcfRoiAcquisition(self):
+        """
+        Returns state of the acquisition of the marker region only
+        :return:
+        """
+        return self.getcfValue(ROI_ACQUISITION)
+
+    def getcfRoiRect(self):
+        """
+        Returns the acquired region - [x, y, width, height] in sensor pixels, None - not set
+        :return:
+        """
+        res = self.getcfValue(ROI_RECT)
+        if not isinstance(res, list) or len(res) != 4:
+            res = None
+        return res
+
+    def getcfRoiBinning(self):
+        """
+        Returns binning applied together with the acquired region
+        :return:
+        """
+        res = self.getcfValue(ROI_BINNING)
+        if not isinstance(res, int) or res < 1:
+            res = 1
+        return res
+
+    def getcfFocusMethod(self):
+        """
+        Returns the focus metric - off, laplacian, tenengrad, brenner
+        :return:
+        """
+        res = self.getcfValue(FOCUS_METHOD)
+        if res not in FOCUS_METHODS:
+            res = FOCUS_OFF
+        return res
+
+    def getcfAutofocusRange(self):
+        """
+        Returns range of the autofocus scan centered on the current position - units of the plugin Z move
+        :return:
+        """
+        return self.getcfValue(AUTOFOCUS_RANGE)
+
+    def getcfAutofocusTolerance(self):
+        """
+        Returns final interval of the autofocus scan - units of the plugin Z move
+        :return:
+        """
+        return self.getcfValue(AUTOFOCUS_TOLERANCE)
+
+    def getcfAutofocusFrames(self):
+        """
+        Returns number of focus metric values averaged per autofocus step
+        :return:
+        """
+        return self.getcfValue(AUTOFOCUS_FRAMES)
+
+    def getcfAutofocusSkip(self):
+        """
+        Returns number of focus metric values discarded after a move - frames exposed while moving
+        :return:
+        """
+        return self.getcfValue(AUTOFOCUS_SKIP)
+
+    def getcfOpenGLViewport(self):
+        """
+        Returns state of the OpenGL viewport of the image view
+        :return:
+        """
+        return self.getcfValue(OPENGL_VIEWPORT)
+
+    def getcfAdaptiveRender(self):
+        """
+        Returns state of the adaptive render quality - fast while streaming, smooth once the view settles
+        :return:
+        """
+        return self.getcfValue(ADAPTIVE_RENDER)
+
+    def getcfDisplayRate(self):
+        """
+        Returns rate of the display clock (Hz), 0 - every acquired frame is displayed
+        :return:
+        """
+        res = self.getcfValue(DISPLAY_RATE)
+        if not isinstance(res, int) or res < 0:
+            res = 0
+        return res
+
+    def getcfLatencyStats(self):
+        """
+        Returns state of the latency statistics of the displayed frames
+        :return:
+        """
+        return self.getcfValue(LATENCY_STATS)
+
+    def getcfLatencyOverlay(self):
+        """
+        Returns state of the on-screen overlay of the latency statistics - enables the statistics
+        :return:
+        """
+        return self.getcfValue(LATENCY_OVERLAY)
+
     def setConfiguration(self, key, value):
         global CONFIG_STORAGE
 
@@ -352,6 +734,9 @@ class Config(object):
         with self.camera_pixelformat_lock:
             self.setConfiguration(CAMERA_PIXELFORMAT, v)
 
+    def setFrameRate(self, v):
+        self.setConfiguration(FRAME_RATE, v)
+
     def setPlugins(self, v):
         self.setConfiguration(MOVEPLUGINS, v)
 
@@ -8,8 +8,14 @@ from app.worker.zmq_worker import *
 from app.gui.gui_colors import *
 from app.gui.marker import *
 from app.gui.gui_gain_exposure import *
+from app.gui.gui_frame_item import *
 from app.worker.file_saver import *
 from app.worker.plugin_executor import *
+from app.worker.autofocus import *
+from app.worker.frame_queue import FrameMailbox
+from app.worker.latency_stats import LatencyStats
+from app.worker.command_engine import CommandQueue
+from app.worker.demosaic import BayerDemosaic
 
 from app.worker.allied_camera import ThreadCameraAllied
 from app.worker.allied_camera_test import ThreadCameraAlliedTest
@@ -21,11 +27,15 @@ class CtrlMainWindow(QtCore.QObject, Tester, MarkerMenuPlugin):
     """
     Controller responsible for the main window
     """
-    signnewframe = QtCore.Signal(object)
+    signnewframe = QtCore.Signal()
     signcamerafeatures = QtCore.Signal(object)
     signstopacq = QtCore.Signal()
     signstatusmsg = QtCore.Signal(object)
     signcamerastate = QtCore.Signal(object)
+    signframestats = QtCore.Signal(object)
+    signburst = QtCore.Signal(object)
+    signhole = QtCore.Signal(object)
+    signfocus = QtCore.Signal(object)
 
     QUEUE_STOP_MSG = QUEUE_STOP_MSG
 
@@ -35,6 +45,10 @@ class CtrlMainWindow(QtCore.QObject, Tester, MarkerMenuPlugin):
 
     PENCOLOR_MARKER = QtGui.QColor(244, 0, 87)
 
+    PENCOLOR_SPOT = QtGui.QColor(0, 200, 255)
+    PENWIDTH_SPOT = 2
+    SIZE_SPOT_CROSS = 10    # half size of the spot cross in screen pixels
+
     EXPOSURE_CONVERSION = 1000.
 
     CSS_APP = "app.css"
@@ -48,6 +62,11 @@ class CtrlMainWindow(QtCore.QObject, Tester, MarkerMenuPlugin):
 
     THREADPOOL_MAXNUM = 5
 
+    RENDER_SETTLE = 500     # ms without frames or zoom after which the view is repainted smoothly
+    PAINT_WEIGHT = 0.1      # weight of the last repaint in the mean paint time
+
+    LATENCY_OVERLAY_MARGIN = 4
+
     def __init__(self, id, zmq, parent=None):
         QtCore.QObject.__init__(self, parent=parent)
         Tester.__init__(self, def_file="{}".format(self.__class__.__name__.lower()))
@@ -72,8 +91,8 @@ class CtrlMainWindow(QtCore.QObject, Tester, MarkerMenuPlugin):
         self.qstop = queue.Queue()
         self.qstop_poll = queue.Queue()
 
-        # queue to pass commands
-        self.queue_cmd = queue.Queue()
+        # queue to pass commands - commands are stamped on enqueueing to measure their latency
+        self.queue_cmd = CommandQueue()
 
         # need a thread to control start and stop of the camera + cleanup
         self.thread = None
@@ -81,11 +100,32 @@ class CtrlMainWindow(QtCore.QObject, Tester, MarkerMenuPlugin):
 
         self.registerSignalNewFrame()
         self.registerCameraFeatures()
+        self.signburst.connect(self.processBurstDone)
+        self.signhole.connect(self.processHole)
+
+        # last captured burst of frames - FrameBurst()
+        self.burst = None
 
         # image reference
         self.image = None
         self.image_lock = threading.Lock()
 
+        # frame buffer backing the displayed image - owned by the controller until the next frame is displayed
+        self.frame_buffer = None
+
+        # latest frame waiting for display - older undisplayed frames are superseded
+        self.mailbox = FrameMailbox()
+
+        # display clock - the newest frame in the mailbox is rendered on every tick, GUI load does not follow the camera
+        # rate 0 - every frame posted into an empty mailbox is rendered
+        self.display_rate = 0
+        self.display_timer = QtCore.QTimer(self)
+        self.display_timer.setTimerType(QtCore.Qt.PreciseTimer)
+        self.display_timer.timeout.connect(self.processFrame)
+
+        # demosaicing of bayer snapshots - created on the first snapshot
+        self.demosaic = None
+
         # lock
         self.lock = threading.Lock()
 
@@ -95,9 +135,37 @@ class CtrlMainWindow(QtCore.QObject, Tester, MarkerMenuPlugin):
         self.cam_gain = None
         self.cam_gain_lock = threading.Lock()
 
-        # view pixmap
+        # view pixmap - shows the visible region of the frame, positioned in frame pixels shifted by the offset
         self.pxmap = None
         self.bkgoffset = [0, 0]
+        self.frame_size = (0, 0)
+
+        # OpenGL viewport - frames are uploaded into a texture instead of being converted to pixmaps
+        self.bopengl = isinstance(self.view.viewport(), QtWidgets.QOpenGLWidget)
+
+        # channel order of color frames - the order of the camera and OpenCV if Qt displays it (5.14+)
+        # frames are converted into it once by the acquisition thread and wrapped without a copy
+        self.color_order = COLOR_ORDER_BGR if hasattr(QtGui.QImage, "Format_BGR888") else COLOR_ORDER_RGB
+        self.color_format = QtGui.QImage.Format_BGR888 if self.color_order == COLOR_ORDER_BGR else QtGui.QImage.Format_RGB888
+
+        # render quality - fast transforms while frames arrive or the view zooms, smooth once it settles
+        self.bsmooth = None
+        self.render_timer = QtCore.QTimer(self)
+        self.render_timer.setSingleShot(True)
+        self.render_timer.timeout.connect(self.processRenderSettled)
+
+        # mean paint time (ms) and number of repaints of the view per render quality
+        self.paint_stats = {PAINT_FAST: [0., 0], PAINT_SMOOTH: [0., 0]}
+        self.view.paintEvent = self.viewPaintEvent
+
+        # latency of the displayed frames per stage - None if disabled, frames are then stamped by the camera thread only
+        # a frame set into the scene is recorded by the next paint, the overlay shows the statistics in the view
+        self.latency = None
+        self.latency_pending = False
+        self.latency_overlay = bool(self.config.getcfLatencyOverlay())
+        self.latency_text = []
+        if self.latency_overlay or self.config.getcfLatencyStats():
+            self.latency = LatencyStats()
 
         # frame rect object
         self.framerectgroup = None
@@ -108,9 +176,19 @@ class CtrlMainWindow(QtCore.QObject, Tester, MarkerMenuPlugin):
         # marker object
         self.marker = None
 
+        # overlay of the detected laser spot - child of the image, positioned in frame pixels
+        self.spotgroup = None
+        self.spotellipse = None
+        self.spot_shown = None
+
         # image scale variable used for rescaling
         self.image_scale = 1.
 
+        # sensor pixels per frame pixel (binning) and the acquired region of the last frame
+        # the scene keeps sensor coordinates - the frame cross and the plugin moves do not depend on the region
+        self.pixel_scale = (1., 1.)
+        self.frame_roi = None
+
         # internal storage for values reported by a camera
         self.cam_values = {
             CAMERA_EXPOSUREMERGED: 0.,
@@ -126,9 +204,32 @@ class CtrlMainWindow(QtCore.QObject, Tester, MarkerMenuPlugin):
             CAMERA_INTERFACE: "",
             CAMERA_IP: "",
             CAMERA_CAPTURE_ALLOWED: False,
+            CAMERA_FRAMES_DROPPED: 0,
+            CAMERA_FRAMES_MEMORY: 0,
+            CAMERA_FRAMES_ACQUIRED: 0,
+            CAMERA_FRAMES_DISPLAYED: 0,
+            CAMERA_FRAMES_SUPERSEDED: 0,
+            CAMERA_COMMAND_LATENCY: {},
+            CAMERA_FRAME_RATE: 0.,
+            CAMERA_BURST: {},
+            CAMERA_PIPELINE: {},
+            CAMERA_CORRECTION: {},
+            CAMERA_AVERAGE: {},
+            CAMERA_SPOT: {},
+            CAMERA_HOLE: {},
+            CAMERA_PIXEL_BITS: 8,
+            CAMERA_DISPLAY: {},
+            CAMERA_ROI: None,
+            CAMERA_FOCUS: {},
+            CAMERA_AUTOFOCUS: {},
+            CAMERA_PAINT_TIME: {},
+            CAMERA_DISPLAY_RATE: 0,
+            CAMERA_FRAME_META: {},
         }
         self.cam_values_lock = threading.Lock()
 
+        self.setDisplayRate(self.config.getcfDisplayRate())
+
         # zmq control
         self.zmqserver = ZMQserver(self.zmq, qmsg=self.queue_cmd, ctrl=self)
         self.zmqserver.startZMQ()
@@ -142,6 +243,8 @@ class CtrlMainWindow(QtCore.QObject, Tester, MarkerMenuPlugin):
         self.makeFrameObject()
         # prepares a marker object
         self.makeMarkerObject()
+        # prepares an overlay of the detected spot
+        self.makeSpotObject()
 
         self.getStyleSheet()
 
@@ -159,6 +262,10 @@ class CtrlMainWindow(QtCore.QObject, Tester, MarkerMenuPlugin):
         self.frame_marker_reference = None
         self.plugin_index = None
 
+        # marker region of the focus metric passed to the camera thread, running autofocus scan
+        self.focus_roi = None
+        self.autofocus = None
+
     def recordCameraGainExposure(self, gain=None, exposure=None):
         """
         Records camera gain or exposure using a threading lock for internal use
@@ -273,7 +380,7 @@ class CtrlMainWindow(QtCore.QObject, Tester, MarkerMenuPlugin):
         self.marker = MarkerItem(feedback=self, dx=dx, dy=dy, penwidth=pw, width=w, height=h, shape=shape)
 
         scene.addItem(self.marker)
-        view.setRenderHints(QtGui.QPainter.Antialiasing | QtGui.QPainter.SmoothPixmapTransform)
+        self.setRenderQuality(True)
 
         view.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
         view.setVerticalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
@@ -287,7 +394,7 @@ class CtrlMainWindow(QtCore.QObject, Tester, MarkerMenuPlugin):
         scene = self.scene
 
         if self.pxmap is not None:
-            br = self.pxmap.boundingRect()
+            br = self.getFrameRect()
 
             if self.framerectgroup is None:
                 self.framerectgroup = QtWidgets.QGraphicsItemGroup()
@@ -295,6 +402,7 @@ class CtrlMainWindow(QtCore.QObject, Tester, MarkerMenuPlugin):
 
                 pen = self.framerect_pen = QtGui.QPen(self.PENCOLOR_FRAME)
                 pen.setWidth(self.PENWIDTH_FRAME)
+                pen.setCosmetic(True)
 
                 # cursor remains in the center, offset only changes
                 cs_left = QtWidgets.QGraphicsLineItem(-15, 0, -5, 0)
@@ -311,9 +419,35 @@ class CtrlMainWindow(QtCore.QObject, Tester, MarkerMenuPlugin):
 
                 scene.addItem(self.framerectgroup)
             else:
-                br = QtCore.QRectF(br.x()*self.image_scale, br.y()*self.image_scale,
-                                   br.width()*self.image_scale, br.height()*self.image_scale)
-                self.framerect.setRect(br)
+                self.framerect.setRect(self.pxmap.mapRectToScene(br))
+
+    def makeSpotObject(self):
+        """
+        Makes an overlay of the detected spot - a cross at the centroid, an ellipse of the FWHM
+        :return:
+        """
+        if self.spotgroup is None:
+            pen = QtGui.QPen(self.PENCOLOR_SPOT)
+            pen.setWidth(self.PENWIDTH_SPOT)
+            pen.setCosmetic(True)
+
+            # the group follows the image transformation - ellipse in frame pixels
+            self.spotgroup = QtWidgets.QGraphicsItemGroup(parent=self.pxmap)
+
+            self.spotellipse = QtWidgets.QGraphicsEllipseItem(0, 0, 1, 1)
+            self.spotellipse.setPen(pen)
+            self.spotgroup.addToGroup(self.spotellipse)
+
+            # the cross keeps its size on the screen
+            cross = QtWidgets.QGraphicsItemGroup()
+            cross.setFlag(QtWidgets.QGraphicsItem.ItemIgnoresTransformations, True)
+            s = self.SIZE_SPOT_CROSS
+            for el in (QtWidgets.QGraphicsLineItem(-s, 0, s, 0), QtWidgets.QGraphicsLineItem(0, -s, 0, s)):
+                el.setPen(pen)
+                cross.addToGroup(el)
+            self.spotgroup.addToGroup(cross)
+
+            self.spotgroup.hide()
 
     def makeImageObject(self):
         """
@@ -324,12 +458,16 @@ class CtrlMainWindow(QtCore.QObject, Tester, MarkerMenuPlugin):
             w, h = 200, 100
             pxmap = QtGui.QPixmap(w, h)
             pxmap.fill(QtGui.QColor(0, 230, 118))
-            self.pxmap = QtWidgets.QGraphicsPixmapItem(pxmap)
+            if self.bopengl:
+                self.pxmap = FrameItem(pxmap, order=self.color_order)
+            else:
+                self.pxmap = QtWidgets.QGraphicsPixmapItem(pxmap)
 
             xoff, yoff = int(-w / 2), int(-h / 2)
             self.pxmap.setOffset(xoff, yoff)
 
             self.bkgoffset = [xoff, yoff]
+            self.frame_size = (w, h)
 
             scene: QtWidgets.QGraphicsScene = self.parent().getScene()
             scene.addItem(self.pxmap)
@@ -341,12 +479,20 @@ class CtrlMainWindow(QtCore.QObject, Tester, MarkerMenuPlugin):
         """
         self.parent().hide()
         self.unregisterSignalNewFrame()
+        self.display_timer.stop()
+        self.mailbox.clear()
+
+        if self.demosaic is not None:
+            self.demosaic.close()
 
         # stops zmq server if running
         self.debug("Stopping ZMQ")
         if self.zmqserver.isRunning():
             self.zmqserver.stopZMQ()
 
+        if self.autofocus is not None:
+            self.autofocus.stop()
+
         self.debug("Stopping main aquisition thread")
         # stops main acquisition thread if running
         if self.thread is not None and self.thread.is_alive():
@@ -367,8 +513,44 @@ class CtrlMainWindow(QtCore.QObject, Tester, MarkerMenuPlugin):
         """
         self.debug("Making a frame {}".format(numframes))
         if self.thread is None or not self.thread.is_alive():
+            self.mailbox.reset()
+
+            mode = self.config.getcfAcquisitionMode()
+
+            # the acquired region is left untouched unless requested
+            (roi, binning) = (None, None)
+            if self.config.getcfRoiAcquisition():
+                (roi, binning) = (self.config.getcfRoiRect(), self.config.getcfRoiBinning())
+
+            self.focus_roi = None
             self.thread = ThreadCameraAllied(self.id, self, frame_count=numframes, queue_stop=self.qstop,
-                                             queue_cmd=self.queue_cmd)
+                                             queue_cmd=self.queue_cmd,
+                                             basync=mode == ACQUISITION_ASYNC,
+                                             bstream=mode == ACQUISITION_STREAM,
+                                             queue_size=self.config.getcfFrameQueueSize(),
+                                             queue_policy=self.config.getcfFrameQueuePolicy(),
+                                             pool_size=self.config.getcfFramePoolSize(),
+                                             frame_rate=self.config.getcfFrameRate(),
+                                             demosaic_mode=self.config.getcfDemosaicPreview(),
+                                             demosaic_bands=self.config.getcfDemosaicBands(),
+                                             pipeline=self.config.getcfPipeline(),
+                                             reference_dir=self.config.getFolderProfiles(),
+                                             average_mode=self.config.getcfAverageMode(),
+                                             average_length=self.config.getcfAverageLength(),
+                                             average_alpha=self.config.getcfAverageAlpha(),
+                                             spot_detection=self.config.getcfSpotDetection(),
+                                             spot_threshold=self.config.getcfSpotThreshold(),
+                                             spot_roi=self.config.getcfSpotRoi(),
+                                             spot_gaussian=self.config.getcfSpotGaussian(),
+                                             spot_every=self.config.getcfSpotEvery(),
+                                             hole_detection=self.config.getcfHoleDetection(),
+                                             hole_levels=self.config.getcfHoleLevels(),
+                                             mono_bits=self.config.getcfMonoBits(),
+                                             display_window=self.config.getcfDisplayWindow(),
+                                             display_gamma=self.config.getcfDisplayGamma(),
+                                             roi=roi, binning=binning,
+                                             focus_method=self.config.getcfFocusMethod(),
+                                             color_order=self.color_order)
             self.thread.apply_default_params()
             self.thread.start()
 
@@ -403,24 +585,100 @@ class CtrlMainWindow(QtCore.QObject, Tester, MarkerMenuPlugin):
 
     def reportNewFrame(self, frame):
         """
-        Sends the new frame through the application signal pipeline
+        Places the new frame into the mailbox, notifies the application signal pipeline if no render is pending
+        With the display clock running the frame waits for the next tick
+        The frame buffer is handed over without a copy, processFrame() releases it
+        :return:
+        """
+        if self.latency is not None:
+            frame.ts_emit = time.perf_counter()
+
+        if self.mailbox.post(frame) and self.display_rate == 0:
+            self.signnewframe.emit()
+
+    def setDisplayRate(self, rate):
+        """
+        Changes the display clock
+        :param rate: int() - Hz, 0 - every acquired frame is displayed
         :return:
         """
-        tframe = copy.deepcopy(frame)
-        self.signnewframe.emit(tframe)
+        rate = max(0, int(rate))
+        self.display_rate = rate
+
+        if rate > 0:
+            self.display_timer.start(max(1, int(round(1000. / rate))))
+        else:
+            self.display_timer.stop()
 
-    def processFrame(self, frame):
+            # a frame posted while the clock was running is not announced by the signal
+            if self.mailbox.test_pending():
+                self.signnewframe.emit()
+
+        with self.cam_values_lock:
+            self.cam_values[CAMERA_DISPLAY_RATE] = rate
+
+    def processDisplayRate(self, rate):
         """
-        Processes data of a frame
-        :param frame:
+        Changes the display clock and stores it in the configuration
+        :param rate: int() - Hz, 0 - every acquired frame is displayed
         :return:
         """
+        self.config.setcfDisplayRate(rate)
+        self.setDisplayRate(rate)
+
+    def processFrame(self):
+        """
+        Processes data of the latest frame in the mailbox - on the signal of a new frame or on the display clock
+        :return:
+        """
+        # frame buffer is owned by the controller from now on
+        frame = self.mailbox.take()
+        if frame is None:
+            return
+
         self.debug("Processing a frame")
 
-        with self.lock:
-            # image processing is conducted in the thread, here we receive a prepared numpy array
-            img = copy.deepcopy(frame)
+        if self.latency is not None:
+            frame.ts_process = time.perf_counter()
+
+        bdisplayed = False
+        try:
+            bdisplayed = self.displayFrame(frame.data, roi=frame.roi, region=frame.view)
+            if bdisplayed:
+                if self.latency is not None:
+                    frame.ts_set = time.perf_counter()
+                    self.latency_pending = True
+
+                self.markRenderActivity()
+                self.displaySpot()
+                self.updateViewport()
+                self.updateFocusRoi()
+        finally:
+            if bdisplayed:
+                self.mailbox.mark_displayed()
+
+                # metadata of the displayed frame is passed to zmq clients
+                with self.cam_values_lock:
+                    self.cam_values[CAMERA_FRAME_META] = frame.get_meta()
+
+                # the displayed image references the buffer memory - keep it until the next frame replaces it
+                with self.image_lock:
+                    tbuffer, self.frame_buffer = self.frame_buffer, frame
+                if tbuffer is not None:
+                    tbuffer.release()
+            else:
+                frame.release()
 
+    def displayFrame(self, img, roi=None, region=None):
+        """
+        Converts a numpy array into a pixmap shown in the scene
+        :param img: np.ndarray() - C-contiguous image in the color order of the display, no copy is made
+        :param roi: list() - acquired region [x, y, width, height, sensor width, sensor height], None - full frame
+        :param region: list() - region [x, y, width, height, frame width, frame height] of the frame shown by a
+        cropped and downscaled image, None - full frame
+        :return: bool() - True if the image was displayed
+        """
+        with self.lock:
             scene: QtWidgets.QGraphicsScene = self.parent().getScene()
             view: QtWidgets.QGraphicsView = self.parent().getView()
 
@@ -428,40 +686,69 @@ class CtrlMainWindow(QtCore.QObject, Tester, MarkerMenuPlugin):
             bprocessed = False
             pxmap = None
 
+            # images wrap the buffer memory row by row - a strided view would need a repacking copy
+            if isinstance(img, np.ndarray) and not img.flags["C_CONTIGUOUS"]:
+                self.error("Frame is not C-contiguous ({}), it is not displayed".format(img.strides))
+                return False
+
             if isinstance(img, np.ndarray) and img.shape[2] == 1:                   # black and white
                 self.debug("Frame shape {}; {};".format(img.shape, img.size))
                 self.debug("First pixel {}".format(img[0, 0]))
 
                 # convert numpy array into an image and a pixmap
                 with self.image_lock:
-                    self.image = QtGui.QImage(img, img.shape[1], img.shape[0],
+                    self.image = QtGui.QImage(img, img.shape[1], img.shape[0], img.strides[0],
                                     QtGui.QImage.Format_Grayscale8)
 
-                pxmap = QtGui.QPixmap.fromImage(self.image)
-                self.pxmap.setPixmap(pxmap)
-
                 bprocessed = True
             elif isinstance(img, np.ndarray) and img.shape[2] == 3:  # color
                 self.debug("First pixel {}".format(img[0, 0]))
                 self.debug("Frame shape {}; {};".format(img.shape, img.size))
 
-                self.image = QtGui.QImage(img, img.shape[1], img.shape[0],
-                                          QtGui.QImage.Format_RGB888)
+                with self.image_lock:
+                    self.image = QtGui.QImage(img, img.shape[1], img.shape[0], img.strides[0],
+                                              self.color_format)
 
-                pxmap = QtGui.QPixmap.fromImage(self.image)
-                self.pxmap.setPixmap(pxmap)
                 bprocessed = True
 
             # perform actions only if a frame was correctly prepareds
             if bprocessed:
+                # a downscaled image keeps the size of its region in frame pixels - device pixel ratio
+                (fw, fh) = (img.shape[1], img.shape[0])
+                (vx, vy, ratio) = (0, 0, 1.)
+                if region is not None:
+                    (vx, vy, fw, fh) = (region[0], region[1], region[4], region[5])
+                    ratio = img.shape[1] / float(region[2])
+
+                if self.bopengl:
+                    self.pxmap.setFrame(img, ratio)
+                else:
+                    pxmap = QtGui.QPixmap.fromImage(self.image)
+                    pxmap.setDevicePixelRatio(ratio)
+                    self.pxmap.setPixmap(pxmap)
+
                 # test if the background offset needs to be calculated
-                xoff, yoff = int(-img.shape[1]/2), int(-img.shape[0]/2)
-                if self.bkgoffset[0] != xoff or self.bkgoffset[1] != yoff:
+                xoff, yoff = int(-fw/2), int(-fh/2)
+                scale = (1., 1.)
+
+                # a region of the sensor is placed where it is on the sensor, binned pixels are stretched
+                self.frame_roi = roi
+                if roi is not None:
+                    scale = (roi[2] / float(fw), roi[3] / float(fh))
+                    xoff, yoff = (roi[0] - roi[4] / 2.) / scale[0], (roi[1] - roi[5] / 2.) / scale[1]
+
+                self.pxmap.setOffset(xoff + vx, yoff + vy)
+
+                if self.bkgoffset[0] != xoff or self.bkgoffset[1] != yoff or self.pixel_scale != scale or \
+                        self.frame_size != (fw, fh):
 
                     self.bkgoffset = [xoff, yoff]
-                    self.pxmap.setOffset(xoff, yoff)
+                    self.frame_size = (fw, fh)
                     self.debug("New image offset: {} {}".format(xoff, yoff))
 
+                    self.pixel_scale = scale
+                    self.pxmap.setTransform(self.getImageTransform())
+
                     self.makeFrameObject()
 
                 # if first frame - rescale the object
@@ -471,6 +758,30 @@ class CtrlMainWindow(QtCore.QObject, Tester, MarkerMenuPlugin):
                     self.rescaleImageToWidget()
                 self.debug("Pixmap is created")
 
+            return bprocessed
+
+    def displaySpot(self):
+        """
+        Moves the spot overlay to the last detected spot
+        :return:
+        """
+        with self.cam_values_lock:
+            spot = self.cam_values[CAMERA_SPOT]
+
+        if spot is self.spot_shown:
+            return
+        self.spot_shown = spot
+
+        if not spot.get("found", False):
+            self.spotgroup.hide()
+            return
+
+        # frame pixels to the image coordinates - the image is centered by its offset
+        (fx, fy) = (spot["fwhm_x"], spot["fwhm_y"])
+        self.spotellipse.setRect(-fx / 2., -fy / 2., fx, fy)
+        self.spotgroup.setPos(spot["x"] + self.bkgoffset[0], spot["y"] + self.bkgoffset[1])
+        self.spotgroup.show()
+
     def rescaleImageToWidget(self):
         """
         Performs a rescale operation of the image to the view
@@ -488,8 +799,8 @@ class CtrlMainWindow(QtCore.QObject, Tester, MarkerMenuPlugin):
         point1 = QtCore.QPointF(scene_rect.x(), scene_rect.y())
         point2 = QtCore.QPointF(scene_rect.x() + scene_rect.width(), scene_rect.y() + scene_rect.height())
 
-        pxmap_rect = self.pxmap.boundingRect()
-        px_w, px_h = pxmap_rect.width()*self.image_scale, pxmap_rect.height()*self.image_scale
+        pxmap_rect = self.pxmap.mapRectToScene(self.getFrameRect())
+        px_w, px_h = pxmap_rect.width(), pxmap_rect.height()
 
         v2px_w, v2px_h = px_w/view_w, px_h/view_h
 
@@ -509,12 +820,47 @@ class CtrlMainWindow(QtCore.QObject, Tester, MarkerMenuPlugin):
         else:
             self.image_scale = self.image_scale / v2px_w * self.DEFAULT_FITVALUE
 
-        transform = QtGui.QTransform.fromScale(self.image_scale, self.image_scale)
-        self.pxmap.setTransform(transform)
+        self.pxmap.setTransform(self.getImageTransform())
+        self.markRenderActivity()
 
         self.reCenterView()
         self.makeFrameObject()
 
+    def getFrameRect(self):
+        """
+        Returns the rectangle of the full frame in the image coordinates - the pixmap may show a part of it
+        :return: QtCore.QRectF()
+        """
+        return QtCore.QRectF(self.bkgoffset[0], self.bkgoffset[1], self.frame_size[0], self.frame_size[1])
+
+    def updateViewport(self):
+        """
+        Passes the region of the frame visible in the view and its screen resolution to the camera thread
+        Frames are cropped and downscaled to it before they reach the display
+        :return:
+        """
+        if self.thread is None or self.pxmap is None:
+            return
+
+        view = self.view
+
+        # viewport to the image coordinates, frame pixels from the origin of the frame
+        visible = self.pxmap.mapFromScene(view.mapToScene(view.viewport().rect())).boundingRect()
+        region = [visible.x() - self.bkgoffset[0], visible.y() - self.bkgoffset[1], visible.width(), visible.height()]
+
+        # screen pixels per frame pixel - the finer axis decides
+        transform = self.pxmap.sceneTransform() * view.viewportTransform()
+        zoom = max(abs(transform.m11()), abs(transform.m22())) * view.devicePixelRatioF()
+
+        self.thread.set_viewport(region=region, zoom=zoom)
+
+    def getImageTransform(self):
+        """
+        Returns the transform of the image - zoom and binning
+        :return: QtGui.QTransform()
+        """
+        return QtGui.QTransform.fromScale(self.image_scale * self.pixel_scale[0], self.image_scale * self.pixel_scale[1])
+
     def registerCameraFeatures(self):
         """
         Registers a signal with camera features update
@@ -537,8 +883,12 @@ class CtrlMainWindow(QtCore.QObject, Tester, MarkerMenuPlugin):
         """
         self.debug("Feature update information {}".format(obj))
 
+        # frame counters of the display mailbox
+        (obj[CAMERA_FRAMES_ACQUIRED], obj[CAMERA_FRAMES_DISPLAYED], obj[CAMERA_FRAMES_SUPERSEDED]) = self.mailbox.get_counters()
+
         # making a copy of the values from the information retrieved from the camera
-        (exposure, expmin, expmax, gain, gainmin, gainmax, frequency, width, height, ip, model, interface, bcapture) = (
+        (exposure, expmin, expmax, gain, gainmin, gainmax, frequency, width, height, ip, model, interface, bcapture,
+         dropped, memory, acquired, displayed, superseded) = (
                                        self.getDefaultCameraFeature(obj, CAMERA_EXPOSUREMERGED),
                                        self.getDefaultCameraFeature(obj, CAMERA_EXPOSUREMIN),
                                        self.getDefaultCameraFeature(obj, CAMERA_EXPOSUREMAX),
@@ -552,8 +902,31 @@ class CtrlMainWindow(QtCore.QObject, Tester, MarkerMenuPlugin):
                                        self.getDefaultCameraFeature(obj, CAMERA_MODEL),
                                        self.getDefaultCameraFeature(obj, CAMERA_INTERFACE),
                                        self.getDefaultCameraFeature(obj, CAMERA_CAPTURE_ALLOWED),
+                                       self.getDefaultCameraFeature(obj, CAMERA_FRAMES_DROPPED),
+                                       self.getDefaultCameraFeature(obj, CAMERA_FRAMES_MEMORY),
+                                       self.getDefaultCameraFeature(obj, CAMERA_FRAMES_ACQUIRED),
+                                       self.getDefaultCameraFeature(obj, CAMERA_FRAMES_DISPLAYED),
+                                       self.getDefaultCameraFeature(obj, CAMERA_FRAMES_SUPERSEDED),
                                        )
 
+        # enqueue-to-applied latency of the commands, passed to zmq clients
+        self.getDefaultCameraFeature(obj, CAMERA_COMMAND_LATENCY)
+
+        # target frame rate - changed by the zmq clients
+        self.getDefaultCameraFeature(obj, CAMERA_FRAME_RATE)
+
+        # timing of the processing stages, state of the dark/flat references
+        self.getDefaultCameraFeature(obj, CAMERA_PIPELINE)
+        self.getDefaultCameraFeature(obj, CAMERA_CORRECTION)
+        self.getDefaultCameraFeature(obj, CAMERA_AVERAGE)
+
+        # bit depth of the frames, display mapping of high bit depth frames
+        self.getDefaultCameraFeature(obj, CAMERA_PIXEL_BITS)
+        self.getDefaultCameraFeature(obj, CAMERA_DISPLAY)
+
+        # acquired region of the sensor
+        self.getDefaultCameraFeature(obj, CAMERA_ROI)
+
         # nick name of the camera
         nickname = self.config.getcfCameraNickName()
 
@@ -562,6 +935,28 @@ class CtrlMainWindow(QtCore.QObject, Tester, MarkerMenuPlugin):
         if isinstance(frequency, float):
             block_frequency = "{:.02f} Hz".format(frequency)
 
+        # frames lost between the camera and the display
+        block_dropped = ""
+        if isinstance(dropped, int) and dropped > 0:
+            block_dropped = "Dropped: {}".format(dropped)
+
+        # frames acquired, displayed and superseded by a newer frame before display
+        block_frames = "Frames acquired/displayed/superseded: {} / {} / {}".format(acquired, displayed, superseded)
+        if self.display_rate > 0:
+            block_frames += "; Display: {} Hz".format(self.display_rate)
+
+        # paint time of the view - fast while streaming, smooth once settled
+        paint = self.getPaintStats()
+        with self.cam_values_lock:
+            self.cam_values[CAMERA_PAINT_TIME] = paint
+        block_frames += "; Paint fast/smooth: {:.1f} / {:.1f} ms".format(paint[PAINT_FAST]["mean"], paint[PAINT_SMOOTH]["mean"])
+
+        # latency overlay is refreshed together with the feature report
+        if self.latency_overlay:
+            self.latency_text = self.latency.format_stats()
+            self.view.viewport().update()
+        self.reportFrameStats(block_frames)
+
         # info on gain
         block_gain = ""
         if isinstance(gain, float) or isinstance(gain, int):
@@ -585,9 +980,9 @@ class CtrlMainWindow(QtCore.QObject, Tester, MarkerMenuPlugin):
         block_camera = ", ".join([v for v in (model, self.id, ip) if isinstance(v, str) and len(v) > 0])
 
         # preparing and setting the title if necessary
-        title = "; ".join([v for v in (nickname, block_camera, block_exposure, block_frequency) if isinstance(v, str) and len(v) > 0])
+        title = "; ".join([v for v in (nickname, block_camera, block_exposure, block_frequency, block_dropped) if isinstance(v, str) and len(v) > 0])
         trefzmq = "; ".join(
-            [v for v in (nickname, block_camera, block_exposure) if isinstance(v, str) and len(v) > 0])
+            [v for v in (nickname, block_camera, block_exposure, block_dropped, block_frames) if isinstance(v, str) and len(v) > 0])
 
         # title is updated together with frequency
         if self.config.getWindowTitle().lower() != title.lower():
@@ -660,8 +1055,8 @@ class CtrlMainWindow(QtCore.QObject, Tester, MarkerMenuPlugin):
         sc = self.SCALE_UPFACTOR
 
         self.image_scale = self.image_scale * sc
-        transform = QtGui.QTransform.fromScale(self.image_scale, self.image_scale)
-        self.pxmap.setTransform(transform)
+        self.pxmap.setTransform(self.getImageTransform())
+        self.markRenderActivity()
 
         self.reCenterView()
         self.makeFrameObject()
@@ -682,8 +1077,8 @@ class CtrlMainWindow(QtCore.QObject, Tester, MarkerMenuPlugin):
         sc = self.SCALE_DOWNFACTOR
 
         self.image_scale = self.image_scale * sc
-        transform = QtGui.QTransform.fromScale(self.image_scale,self.image_scale)
-        self.pxmap.setTransform(transform)
+        self.pxmap.setTransform(self.getImageTransform())
+        self.markRenderActivity()
 
         self.reCenterView()
         self.makeFrameObject()
@@ -716,38 +1111,118 @@ class CtrlMainWindow(QtCore.QObject, Tester, MarkerMenuPlugin):
 
     def rescaleFramePen(self):
         """
-        Rescales pen
-        :param scale:
+        Applies the color to the frame pen - cosmetic, its width is independent of the zoom
         :return:
         """
-        view: QtWidgets.QGraphicsView = self.view
-        scene: QtWidgets.QGraphicsScene = self.scene
+        color: QtGui.QColor = self.PENCOLOR_FRAME
+        color.setAlpha(self.PENCOLOR_ALPHA)
 
-        # bounding rect in global coords
-        brect: QtCore.QRectF = view.mapFromScene(scene.sceneRect()).boundingRect()
-        bw, bh = brect.width(), brect.height()
+        pen = QtGui.QPen(color)
+        pen.setWidth(self.PENWIDTH_FRAME)
+        pen.setCosmetic(True)
 
-        # linewidth in scene coordinates
-        lwrect = view.mapToScene(QtCore.QRect(0, 0, 3, 3))
-        lwrect = lwrect.boundingRect()
+        for el in self.framerectgroup.childItems():
+            el.setPen(pen)
 
-        # scene rect
-        screct: QtCore.QRectF = scene.sceneRect()
-        scw, sch = screct.width(), screct.height()
+    def setRenderQuality(self, bsmooth):
+        """
+        Switches between fast and smooth rendering of the view
+        :param bsmooth: bool()
+        :return:
+        """
+        if not self.config.getcfAdaptiveRender():
+            bsmooth = True
 
-        color: QtGui.QColor = self.PENCOLOR_FRAME
-        color.setAlpha(self.PENCOLOR_ALPHA)
+        if bsmooth == self.bsmooth:
+            return
+        self.bsmooth = bsmooth
 
-        pen = QtGui.QPen(color)
-        neww = float(scw) / float(bw) * float(self.PENWIDTH_FRAME)
+        self.view.setRenderHint(QtGui.QPainter.Antialiasing, bsmooth)
+        self.view.setRenderHint(QtGui.QPainter.SmoothPixmapTransform, bsmooth)
+        if self.pxmap is not None:
+            self.pxmap.setTransformationMode(QtCore.Qt.SmoothTransformation if bsmooth else QtCore.Qt.FastTransformation)
 
-        if neww < 1:
-            neww = 2
+        # high quality repaint of the settled view
+        if bsmooth:
+            self.view.viewport().update()
 
-        pen.setWidth(neww)
+    def markRenderActivity(self):
+        """
+        Renders fast until frames and zoom changes stop for RENDER_SETTLE
+        :return:
+        """
+        self.setRenderQuality(False)
+        self.render_timer.start(self.RENDER_SETTLE)
 
-        for el in self.framerectgroup.childItems():
-            el.setPen(pen)
+    def processRenderSettled(self):
+        self.setRenderQuality(True)
+
+    def viewPaintEvent(self, ev):
+        """
+        Paints the view, measures the paint time per render quality
+        :param ev:
+        :return:
+        """
+        ts = time.perf_counter()
+        QtWidgets.QGraphicsView.paintEvent(self.view, ev)
+        te = time.perf_counter()
+        td = (te - ts) * 1000.
+
+        stats = self.paint_stats[PAINT_SMOOTH if self.bsmooth else PAINT_FAST]
+        stats[0] = td if stats[1] == 0 else stats[0] + (td - stats[0]) * self.PAINT_WEIGHT
+        stats[1] += 1
+
+        # the first paint of a new frame completes its latency record
+        if self.latency_pending:
+            self.latency_pending = False
+            frame = self.frame_buffer
+            if frame is not None:
+                self.latency.record(frame.ts_capture, frame.ts_convert, frame.ts_emit, frame.ts_process, frame.ts_set, te)
+
+        if self.latency_overlay and len(self.latency_text) > 0:
+            self.paintLatencyOverlay()
+
+    def paintLatencyOverlay(self):
+        """
+        Draws the latency statistics in the top left corner of the view
+        :return:
+        """
+        painter = QtGui.QPainter(self.view.viewport())
+        try:
+            font = QtGui.QFontDatabase.systemFont(QtGui.QFontDatabase.FixedFont)
+            painter.setFont(font)
+            metrics = painter.fontMetrics()
+
+            (m, lh) = (self.LATENCY_OVERLAY_MARGIN, metrics.height())
+            w = max([metrics.horizontalAdvance(v) for v in self.latency_text])
+            painter.fillRect(QtCore.QRectF(m, m, w + 2 * m, lh * len(self.latency_text) + 2 * m), QtGui.QColor(0, 0, 0, 160))
+
+            painter.setPen(QtGui.QColor(0, 230, 118))
+            for (i, v) in enumerate(self.latency_text):
+                painter.drawText(QtCore.QPointF(2 * m, 2 * m + metrics.ascent() + i * lh), v)
+        finally:
+            painter.end()
+
+    def getLatencyStats(self):
+        """
+        Returns latency statistics of the displayed frames (ms) and the frame counters - called by the zmq thread
+        :return: dict()
+        """
+        res = {"enabled": self.latency is not None}
+        if self.latency is not None:
+            res.update(self.latency.get_stats())
+
+        (res[CAMERA_FRAMES_ACQUIRED], res[CAMERA_FRAMES_DISPLAYED], res[CAMERA_FRAMES_SUPERSEDED]) = self.mailbox.get_counters()
+        with self.cam_values_lock:
+            res[CAMERA_PIPELINE] = copy.deepcopy(self.cam_values[CAMERA_PIPELINE])
+        return res
+
+    def getPaintStats(self):
+        """
+        Returns mean paint time (ms) and number of repaints per render quality
+        :return: dict()
+        """
+        return {k: {"mean": v[0], "count": v[1]} for (k, v) in self.paint_stats.items()}
 
     def processShowHideFrame(self, bstate: bool):
         """
@@ -827,6 +1302,21 @@ class CtrlMainWindow(QtCore.QObject, Tester, MarkerMenuPlugin):
         """
         self.signstatusmsg.emit(msg)
 
+    def registerFrameStats(self, func):
+        """
+        Registers a callback for a signal showing frame counters in the statusbar of the main window
+        :param func:
+        :return:
+        """
+        self.signframestats.connect(func)
+
+    def reportFrameStats(self, msg):
+        """
+        Reports frame counters to the main window statusbar
+        :return:
+        """
+        self.signframestats.emit(msg)
+
     def registerGainChange(self, v):
         """
         Registers a change of gain and passes it further
@@ -847,6 +1337,240 @@ class CtrlMainWindow(QtCore.QObject, Tester, MarkerMenuPlugin):
         self.debug("Setting new command ({})".format(cmd))
         self.queue_cmd.put(cmd)
 
+    def processAverageMode(self, mode):
+        """
+        Changes the temporal averaging mode and passes it further
+        :param mode: str() - off, boxcar, ema
+        :return:
+        """
+        self.config.setcfAverageMode(mode)
+
+        cmd = {CAMERA_AVERAGE: mode}
+        self.debug("Setting new command ({})".format(cmd))
+        self.queue_cmd.put(cmd)
+
+    def processSpotDetection(self, bstate):
+        """
+        Switches the laser spot detection on/off and passes it further
+        :param bstate: bool()
+        :return:
+        """
+        self.config.setcfSpotDetection(int(bstate))
+
+        cmd = {CAMERA_SPOT: bool(bstate)}
+        self.debug("Setting new command ({})".format(cmd))
+        self.queue_cmd.put(cmd)
+
+    def reportSpot(self, res):
+        """
+        Stores the last detected spot and passes it to the zmq clients
+        Executed by the acquisition thread, the overlay is updated together with the displayed frame
+        :param res: dict() - position, intensity and FWHM in frame pixels, empty if the detection is disabled
+        :return:
+        """
+        with self.cam_values_lock:
+            self.cam_values[CAMERA_SPOT] = res
+        self.setZMQdata()
+
+    def processHoleDetection(self, bstate):
+        """
+        Switches the gasket hole detection on/off and passes it further
+        :param bstate: bool()
+        :return:
+        """
+        self.config.setcfHoleDetection(int(bstate))
+
+        cmd = {CAMERA_HOLE: bool(bstate)}
+        self.debug("Setting new command ({})".format(cmd))
+        self.queue_cmd.put(cmd)
+
+    def reportHole(self, res):
+        """
+        Stores the detected gasket hole, passes it to the zmq clients and the marker
+        Executed by the acquisition thread - only frames which changed significantly are reported
+        :param res: dict() - ellipse in frame pixels, empty if the detection is disabled
+        :return:
+        """
+        with self.cam_values_lock:
+            self.cam_values[CAMERA_HOLE] = res
+        self.setZMQdata()
+        self.signhole.emit(res)
+
+    def processHole(self, res):
+        """
+        Fits the marker to the detected gasket hole - an ellipse bounding the detected one
+        :param res: dict() - ellipse in frame pixels
+        :return:
+        """
+        if not res.get("found", False):
+            return
+
+        # axis aligned half axes of the rotated ellipse
+        angle = np.radians(res["angle"])
+        (a, b) = (res["width"] / 2., res["height"] / 2.)
+        (c, s) = (np.cos(angle), np.sin(angle))
+        (hw, hh) = (np.hypot(a * c, b * s), np.hypot(a * s, b * c))
+
+        # frame pixels to the scene - the image is centered by its offset and scaled
+        center = self.pxmap.mapToScene(QtCore.QPointF(res["x"] + self.bkgoffset[0], res["y"] + self.bkgoffset[1]))
+
+        shape = self.marker.getMarkerShapes().index(self.marker.shape_ellipse)
+        (sx, sy) = self.pixel_scale
+        self.marker.setGeometry(center.x(), center.y(), 2. * hw * self.image_scale * sx, 2. * hh * self.image_scale * sy,
+                                shape=shape)
+
+    def processFocusMethod(self, method):
+        """
+        Changes the focus metric and passes it further
+        :param method: str() - off, laplacian, tenengrad, brenner
+        :return:
+        """
+        self.config.setcfFocusMethod(method)
+
+        cmd = {CAMERA_FOCUS: method}
+        self.debug("Setting new command ({})".format(cmd))
+        self.queue_cmd.put(cmd)
+
+    def updateFocusRoi(self):
+        """
+        Passes the marker rectangle in frame pixels to the focus metric if the marker has moved
+        :return:
+        """
+        if self.marker is None or self.pxmap is None:
+            return
+
+        (w, h) = (self.marker.w, self.marker.h)
+        rect = self.pxmap.mapRectFromScene(QtCore.QRectF(self.marker.x - w / 2., self.marker.y - h / 2., w, h))
+        roi = [int(rect.x() - self.bkgoffset[0]), int(rect.y() - self.bkgoffset[1]),
+               max(1, int(rect.width())), max(1, int(rect.height()))]
+
+        if roi != self.focus_roi:
+            self.focus_roi = roi
+
+            cmd = {CAMERA_FOCUS_ROI: roi}
+            self.debug("Setting new command ({})".format(cmd))
+            self.queue_cmd.put(cmd)
+
+    def registerFocus(self, func):
+        """
+        Registers a callback for a signal showing the focus metric in the statusbar of the main window
+        :param func:
+        :return:
+        """
+        self.signfocus.connect(func)
+
+    def reportFocus(self, res):
+        """
+        Stores the focus metric of the last frame, passes it to the zmq clients, the statusbar and a running autofocus
+        Executed by the acquisition thread
+        :param res: dict() - metric of the marker region, empty if the metric is disabled
+        :return:
+        """
+        with self.cam_values_lock:
+            self.cam_values[CAMERA_FOCUS] = res
+        self.setZMQdata()
+
+        autofocus = self.autofocus
+        if autofocus is not None:
+            autofocus.put(res)
+
+        msg = ""
+        if "value" in res:
+            msg = "Focus ({}): {:.4g}".format(res["method"], res["value"])
+        self.signfocus.emit(msg)
+
+    def processAutofocus(self):
+        """
+        Starts an autofocus scan by the Z move of a plugin, stops a running one
+        :return:
+        """
+        if self.autofocus is not None and self.autofocus.is_running():
+            self.autofocus.stop()
+            self.reportStatusMessage("Stopping autofocus")
+            return
+
+        if self.thread is None or not self.thread.is_camalive():
+            self.reportStatusMessage("Please start the camera acquisition in order to focus")
+            return
+
+        if self.config.getcfFocusMethod() == FOCUS_OFF:
+            self.reportStatusMessage("Please select a focus metric in order to focus")
+            return
+
+        # the selected plugin if it moves Z, otherwise the first one
+        plugins = self.config.getPlugins()
+        if not isinstance(plugins, (list, tuple)):
+            plugins = []
+        if self.plugin_index is not None and 0 <= self.plugin_index < len(plugins):
+            plugins = [plugins[self.plugin_index]] + list(plugins)
+
+        move = None
+        for plugin in plugins:
+            move = getattr(plugin, "move_z", None)
+            if callable(move):
+                break
+            move = None
+
+        if move is None:
+            self.reportStatusMessage("Sorry, no plugin moving Z is installed")
+            return
+
+        self.autofocus = AutofocusRunnable(move, self.config.getcfAutofocusRange(), self.config.getcfAutofocusTolerance(),
+                                           frames=self.config.getcfAutofocusFrames(),
+                                           skip=self.config.getcfAutofocusSkip(), feedback=self)
+        self.thpool.start(self.autofocus)
+        self.reportStatusMessage("Starting autofocus")
+
+    def reportAutofocus(self, res):
+        """
+        Reports progress of the autofocus scan - executed by the scan thread
+        :param res: dict() - state, step, position relative to the start and metric value
+        :return:
+        """
+        with self.cam_values_lock:
+            self.cam_values[CAMERA_AUTOFOCUS] = res
+        self.setZMQdata()
+
+        state = res.get("state")
+        if state == "scanning":
+            msg = "Autofocus step ({}): position {:.4g}; metric {:.4g}".format(res["step"], res["position"], res["value"])
+        elif state == "done":
+            msg = "Autofocus done in ({}) steps, {:.1f} s: position {:.4g}".format(res["step"], res["time"], res["position"])
+        elif state == "error":
+            msg = "Autofocus error: {}".format(res.get("error"))
+        else:
+            msg = "Autofocus ({}), back at the start position".format(state)
+        self.reportStatusMessage(msg)
+
+    def processRoiAcquisition(self, bstate):
+        """
+        Restricts the acquisition to the marker rectangle with the configured binning, restores the full frame
+        :param bstate: bool()
+        :return:
+        """
+        self.config.setcfRoiAcquisition(int(bstate))
+
+        cmd = {CAMERA_BINNING: 1, CAMERA_ROI: []}
+        if bstate:
+            # scene to sensor pixels - the scene is centered on the sensor
+            if self.frame_roi is not None:
+                (sw, sh) = self.frame_roi[4:6]
+            else:
+                (sw, sh) = (self.frame_size[0] * self.pixel_scale[0], self.frame_size[1] * self.pixel_scale[1])
+
+            (w, h) = (self.marker.w / self.image_scale, self.marker.h / self.image_scale)
+            (x, y) = (self.marker.x / self.image_scale + sw / 2. - w / 2., self.marker.y / self.image_scale + sh / 2. - h / 2.)
+
+            # the camera snaps the region to its increments
+            (x, y) = (max(0, int(x)), max(0, int(y)))
+            rect = [x, y, max(1, min(int(np.ceil(w)), int(sw) - x)), max(1, min(int(np.ceil(h)), int(sh) - y))]
+
+            self.config.setcfRoiRect(rect)
+            cmd = {CAMERA_BINNING: self.config.getcfRoiBinning(), CAMERA_ROI: rect}
+
+        self.debug("Setting new command ({})".format(cmd))
+        self.queue_cmd.put(cmd)
+
     def registerCameraState(self, func):
         """
         Register external functions polling camera state
@@ -934,10 +1658,28 @@ class CtrlMainWindow(QtCore.QObject, Tester, MarkerMenuPlugin):
         self.debug("Base directory for file saving is ({})".format(dn))
 
         timg = None
+        traw = None
+        tfull = None
+        tmeta = None
         with self.image_lock:
             if isinstance(self.image, QtGui.QImage):
                 timg = self.image.copy(self.image.rect())
 
+            if self.frame_buffer is not None:
+                tmeta = self.frame_buffer.get_meta()
+
+            # the displayed image may show a downscaled part of the frame - the full resolution frame is saved
+            frame = self.frame_buffer
+            if frame is not None and frame.full is not None:
+                frame = frame.full
+
+            # bayer cameras - snapshots are demosaiced from the raw frame with the snapshot quality
+            # high bit depth cameras - snapshots keep the full depth of the raw frame
+            if frame is not None and frame.raw is not None:
+                traw = frame.raw.data.copy()
+            elif frame is not None and frame is not self.frame_buffer:
+                tfull = frame.data.copy()
+
         if isinstance(timg, QtGui.QImage):
             tfn = QtWidgets.QFileDialog.getSaveFileName(self.parent(), "Saving Camera Image", dn, "Images (*.png)")
 
@@ -948,15 +1690,120 @@ class CtrlMainWindow(QtCore.QObject, Tester, MarkerMenuPlugin):
                 self.config.setcfCameraDirname(tbasedir)
 
                 self.debug("Starting file saving runner thread")
-                runner = FilesavingRunner(tfn, timg, feedback=self)
+                if traw is not None:
+                    runner = FilesavingRunner(tfn, traw, feedback=self, convert=self.convertSnapshot)
+                elif tfull is not None:
+                    runner = FilesavingRunner(tfn, tfull, feedback=self, convert=self.convertFrame)
+                else:
+                    runner = FilesavingRunner(tfn, timg, feedback=self)
                 self.thpool.start(runner)
 
+                # frame id, timestamp, exposure and gain of the saved frame
+                if tmeta is not None:
+                    self.thpool.start(FilesavingRunner(FilesavingRunner.getMetaFilename(tfn), tmeta, feedback=self))
+
                 self.reportStatusMessage("Saving file as ({})".format(tfn))
             else:
                 self.reportStatusMessage("File saving canceled")
         else:
             self.reportStatusMessage("Error: no image to save")
 
+    def convertSnapshot(self, raw):
+        """
+        Demosaics a raw bayer frame for saving - executed by the file saving thread
+        High bit depth mono frames are saved as they are - 16-bit png
+        :param raw: np.ndarray() - raw bayer frame or high bit depth mono frame
+        :return: np.ndarray() - BGR image or 16-bit mono image
+        """
+        if raw.dtype != np.uint8:
+            return raw
+
+        # demosaiced directly into the BGR order of the saved files
+        with self.lock:
+            if self.demosaic is None:
+                self.demosaic = BayerDemosaic(self.config.getcfDemosaicBands(), order=COLOR_ORDER_BGR)
+
+        mode = self.config.getcfDemosaicSnapshot()
+        res = np.empty(self.demosaic.get_shape(raw.shape, mode), dtype=raw.dtype)
+        self.demosaic.process(raw, res, mode)
+        return res
+
+    def convertFrame(self, img):
+        """
+        Prepares a full resolution display frame for saving - executed by the file saving thread
+        :param img: np.ndarray() - color frame in the order of the display or mono frame
+        :return: np.ndarray() - BGR image or mono image
+        """
+        if img.shape[2] == 3 and self.color_order == COLOR_ORDER_RGB:
+            return cv2.cvtColor(img, cv2.COLOR_RGB2BGR)
+        return img
+
+    def processBurst(self):
+        """
+        Requests a burst capture at the maximum frame rate
+        :return:
+        """
+        if self.thread is None or not self.thread.is_camalive():
+            self.reportStatusMessage("Please start the camera acquisition in order to capture a burst")
+            return
+
+        count = self.config.getcfBurstSize()
+        cmd = {CAMERA_BURST: count}
+        self.debug("Setting new command ({})".format(cmd))
+        self.queue_cmd.put(cmd)
+
+        self.reportStatusMessage("Capturing a burst of ({}) frames".format(count))
+
+    def reportBurst(self, burst):
+        """
+        Reports a finished burst capture - called by the camera thread
+        :param burst: FrameBurst()
+        :return:
+        """
+        self.signburst.emit(burst)
+
+    def processBurstDone(self, burst):
+        """
+        Keeps the captured burst for analysis and saves it as a numpy file into the camera directory
+        :param burst: FrameBurst()
+        :return:
+        """
+        self.burst = burst
+
+        info = burst.get_info()
+        info["file"] = None
+
+        data = burst.get_data()
+        if data is not None and len(data) > 0:
+            dn = self.config.getcfCameraDirectory()
+            if not isinstance(dn, str) or not os.path.isdir(dn):
+                dn = self.config.getFolderStartup()
+
+            tfn = os.path.join(dn, "{}_burst_{}.npy".format(self.id, time.strftime("%Y%m%d_%H%M%S")))
+            runner = FilesavingRunner(tfn, data, feedback=self)
+            self.thpool.start(runner)
+            info["file"] = tfn
+
+            # frame ids and device timestamps of the burst
+            self.thpool.start(FilesavingRunner(FilesavingRunner.getMetaFilename(tfn), burst.get_meta(), feedback=self))
+
+        # burst summary is passed to zmq clients
+        self.getDefaultCameraFeature({CAMERA_BURST: info}, CAMERA_BURST)
+        self.setZMQdata()
+
+        msg = "Burst: frames ({}/{}) at ({:.02f} Hz); incomplete frames ({})".format(
+            info["frames"], info["count"], info["fps"], info["incomplete"])
+        if info["file"] is not None:
+            msg += "; saving as ({})".format(info["file"])
+        self.reportStatusMessage(msg)
+
+    def getBurst(self):
+        """
+        Returns the last captured burst
+        :return: FrameBurst() or None
+        """
+        return self.burst
+
     def processReference(self, v):
         """
         Sets a reference to a value
@@ -1011,8 +1858,8 @@ class CtrlMainWindow(QtCore.QObject, Tester, MarkerMenuPlugin):
             # understand the offset
             dx, dy = None, None
 
-            # need to recalculate to frame rectangle size
-            self.debug("Bounding rect {}; pixmap {};".format(self.framerect.boundingRect(), self.pxmap.boundingRect()))
+            # need to recalculate to sensor pixels - the acquired region and binning do not change the scale
+            self.debug("Bounding rect {}; frame {};".format(self.framerect.boundingRect(), self.getFrameRect()))
 
             if self.frame_marker_reference == FRAME_REFERENCE:
                 dx, dy = ev.scenePos().x(), ev.scenePos().y()
@@ -1025,8 +1872,8 @@ class CtrlMainWindow(QtCore.QObject, Tester, MarkerMenuPlugin):
             if not None in (dx, dy):
                 self.debug("Preexecuting with dx {}, dy {}".format(dx, dy))
 
-                dx = dx / self.framerect.boundingRect().width() * self.pxmap.boundingRect().width()
-                dy = dy / self.framerect.boundingRect().height() * self.pxmap.boundingRect().height()
+                dx = dx / self.image_scale
+                dy = dy / self.image_scale
 
                 self.debug("Executing with dx {}, dy {}".format(dx, dy))
 
@@ -0,0 +1,318 @@
+from app.common.imports import *
+from app.common.keys import *
+
+__all__ = ["FrameItem"]
+
+class FrameItem(QtWidgets.QGraphicsPixmapItem, Tester):
+    """
+    Image item drawing frames from a persistent OpenGL texture - QOpenGLWidget viewport of the view
+    The texture is allocated once per frame size and format; only the visible region of a new frame is uploaded
+    into it by glTexSubImage2D, scaling is done by the GL pipeline
+    Without an OpenGL paint engine, or if a binding does not support the GL calls, the frame is drawn as an image,
+    still without the pixmap conversion
+    Geometry follows QGraphicsPixmapItem - offset, transform and children (overlays) are unchanged
+    """
+    GL_TRIANGLE_FAN = 0x0006
+    GL_TEXTURE_2D = 0x0DE1
+    GL_UNSIGNED_BYTE = 0x1401
+    GL_RED = 0x1903
+    GL_RGB = 0x1907
+    GL_BGR = 0x80E0
+    GL_UNPACK_ROW_LENGTH = 0x0CF2
+    GL_UNPACK_SKIP_PIXELS = 0x0CF4
+    GL_UNPACK_ALIGNMENT = 0x0CF5
+
+    MARGIN = 1      # texels uploaded around the visible region - linear filtering at its borders
+
+    # errors of the GL wrappers - missing functions and arguments a binding does not convert (numpy buffers, lists)
+    GL_ERRORS = (AttributeError, TypeError, RuntimeError)
+
+    SHADER_VERTEX = """
+        attribute highp vec2 vertex;
+        attribute highp vec2 texcoord;
+        uniform highp mat4 matrix;
+        varying highp vec2 coord;
+        void main(void)
+        {
+            coord = texcoord;
+            gl_Position = matrix * vec4(vertex, 0.0, 1.0);
+        }
+    """
+
+    SHADER_FRAGMENT = """
+        uniform sampler2D frame;
+        uniform int mono;
+        varying highp vec2 coord;
+        void main(void)
+        {
+            highp vec4 c = texture2D(frame, coord);
+            gl_FragColor = mono == 1 ? vec4(c.rrr, 1.0) : vec4(c.rgb, 1.0);
+        }
+    """
+
+    def __init__(self, pixmap=None, parent=None, order=COLOR_ORDER_RGB):
+        """
+        Class constructor
+        :param pixmap: QtGui.QPixmap() - placeholder shown until the first frame
+        :param parent:
+        :param order: str() - channel order of color frames - bgr, rgb
+        """
+        if pixmap is not None:
+            QtWidgets.QGraphicsPixmapItem.__init__(self, pixmap, parent)
+        else:
+            QtWidgets.QGraphicsPixmapItem.__init__(self, parent)
+        Tester.__init__(self, def_file="{}".format(self.__class__.__name__.lower()))
+
+        # color frames are wrapped and uploaded in their own order - the texture upload swizzles for free
+        self.order = order
+        self.color_format = QtGui.QImage.Format_BGR888 if order == COLOR_ORDER_BGR else QtGui.QImage.Format_RGB888
+        self.color_source = self.GL_BGR if order == COLOR_ORDER_BGR else self.GL_RGB
+
+        # exposed rectangle of the paint - the visible part of the frame
+        self.setFlag(QtWidgets.QGraphicsItem.ItemUsesExtendedStyleOption, True)
+
+        # frame (H, W, C) referenced until the next one, device pixel ratio, frame generation
+        self.frame = None
+        self.ratio = 1.
+        self.generation = 0
+
+        # OpenGL resources - created within the context of the viewport
+        self.gl = None
+        self.program = None
+        self.texture = None
+        self.texture_key = None
+        self.texture_generation = None
+        self.texture_region = None
+        self.bnative = True
+
+    def setFrame(self, img, ratio=1.):
+        """
+        Shows a frame - the array is referenced, not copied
+        :param img: np.ndarray() - (H, W, 1) mono or (H, W, 3) color in the order of the item, uint8, C-contiguous
+        :param ratio: float() - device pixel ratio, frame pixels per item unit
+        :return:
+        """
+        if self.frame is None or self.frame.shape != img.shape or self.ratio != ratio:
+            self.prepareGeometryChange()
+
+        self.frame = img
+        self.ratio = ratio
+        self.generation += 1
+        self.update()
+
+    def boundingRect(self):
+        if self.frame is None:
+            return QtWidgets.QGraphicsPixmapItem.boundingRect(self)
+
+        (h, w) = self.frame.shape[:2]
+        return QtCore.QRectF(self.offset(), QtCore.QSizeF(w / self.ratio, h / self.ratio))
+
+    def shape(self):
+        res = QtGui.QPainterPath()
+        res.addRect(self.boundingRect())
+        return res
+
+    def paint(self, painter: QtGui.QPainter, option, widget=None):
+        if self.frame is None:
+            QtWidgets.QGraphicsPixmapItem.paint(self, painter, option, widget)
+            return
+
+        if self.bnative and painter.paintEngine().type() == QtGui.QPaintEngine.OpenGL2:
+            painter.beginNativePainting()
+            try:
+                bpainted = self.paintNative(painter, option.exposedRect)
+            except self.GL_ERRORS as e:
+                # GL wrappers differ between the bindings - reported once, drawn as an image from now on
+                self.error("OpenGL drawing is not available ({}), falling back to the raster drawing".format(e))
+                self.releaseNative()
+                self.bnative = False
+                bpainted = False
+            finally:
+                painter.endNativePainting()
+
+            if bpainted:
+                return
+
+        # raster fallback
+        img = self.frame
+        fmt = QtGui.QImage.Format_Grayscale8 if img.shape[2] == 1 else self.color_format
+        image = QtGui.QImage(img, img.shape[1], img.shape[0], img.strides[0], fmt)
+        painter.setRenderHint(QtGui.QPainter.SmoothPixmapTransform, self.transformationMode() == QtCore.Qt.SmoothTransformation)
+        painter.drawImage(self.boundingRect(), image)
+
+    def prepNative(self):
+        """
+        Resolves OpenGL functions and compiles the shaders
+        :return: bool() - True if OpenGL drawing is available
+        """
+        ctx = QtGui.QOpenGLContext.currentContext()
+        if ctx is None:
+            return False
+
+        # PyQt5 wraps the versioned functions, PySide2 only QOpenGLFunctions
+        if hasattr(ctx, "versionFunctions"):
+            profile = QtGui.QOpenGLVersionProfile()
+            profile.setVersion(2, 0)
+            self.gl = ctx.versionFunctions(profile)
+            if self.gl is not None:
+                self.gl.initializeOpenGLFunctions()
+        else:
+            self.gl = ctx.functions()
+        if self.gl is None:
+            return False
+
+        program = QtGui.QOpenGLShaderProgram()
+        program.addShaderFromSourceCode(QtGui.QOpenGLShader.Vertex, self.SHADER_VERTEX)
+        program.addShaderFromSourceCode(QtGui.QOpenGLShader.Fragment, self.SHADER_FRAGMENT)
+        program.bindAttributeLocation("vertex", 0)
+        program.bindAttributeLocation("texcoord", 1)
+        if not program.link():
+            self.error("OpenGL shaders are not available ({})".format(program.log()))
+            return False
+
+        self.program = program
+        return True
+
+    def releaseNative(self):
+        """
+        Drops the OpenGL resources after a failed drawing - the context of the viewport is current
+        :return:
+        """
+        try:
+            if self.program is not None:
+                self.program.release()
+            if self.texture is not None:
+                self.texture.release(0)
+                self.texture.destroy()
+        except self.GL_ERRORS:
+            pass
+
+        self.program = None
+        self.texture = None
+        self.texture_key = None
+        self.texture_generation = None
+        self.texture_region = None
+
+    def getRegion(self, exposed):
+        """
+        Returns the frame pixels covered by an exposed rectangle of the item
+        :param exposed: QtCore.QRectF() - item coordinates
+        :return: tuple() - (x0, y0, x1, y1) or None if nothing of the frame is exposed
+        """
+        (h, w) = self.frame.shape[:2]
+        r = exposed.intersected(self.boundingRect()).translated(-self.offset())
+        if r.isEmpty():
+            return None
+
+        m = self.MARGIN
+        (x0, y0) = (min(max(0, int(np.floor(r.left() * self.ratio)) - m), w), min(max(0, int(np.floor(r.top() * self.ratio)) - m), h))
+        (x1, y1) = (min(max(x0, int(np.ceil(r.right() * self.ratio)) + m), w), min(max(y0, int(np.ceil(r.bottom() * self.ratio)) + m), h))
+        if x1 <= x0 or y1 <= y0:
+            return None
+        return (x0, y0, x1, y1)
+
+    def uploadTexture(self, bsmooth, region):
+        """
+        Updates the texture by the visible region of the frame - storage is allocated only for a new size or format
+        Repaints of the same frame upload only the part which was not visible yet
+        :param bsmooth: bool() - linear filtering
+        :param region: tuple() - (x0, y0, x1, y1) frame pixels to be shown
+        :return:
+        """
+        img = self.frame
+        (h, w, c) = img.shape
+        key = (w, h, c)
+
+        if self.texture is None or self.texture_key != key:
+            if self.texture is not None:
+                self.texture.destroy()
+
+            tex = QtGui.QOpenGLTexture(QtGui.QOpenGLTexture.Target2D)
+            tex.setFormat(QtGui.QOpenGLTexture.R8_UNorm if c == 1 else QtGui.QOpenGLTexture.RGB8_UNorm)
+            tex.setSize(w, h)
+            tex.setMipLevels(1)
+            tex.setAutoMipMapGenerationEnabled(False)
+            tex.allocateStorage()
+            tex.setWrapMode(QtGui.QOpenGLTexture.ClampToEdge)
+
+            self.texture = tex
+            self.texture_key = key
+            self.texture_generation = None
+
+        f = QtGui.QOpenGLTexture.Linear if bsmooth else QtGui.QOpenGLTexture.Nearest
+        self.texture.setMinMagFilters(f, f)
+
+        if self.texture_generation != self.generation:
+            self.texture_generation = self.generation
+            self.texture_region = None
+
+        told = self.texture_region
+        if told is not None:
+            if told[0] <= region[0] and told[1] <= region[1] and told[2] >= region[2] and told[3] >= region[3]:
+                return
+            region = (min(told[0], region[0]), min(told[1], region[1]), max(told[2], region[2]), max(told[3], region[3]))
+
+        # rows of the region are contiguous in the frame - columns are selected by the unpack parameters
+        (x0, y0, x1, y1) = region
+        gl = self.gl
+        self.texture.bind(0)
+        gl.glPixelStorei(self.GL_UNPACK_ALIGNMENT, 1)
+        gl.glPixelStorei(self.GL_UNPACK_ROW_LENGTH, w)
+        gl.glPixelStorei(self.GL_UNPACK_SKIP_PIXELS, x0)
+        try:
+            gl.glTexSubImage2D(self.GL_TEXTURE_2D, 0, x0, y0, x1 - x0, y1 - y0,
+                               self.GL_RED if c == 1 else self.color_source, self.GL_UNSIGNED_BYTE, img[y0:y1])
+        finally:
+            gl.glPixelStorei(self.GL_UNPACK_SKIP_PIXELS, 0)
+            gl.glPixelStorei(self.GL_UNPACK_ROW_LENGTH, 0)
+            gl.glPixelStorei(self.GL_UNPACK_ALIGNMENT, 4)
+            self.texture.release(0)
+
+        self.texture_region = region
+
+    def paintNative(self, painter: QtGui.QPainter, exposed):
+        """
+        Draws the texture as a quad transformed by the painter
+        :param painter:
+        :param exposed: QtCore.QRectF() - exposed rectangle of the item
+        :return: bool() - True if the frame was drawn
+        """
+        if self.program is None and not self.prepNative():
+            self.bnative = False
+            return False
+
+        region = self.getRegion(exposed)
+        if region is None:
+            return True
+
+        self.uploadTexture(self.transformationMode() == QtCore.Qt.SmoothTransformation, region)
+
+        # item coordinates to the normalized device coordinates of the viewport
+        device = painter.device()
+        matrix = QtGui.QMatrix4x4()
+        matrix.ortho(0., device.width(), device.height(), 0., -1., 1.)
+        matrix = matrix * QtGui.QMatrix4x4(painter.combinedTransform())
+
+        r = self.boundingRect()
+        vertices = [QtGui.QVector2D(r.left(), r.top()), QtGui.QVector2D(r.right(), r.top()),
+                    QtGui.QVector2D(r.right(), r.bottom()), QtGui.QVector2D(r.left(), r.bottom())]
+        texcoords = [QtGui.QVector2D(0., 0.), QtGui.QVector2D(1., 0.), QtGui.QVector2D(1., 1.), QtGui.QVector2D(0., 1.)]
+
+        program = self.program
+        program.bind()
+        program.setUniformValue("matrix", matrix)
+        program.setUniformValue("frame", 0)
+        program.setUniformValue("mono", 1 if self.frame.shape[2] == 1 else 0)
+        program.enableAttributeArray(0)
+        program.enableAttributeArray(1)
+        program.setAttributeArray(0, vertices)
+        program.setAttributeArray(1, texcoords)
+
+        self.texture.bind(0)
+        self.gl.glDrawArrays(self.GL_TRIANGLE_FAN, 0, 4)
+        self.texture.release(0)
+
+        program.disableAttributeArray(0)
+        program.disableAttributeArray(1)
+        program.release()
+        return True
@@ -52,6 +52,9 @@ class MainWindow(QtWidgets.QMainWindow, Tester):
         self.view.setAlignment(QtCore.Qt.AlignCenter)
         self.view.setTransformationAnchor(QtWidgets.QGraphicsView.AnchorViewCenter)
 
+        if self.config.getcfOpenGLViewport():
+            self.prepOpenGLViewport()
+
         self.scene = QtWidgets.QGraphicsScene(parent=self.view)
 
         # make a layout
@@ -123,6 +126,14 @@ class MainWindow(QtWidgets.QMainWindow, Tester):
         self.status_bar = QtWidgets.QStatusBar(parent=self)
         self.setStatusBar(self.status_bar)
 
+        # permanent indication of the frame counters
+        self.lbl_frames = QtWidgets.QLabel(parent=self.status_bar)
+        self.status_bar.addPermanentWidget(self.lbl_frames)
+
+        # permanent indication of the focus metric
+        self.lbl_focus = QtWidgets.QLabel(parent=self.status_bar)
+        self.status_bar.addPermanentWidget(self.lbl_focus)
+
     def reportStatusBarMessage(self, msg):
         """
         Reports status bar message
@@ -130,6 +141,20 @@ class MainWindow(QtWidgets.QMainWindow, Tester):
         """
         self.status_bar.showMessage(msg, self.DEFAULT_STATUSMSG_TIMEOUT)
 
+    def reportFrameStats(self, msg):
+        """
+        Reports frame counters in the permanent part of the status bar
+        :return:
+        """
+        self.lbl_frames.setText(msg)
+
+    def reportFocus(self, msg):
+        """
+        Reports the focus metric in the permanent part of the status bar
+        :return:
+        """
+        self.lbl_focus.setText(msg)
+
     def getScene(self):
         """
         Returns QGraphicScene handle
@@ -155,6 +180,8 @@ class MainWindow(QtWidgets.QMainWindow, Tester):
         # controller
         self.ctrl = CtrlMainWindow(self.id, self.zmq, parent=self)
         self.ctrl.registerStatusMessage(self.reportStatusBarMessage)
+        self.ctrl.registerFrameStats(self.reportFrameStats)
+        self.ctrl.registerFocus(self.reportFocus)
         self.toolbarw.setController(self.ctrl)
 
         self.view.wheelEvent = self.processViewWheelEvent
@@ -182,6 +209,22 @@ class MainWindow(QtWidgets.QMainWindow, Tester):
             else:
                 self.ctrl.processZoomOut()
 
+    def prepOpenGLViewport(self):
+        """
+        Renders the view by OpenGL - frames are drawn from a texture, the view stays raster if no context is available
+        :return:
+        """
+        ctx = QtGui.QOpenGLContext()
+        if not ctx.create():
+            self.error("OpenGL context is not available, the view is rendered by the raster engine")
+            return
+
+        self.info("OpenGL viewport ({}.{})".format(*ctx.format().version()))
+        self.view.setViewport(QtWidgets.QOpenGLWidget())
+
+        # partial updates of a GL surface are not cheaper than full ones
+        self.view.setViewportUpdateMode(QtWidgets.QGraphicsView.FullViewportUpdate)
+
     def readConfiguration(self):
         pass
 
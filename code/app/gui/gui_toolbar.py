@@ -1,4 +1,5 @@
 from app.common.imports import *
+from app.common.keys import *
 from app.gui.UI.ui_toolbar import Ui_Form
 
 from app.config import main_config as config
@@ -118,6 +119,74 @@ class CameraToolbarWidget(QtWidgets.QWidget, Tester, Ui_Form):
         self.btn_playstop.toggled.connect(self.processPlayStop)
         self.btn_savefile.clicked.connect(self.processSaveFile)
 
+        # burst capture at the maximum frame rate
+        self.btn_burst = QtWidgets.QToolButton(self)
+        self.btn_burst.setMinimumSize(QtCore.QSize(30, 30))
+        self.btn_burst.setText("Burst")
+        self.btn_burst.setToolTip("Capture a burst of ({}) frames at the maximum rate".format(self.config.getcfBurstSize()))
+        self.btn_burst.setEnabled(False)
+        self.horizontalLayout.insertWidget(self.horizontalLayout.indexOf(self.btn_savefile) + 1, self.btn_burst)
+        self.btn_burst.clicked.connect(self.processBurst)
+
+        # temporal averaging of frames
+        self.cmb_average = QtWidgets.QComboBox(self)
+        self.cmb_average.setToolTip("Temporal averaging of frames")
+        for (mode, text) in zip(AVERAGE_MODES, ("Avg: off", "Avg: boxcar ({})".format(self.config.getcfAverageLength()), "Avg: EMA")):
+            self.cmb_average.addItem(text, mode)
+        self.cmb_average.setCurrentIndex(AVERAGE_MODES.index(self.config.getcfAverageMode()))
+        self.horizontalLayout.insertWidget(self.horizontalLayout.indexOf(self.btn_burst) + 1, self.cmb_average)
+        self.cmb_average.currentIndexChanged.connect(self.processAverageMode)
+
+        # laser spot detection
+        self.cb_spot = QtWidgets.QCheckBox("Spot", self)
+        self.cb_spot.setToolTip("Detection of the laser spot - centroid and FWHM")
+        self.cb_spot.setChecked(bool(self.config.getcfSpotDetection()))
+        self.horizontalLayout.insertWidget(self.horizontalLayout.indexOf(self.cmb_average) + 1, self.cb_spot)
+        self.cb_spot.toggled.connect(self.processSpotDetection)
+
+        # gasket hole detection - the marker follows the detected hole
+        self.cb_hole = QtWidgets.QCheckBox("Hole", self)
+        self.cb_hole.setToolTip("Detection of the gasket hole - the marker is fitted to the hole")
+        self.cb_hole.setChecked(bool(self.config.getcfHoleDetection()))
+        self.horizontalLayout.insertWidget(self.horizontalLayout.indexOf(self.cb_spot) + 1, self.cb_hole)
+        self.cb_hole.toggled.connect(self.processHoleDetection)
+
+        # acquisition of the marker region only - the camera reads out less, binning is optional
+        self.cb_roi = QtWidgets.QCheckBox("ROI", self)
+        self.cb_roi.setToolTip("Acquisition of the marker rectangle only, binning ({})".format(self.config.getcfRoiBinning()))
+        self.cb_roi.setChecked(bool(self.config.getcfRoiAcquisition()))
+        self.horizontalLayout.insertWidget(self.horizontalLayout.indexOf(self.cb_hole) + 1, self.cb_roi)
+        self.cb_roi.toggled.connect(self.processRoiAcquisition)
+
+        # focus metric of the marker region and the autofocus scan
+        self.cmb_focus = QtWidgets.QComboBox(self)
+        self.cmb_focus.setToolTip("Focus metric of the marker region")
+        for (method, text) in zip(FOCUS_METHODS, ("Focus: off", "Focus: Laplacian", "Focus: Tenengrad", "Focus: Brenner")):
+            self.cmb_focus.addItem(text, method)
+        self.cmb_focus.setCurrentIndex(FOCUS_METHODS.index(self.config.getcfFocusMethod()))
+        self.horizontalLayout.insertWidget(self.horizontalLayout.indexOf(self.cb_roi) + 1, self.cmb_focus)
+        self.cmb_focus.currentIndexChanged.connect(self.processFocusMethod)
+
+        self.btn_autofocus = QtWidgets.QToolButton(self)
+        self.btn_autofocus.setMinimumSize(QtCore.QSize(30, 30))
+        self.btn_autofocus.setText("AF")
+        self.btn_autofocus.setToolTip("Autofocus by the Z move of a plugin - the focus metric is maximized, click again to stop")
+        self.btn_autofocus.setEnabled(False)
+        self.horizontalLayout.insertWidget(self.horizontalLayout.indexOf(self.cmb_focus) + 1, self.btn_autofocus)
+        self.btn_autofocus.clicked.connect(self.processAutofocus)
+
+        # display clock - the newest frame is rendered at a fixed rate, acquisition and analysis see every frame
+        self.cmb_display = QtWidgets.QComboBox(self)
+        self.cmb_display.setToolTip("Display rate - the newest frame is shown on every tick")
+        for rate in DISPLAY_RATES:
+            self.cmb_display.addItem("Display: {} Hz".format(rate) if rate > 0 else "Display: all", rate)
+        rate = self.config.getcfDisplayRate()
+        if rate not in DISPLAY_RATES:
+            self.cmb_display.addItem("Display: {} Hz".format(rate), rate)
+        self.cmb_display.setCurrentIndex(self.cmb_display.findData(rate))
+        self.horizontalLayout.insertWidget(self.horizontalLayout.indexOf(self.btn_autofocus) + 1, self.cmb_display)
+        self.cmb_display.currentIndexChanged.connect(self.processDisplayRate)
+
         # visibility of objects
         self.cb_frame.toggled.connect(self.processShowHideFrame)
         self.cb_marker.toggled.connect(self.processShowHideMarker)
@@ -263,6 +332,9 @@ class CameraToolbarWidget(QtWidgets.QWidget, Tester, Ui_Form):
         else:
             self.stw_plugins.setEnabled(False)
 
+        self.btn_burst.setEnabled(bstate)
+        self.btn_autofocus.setEnabled(bstate)
+
         # disable the exposure/gain control
         if bstate:
             self.lbl_exposure.setEnabled(True)
@@ -409,6 +481,8 @@ class CameraToolbarWidget(QtWidgets.QWidget, Tester, Ui_Form):
         self.btn_playstop.blockSignals(True)
         self.btn_playstop.setChecked(False)
         self.stw_plugins.setEnabled(False)
+        self.btn_burst.setEnabled(False)
+        self.btn_autofocus.setEnabled(False)
         self.btn_playstop.blockSignals(False)
 
         # resets values in the controller
@@ -456,6 +530,8 @@ class CameraToolbarWidget(QtWidgets.QWidget, Tester, Ui_Form):
             self.btn_playstop.setEnabled(False)
             self.btn_playstop.setChecked(False)
             self.stw_plugins.setEnabled(False)
+            self.btn_burst.setEnabled(False)
+            self.btn_autofocus.setEnabled(False)
             self.lbl_exposure.setEnabled(False)
             self.lbl_gain.setEnabled(False)
 
@@ -513,6 +589,100 @@ class CameraToolbarWidget(QtWidgets.QWidget, Tester, Ui_Form):
             except AttributeError:
                 pass
 
+    def processAverageMode(self, index):
+        """
+        Processes a change of the temporal averaging mode
+        :param index:
+        :return:
+        """
+        if self.ctrl is not None:
+            try:
+                self.ctrl.processAverageMode(self.cmb_average.itemData(index))
+            except AttributeError:
+                pass
+
+    def processSpotDetection(self, bstate):
+        """
+        Processes switching of the laser spot detection
+        :param bstate:
+        :return:
+        """
+        if self.ctrl is not None:
+            try:
+                self.ctrl.processSpotDetection(bstate)
+            except AttributeError:
+                pass
+
+    def processHoleDetection(self, bstate):
+        """
+        Processes switching of the gasket hole detection
+        :param bstate:
+        :return:
+        """
+        if self.ctrl is not None:
+            try:
+                self.ctrl.processHoleDetection(bstate)
+            except AttributeError:
+                pass
+
+    def processRoiAcquisition(self, bstate):
+        """
+        Processes switching of the region acquisition
+        :param bstate:
+        :return:
+        """
+        if self.ctrl is not None:
+            try:
+                self.ctrl.processRoiAcquisition(bstate)
+            except AttributeError:
+                pass
+
+    def processFocusMethod(self, index):
+        """
+        Processes a change of the focus metric
+        :param index:
+        :return:
+        """
+        if self.ctrl is not None:
+            try:
+                self.ctrl.processFocusMethod(self.cmb_focus.itemData(index))
+            except AttributeError:
+                pass
+
+    def processDisplayRate(self, index):
+        """
+        Processes a change of the display clock
+        :param index:
+        :return:
+        """
+        if self.ctrl is not None:
+            try:
+                self.ctrl.processDisplayRate(self.cmb_display.itemData(index))
+            except AttributeError:
+                pass
+
+    def processAutofocus(self):
+        """
+        Processes start and stop of the autofocus scan
+        :return:
+        """
+        if self.ctrl is not None:
+            try:
+                self.ctrl.processAutofocus()
+            except AttributeError:
+                pass
+
+    def processBurst(self):
+        """
+        Processes burst capture
+        :return:
+        """
+        if self.ctrl is not None:
+            try:
+                self.ctrl.processBurst()
+            except AttributeError:
+                pass
+
     def closeEvent(self, ev):
         """
         Performes cleanup of close event
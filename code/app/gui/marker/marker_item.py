@@ -74,8 +74,10 @@ class MarkerItem(QtWidgets.QGraphicsItemGroup):
         # simple rect
         rect = QtCore.QRectF(-self.w / 2+self.x, -self.h / 2+self.y, self.w, self.h)
 
+        # cosmetic pen - the width does not depend on the zoom
         pen = QtGui.QPen(self.color)
         pen.setWidth(self.penwidth)
+        pen.setCosmetic(True)
 
         # prepare individual shapes
         self.prepEllipse(rect)
@@ -371,6 +373,23 @@ class MarkerItem(QtWidgets.QGraphicsItemGroup):
         self.applyChangeXY()
 
 
+    def setGeometry(self, x, y, width, height, shape=None):
+        """
+        Places the marker at a position and resizes it - scene coordinates
+        :param x: center
+        :param y:
+        :param width:
+        :param height:
+        :param shape: int() - index of the visible shape, None - unchanged
+        :return:
+        """
+        if shape is not None and shape != self.shapenum:
+            self.changeMarkerShapeByStep(step=shape - self.shapenum)
+
+        self.doHResizeBy(width - self.w)
+        self.doVResizeBy(height - self.h)
+        self.doMoveBy(x - self.x, y - self.y)
+
     def registerChangeXY(self, dx=None, dy=None):
         """
         Registers changes applied to the marker
@@ -1,5 +1,8 @@
+import time
 import threading
 
+from app.common.tester import Tester
+
 try:
     from Queue import Queue, Empty
 except ImportError:
@@ -84,3 +87,77 @@ class TangoMover(object):
                 self.qquit.task_done()
             except Empty:
                 pass
+
+
+class TangoFocuser(Tester):
+    """
+    Class wrapping a blocking relative movement of a single Tango motor - Z of the autofocus
+    Unlike TangoMover the call returns only once the motor has reached the target, errors are raised to the caller
+    """
+    ATTR_POSITION = "Position"
+
+    POLL_PERIOD = 0.05          # seconds between state reads while the motor moves
+    START_TIMEOUT = 2.          # seconds for the server to report the motion or a new position
+    TOLERANCE = 0.01            # fraction of the step the read back position may differ by
+
+    def __init__(self, devname, conv, brealmove=False, timeout=60.):
+        Tester.__init__(self, def_file="{}".format(self.__class__.__name__.lower()))
+
+        # device name and conversion factor of the motor
+        self.devname = devname
+        self.conv = conv
+
+        # flag indicating if movement should be actually implemented - debugging reasons
+        # the autofocus needs real moves: a scan without them would only evaluate noise
+        self.brealmove = brealmove
+
+        # seconds after which a move is considered stuck
+        self.timeout = timeout
+
+    def run(self, dz=None):
+        """
+        Performs a relative movement and waits for the motor to reach the new position
+        """
+        if dz is None or dz == 0:
+            return
+
+        if not self.brealmove:
+            raise RuntimeError("Movements of the device ({}) are disabled".format(self.devname))
+
+        d = DeviceProxy(self.devname)
+        d.ping()
+
+        state = d.state()
+        if state not in (DevState.ON, DevState.ALARM):
+            raise RuntimeError("Device ({}) is not ready ({})".format(self.devname, state))
+
+        dv = self.conv * dz
+        old_pos = d.read_attribute(self.ATTR_POSITION).value
+        new_pos = old_pos + dv
+        tolerance = abs(dv) * self.TOLERANCE
+
+        self.info("Moving device {} from {:6.4f} to {:6.4f}".format(self.devname, old_pos, new_pos))
+        d.write_attribute(self.ATTR_POSITION, new_pos)
+
+        # the server may still report ON right after the write - the move is done only once the motion was seen
+        # or the position has changed
+        bmoving = False
+        ts = time.time()
+        while True:
+            state = d.state()
+            if state == DevState.MOVING:
+                bmoving = True
+            elif state in (DevState.ON, DevState.ALARM):
+                pos = d.read_attribute(self.ATTR_POSITION).value
+                if abs(pos - new_pos) <= tolerance:
+                    break
+                if bmoving:
+                    raise RuntimeError("Device ({}) stopped at {:6.4f} instead of {:6.4f}".format(self.devname, pos, new_pos))
+                if time.time() - ts > self.START_TIMEOUT:
+                    raise RuntimeError("Device ({}) did not start moving".format(self.devname))
+            else:
+                raise RuntimeError("Device ({}) stopped in state ({})".format(self.devname, state))
+
+            if time.time() - ts > self.timeout:
+                raise RuntimeError("Device ({}) is still moving after ({}) s".format(self.devname, self.timeout))
+            time.sleep(self.POLL_PERIOD)
@@ -42,6 +42,11 @@ class Starter(Tester):
         self.camera_id = args.id
         self.config.setCameraID(self.camera_id)
 
+        # frame rate from the command line overrides the configuration file
+        fps = getattr(args, "fps", None)
+        if fps is not None:
+            self.config.setFrameRate(fps)
+
         self.zmq = args.zmq
 
         # real application
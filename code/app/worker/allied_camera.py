@@ -1,39 +1,71 @@
 from app.common.imports import *
 from app.common.keys import *
 
-import gc
+from app.worker.frame_queue import *
+from app.worker.frame_pool import *
+from app.worker.feature_cache import *
+from app.worker.command_engine import *
+from app.worker.frame_rate import *
+from app.worker.frame_burst import *
+from app.worker.demosaic import *
+from app.worker.frame_pipeline import *
+from app.worker.frame_correction import *
+from app.worker.frame_average import *
+from app.worker.spot_detector import *
+from app.worker.hole_detector import *
+from app.worker.display_mapper import *
+from app.worker.view_converter import *
+from app.worker.focus_metric import *
 
 from vimba import Vimba, Camera, Frame, FrameStatus, VimbaCameraError, VimbaTimeout, VimbaFeatureError, intersect_pixel_formats, OPENCV_PIXEL_FORMATS, COLOR_PIXEL_FORMATS, MONO_PIXEL_FORMATS, feature, AccessMode, PixelFormat
 
 __all__ = ["ThreadCameraAllied", "Frame"]
 
-def frame_handler(cam: Camera, frame: Frame):
-    """
-    Callback function handles frames and passes them into the feedback object if necessary
-    :return:
-    """
-    print("Camera {}; Frame {}".format(cam.get_id(), frame))
-
-    cam.queue_frame(frame)
-
 class ThreadCameraAllied(threading.Thread, Tester):
 
     QUEUE_STOP_MSG = QUEUE_STOP_MSG
 
     WAIT_STEPS = 5
 
-    SYNC_FRAMERATE = 10     # SYNC_SLEEP/SYNC_FRAMERATE - max delay
-    SYNC_SLEEP = 1.         # seconds
+    SYNC_FRAMERATE = 10.    # Hz - default target frame rate
     SYNC_FRAMETIMEOUT = 10.  # seconds - important timeout frame control
 
+    STREAM_BUFFER_COUNT = 5  # vimba frame buffers announced for the continuous stream
+    STREAM_QUEUE_SIZE = 2    # converted frames waiting for the acquisition loop
+    STREAM_QUEUE_POLICY = FrameQueue.POLICY_DROP_OLDEST
+
+    POOL_RESERVE = 4         # frame buffers outside of the queue - filled, in flight, displayed
+
+    # unpacked high bit depth mono formats - 16-bit containers, deepest first
+    HIGH_DEPTH_FORMATS = ((PixelFormat.Mono16, 16), (PixelFormat.Mono14, 14), (PixelFormat.Mono12, 12),
+                          (PixelFormat.Mono10, 10))
+
     CAMERA_FEATURE_UPDATE = 1. # delay between reported camera feature updates
 
+    MEGABYTE = 1024. * 1024.
+
+    FEATURE_LIST = (CAMERA_EXPOSUREABS, CAMERA_EXPOSURE_MODE,
+                    CAMERA_GAIN, CAMERA_GAIN_RAW, CAMERA_GAIN_MODE,
+                    CAMERA_GAINMAX, CAMERA_GAINMIN,
+                    CAMERA_EXPOSURE,
+                    CAMERA_WIDTH, CAMERA_HEIGHT)
+
+    # auto modes are switched before the values they would otherwise override
+    COMMAND_ORDER = (CAMERA_GAIN_MODE, CAMERA_EXPOSURE_MODE, CAMERA_EXPOSUREMERGED, CAMERA_GAINMERGED)
+
     CAMERA_MAX = 10000000 # in ms
     CAMERA_MIN = 21  # in ms
 
     def __init__(self, id: str, obj_feedback: QtCore.QObject, queue_stop: queue.Queue,
                  frame_count=-1, sleep_delay=0.5,
-                 basync=False, queue_cmd=None):
+                 basync=False, queue_cmd=None, bstream=True,
+                 queue_size=None, queue_policy=None, pool_size=None, frame_rate=None,
+                 demosaic_mode=None, demosaic_bands=0, pipeline=None, reference_dir=None,
+                 average_mode=None, average_length=None, average_alpha=None,
+                 spot_detection=False, spot_threshold=None, spot_roi=None, spot_gaussian=False, spot_every=1,
+                 hole_detection=False, hole_levels=None,
+                 mono_bits=8, display_window=None, display_gamma=1., roi=None, binning=None, focus_method=None,
+                 color_order=COLOR_ORDER_BGR):
         """
         Class constructor
         :param id: str() - camera ID
@@ -43,6 +75,32 @@ class ThreadCameraAllied(threading.Thread, Tester):
         :param sleep_delay: float() - delay to sleep inbetween tests for the message to stop the proccess
         :param sleep_delay: float() - delay to sleep inbetween tests for the message to stop the proccess
         :param queue_cmd: queue.Queue () - queue to pass commands - changing acquisition, gain, etc.
+        :param bstream: bool() - synchronous mode keeps the camera stream open instead of starting it for every frame
+        :param queue_size: int() - maximum number of converted frames waiting for the consumer
+        :param queue_policy: str() - frame dropped on overflow - FrameQueue.POLICY_DROP_OLDEST or POLICY_DROP_NEWEST
+        :param pool_size: int() - number of preallocated frame buffers shared with the controller
+        :param frame_rate: float() - target frame rate (Hz), <=0 - maximum rate of the camera
+        :param demosaic_mode: str() - demosaicing of bayer frames, BayerDemosaic.MODES
+        :param demosaic_bands: int() - row bands demosaiced in parallel, <=0 - number of cpu cores
+        :param pipeline: list() - processing stages between acquisition and display, see FramePipeline.create_stages()
+        :param reference_dir: str() - folder of the dark/flat reference frames
+        :param average_mode: str() - temporal averaging - off, boxcar, ema
+        :param average_length: int() - number of frames of the boxcar average
+        :param average_alpha: float() - weight of the last frame of the exponential moving average
+        :param spot_detection: bool() - laser spot detection state
+        :param spot_threshold: float() - threshold of the spot detection, fraction of the peak above the background
+        :param spot_roi: list() - [x, y, width, height] region of the spot detection, None - full frame
+        :param spot_gaussian: bool() - refines the spot position by a 2D gaussian fit
+        :param spot_every: int() - minimum frame step between frames analysed by the spot detection
+        :param hole_detection: bool() - gasket hole detection state
+        :param hole_levels: int() - pyramid level of the gasket hole detection
+        :param mono_bits: int() - maximum bit depth of mono formats, >8 - Mono10/12/14/16 mapped to 8 bits for display
+        :param display_window: list() - [black, white] display levels of high bit depth frames, None - full range
+        :param display_gamma: float() - display gamma of high bit depth frames
+        :param roi: list() - acquired region [x, y, width, height] in sensor pixels, [] - full frame, None - unchanged
+        :param binning: int() - horizontal and vertical binning, None - unchanged
+        :param focus_method: str() - focus metric - off, laplacian, tenengrad, brenner
+        :param color_order: str() - channel order of color frames passed to the display - bgr, rgb
         """
         threading.Thread.__init__(self)
         Tester.__init__(self, def_file="{}-{}".format(self.__class__.__name__, threading.current_thread().name))
@@ -67,6 +125,69 @@ class ThreadCameraAllied(threading.Thread, Tester):
         # flag controls type of data collection True: asynchronous; False: synchronous
         self.basync = basync
 
+        # flag controls synchronous mode True: continuous stream; False: acquisition started for every frame
+        self.bstream = bstream
+
+        # converted frames of the continuous stream
+        self.qframes = None
+        self.queue_size = queue_size if isinstance(queue_size, int) and queue_size > 0 else self.STREAM_QUEUE_SIZE
+        self.queue_policy = queue_policy if queue_policy in FrameQueue.POLICIES else self.STREAM_QUEUE_POLICY
+
+        # time of the last reported frame
+        self.ts_frame = None
+
+        # preallocated frame buffers - passed to the controller, which releases them after display
+        if not isinstance(pool_size, int) or pool_size < self.queue_size + self.POOL_RESERVE:
+            pool_size = self.queue_size + self.POOL_RESERVE
+        self.pool = FramePool(pool_size)
+
+        # bayer frames - raw buffers are copied by the vimba callback, demosaiced by the consumer into color buffers
+        self.pool_color = FramePool(pool_size)
+
+        # channel order of color frames - set once by the conversion from the camera, never swizzled afterwards
+        self.color_order = color_order if color_order in (COLOR_ORDER_BGR, COLOR_ORDER_RGB) else COLOR_ORDER_BGR
+
+        self.demosaic = None
+        self.demosaic_mode = demosaic_mode if demosaic_mode in BayerDemosaic.MODES else BayerDemosaic.MODE_BILINEAR
+        self.demosaic_bands = demosaic_bands
+
+        # high bit depth mono frames - raw buffers stay attached to 8-bit display buffers mapped by a lookup table
+        self.pool_display = FramePool(pool_size)
+
+        # visible region of the display at the screen resolution - full frames stay attached to the views
+        self.pool_view = FramePool(pool_size)
+        self.viewer = ViewConverter()
+
+        self.mapper = None
+        self.mono_bits = mono_bits if isinstance(mono_bits, int) else 8
+        self.display_window = display_window
+        self.display_gamma = display_gamma
+
+        # processing stages between acquisition and display
+        self.pipeline_spec = pipeline
+        self.pipeline = None
+        self.pipeline_names = []
+
+        # dark-frame and flat-field correction - pipeline stage "dark_flat"
+        self.correction = None
+        if isinstance(reference_dir, str):
+            self.correction = FrameCorrection(self.camid, reference_dir)
+
+        # temporal averaging - pipeline stage "average", applied before the pipeline if the stage is not declared
+        self.averager = FrameAverager(mode=average_mode, length=average_length, alpha=average_alpha)
+
+        # laser spot detection - pipeline stage "spot", applied before the pipeline if the stage is not declared
+        self.spot = SpotDetector(output=self.report_spot, benabled=bool(spot_detection), threshold=spot_threshold,
+                                 roi=spot_roi, bgauss=bool(spot_gaussian), every=spot_every, order=self.color_order)
+
+        # gasket hole detection - pipeline stage "hole", applied before the pipeline if the stage is not declared
+        self.hole = HoleDetector(output=self.report_hole, benabled=bool(hole_detection), levels=hole_levels,
+                                 order=self.color_order)
+
+        # focus metric of the marker region - pipeline stage "focus", applied before the pipeline if the stage is not declared
+        self.focus = FocusMetric(output=self.report_focus, method=focus_method if focus_method is not None else FOCUS_OFF,
+                                 order=self.color_order)
+
         # camera exposure feature name
         self.cam_exposure_feature = None
         self.cam_gain_feature = None
@@ -74,16 +195,32 @@ class ThreadCameraAllied(threading.Thread, Tester):
         # frame rate
         self.frame_rate_real = 0.
 
+        # target frame rate - set on the camera or paced on the host
+        if frame_rate is None:
+            frame_rate = self.SYNC_FRAMERATE
+        self.governor = FrameRateGovernor(frame_rate)
+
         # feature update time
         self.ts_features = 0
 
-        # dictionary with saved commands
-        self.cmddict = {
-            CAMERA_EXPOSUREMERGED: None,
-            CAMERA_GAIN: None,
-            CAMERA_GAIN_MODE: None,
-            CAMERA_EXPOSURE_MODE: None
-        }
+        # feature values of the camera session
+        self.feature_cache = None
+
+        # acquired region - changes are applied by the acquisition loop, the stream is restarted
+        self.roi_lock = threading.Lock()
+        self.roi_request = None
+        self.request_roi(roi=roi, binning=binning)
+
+        # acquired region [x, y, width, height, sensor width, sensor height] in unbinned sensor pixels
+        self.roi_geometry = None
+
+        # burst capture - requested number of frames, burst in progress
+        self.burst_request = None
+        self.burst_lock = threading.Lock()
+        self.burst = None
+
+        # thread applying commands independently of the frame cadence
+        self.command_engine = None
 
         self.cam_alive = False
         self.cam_alive_lock = threading.Lock()
@@ -94,6 +231,7 @@ class ThreadCameraAllied(threading.Thread, Tester):
         self.camera_state = True
 
         self.pixel_format = None
+        self.pixel_bits = 8
 
     def is_camalive(self):
         """
@@ -193,8 +331,13 @@ class ThreadCameraAllied(threading.Thread, Tester):
                         self.pixel_format = PixelFormat.BayerRG8
                     else:
                         mono_fmts = intersect_pixel_formats(cv_fmts, MONO_PIXEL_FORMATS)
+                        deep_fmts = [(f, bits) for (f, bits) in self.HIGH_DEPTH_FORMATS if f in cam_fmts and bits <= self.mono_bits]
 
-                        if mono_fmts:
+                        if deep_fmts:
+                            self.debug("Found high bit depth monocolor pixel formats ({})".format(deep_fmts))
+                            cam.set_pixel_format(deep_fmts[0][0])
+                            (self.pixel_format, self.pixel_bits) = deep_fmts[0]
+                        elif mono_fmts:
                             self.debug("Found monocolor pixel formats")
                             cam.set_pixel_format(mono_fmts[0])
                             self.pixel_format = mono_fmts[0]
@@ -223,10 +366,40 @@ class ThreadCameraAllied(threading.Thread, Tester):
                         self.handle_error("Camera does not support known pixel formats")
                         return
 
+                    if self.pixel_format == PixelFormat.BayerRG8:
+                        # raw buffers stay attached to the color frames - extra raw buffers for the queue
+                        self.pool = FramePool(self.pool_color.size + self.queue_size + self.POOL_RESERVE)
+                        self.demosaic = BayerDemosaic(self.demosaic_bands, order=self.color_order)
+                        self.debug("Demosaicing ({}) in ({}) bands".format(self.demosaic_mode, self.demosaic.bands))
+
+                    if self.pixel_bits > 8:
+                        # raw buffers stay attached to the display frames - extra raw buffers for the queue
+                        self.pool = FramePool(self.pool_display.size + self.queue_size + self.POOL_RESERVE)
+                        self.mapper = DisplayMapper(self.pixel_bits, window=self.display_window, gamma=self.display_gamma)
+
+                    if self.correction is not None:
+                        self.correction.load()
+
+                    self.start_pipeline()
+
+                    self.test_roi(cam)
+                    self.read_roi(cam)
+
                     self.debug("Camera {} exists".format(self.camid))
 
                     # start data collection in async way
                     try:
+                        self.feature_cache = FeatureCache(cam, self.FEATURE_LIST)
+                        self.feature_cache.open()
+                        self.resolve_features()
+                        self.governor.open(cam)
+
+                        if self._test_queue_commands():
+                            self.command_engine = ThreadCommandEngine(self.qcommands,
+                                                                      lambda k, v: self.apply_command(cam, k, v),
+                                                                      order=self.COMMAND_ORDER)
+                            self.command_engine.start()
+
                         if self.basync:
                             self.work_async(cam)
                         else:
@@ -235,6 +408,15 @@ class ThreadCameraAllied(threading.Thread, Tester):
                         # disconnection issue
                         msg = "Camera error: {}".format(e)
                         self.handle_error(msg)
+                    finally:
+                        # commands have to be finished before the camera is closed
+                        if self.command_engine is not None:
+                            self.command_engine.stop()
+
+                        if self.feature_cache is not None:
+                            self.feature_cache.close()
+
+                        self.governor.close()
 
             except AttributeError as e:
                 # handle an issue of camera accessibility
@@ -242,6 +424,21 @@ class ThreadCameraAllied(threading.Thread, Tester):
                 return
             except VimbaCameraError:
                 self.handle_error("Issue with reading the camera. Is VimbaViewer is running?")
+            finally:
+                if self.pipeline is not None:
+                    self.pipeline.stop()
+
+                # buffers still owned by the controller are discarded on release
+                self.pool.close()
+                self.pool_color.close()
+                self.pool_display.close()
+                self.pool_view.close()
+
+                if self.demosaic is not None:
+                    self.demosaic.close()
+
+                if self.correction is not None:
+                    self.correction.close()
 
     def handle_error(self, msg):
         """
@@ -265,15 +462,629 @@ class ThreadCameraAllied(threading.Thread, Tester):
         with self.cam_alive_lock:
             self.cam_alive = v
 
+    def test_stop(self):
+        """
+        Tests the queue used to stop the thread
+        :return: bool() - True if the thread has to stop
+        """
+        res = False
+        try:
+            self.qstop.get(block=False)
+            self.qstop.task_done()
+            res = True
+        except queue.Empty:
+            pass
+        return res
+
+    def resolve_features(self):
+        """
+        Selects exposure and gain features supported by the camera - commands can be applied before the first feature report
+        :return:
+        """
+        for f in (CAMERA_EXPOSUREABS, CAMERA_EXPOSURE):
+            if not self._test_cam_exposure_feature() and self.feature_cache.get(f) is not None:
+                self.debug("Setting camera exposure feature ({})".format(f))
+                self.cam_exposure_feature = f
+
+        for f in (CAMERA_GAIN, CAMERA_GAIN_RAW):
+            if not self._test_cam_gain_feature() and self.feature_cache.get(f) is not None:
+                self.debug("Setting camera gain feature ({})".format(f))
+                self.cam_gain_feature = f
+
+    def apply_command(self, cam: Camera, k, v):
+        """
+        Applies an external command (gain, exposure, etc.) to the camera
+        Executed by the command engine thread
+        :param cam:
+        :param k: str() - command key
+        :param v: value
+        :return: bool() - True if the command was applied
+        """
+        res = False
+        if v is None:
+            return res
+
+        try:
+            tf = None
+            if k == CAMERA_EXPOSUREMERGED and self._test_cam_exposure_feature():
+                tf = self.cam_exposure_feature
+            elif k == CAMERA_GAINMERGED and self._test_cam_gain_feature():
+                tf = self.cam_gain_feature
+            elif k in (CAMERA_GAIN_MODE, CAMERA_EXPOSURE_MODE):
+                tf = k
+            elif k == CAMERA_FRAME_RATE:
+                self.governor.set_rate(v)
+                return True
+            elif k == CAMERA_BURST:
+                return self.request_burst(v)
+            elif k == CAMERA_ROI:
+                return self.request_roi(roi=v)
+            elif k == CAMERA_BINNING:
+                return self.request_roi(binning=v)
+            elif k in (CAMERA_REFERENCE_DARK, CAMERA_REFERENCE_FLAT, CAMERA_REFERENCE_CLEAR):
+                return self.apply_reference_command(k, v)
+            elif k == CAMERA_AVERAGE:
+                return self.averager.set_params(mode=v)
+            elif k == CAMERA_AVERAGE_LENGTH:
+                return self.averager.set_params(length=v)
+            elif k == CAMERA_AVERAGE_ALPHA:
+                return self.averager.set_params(alpha=v)
+            elif k == CAMERA_SPOT:
+                return self.spot.set_params(benabled=v)
+            elif k == CAMERA_SPOT_THRESHOLD:
+                return self.spot.set_params(threshold=v)
+            elif k == CAMERA_SPOT_ROI:
+                return self.spot.set_params(roi=v)
+            elif k == CAMERA_SPOT_GAUSSIAN:
+                return self.spot.set_params(bgauss=v)
+            elif k == CAMERA_SPOT_EVERY:
+                return self.spot.set_params(every=v)
+            elif k == CAMERA_HOLE:
+                return self.hole.set_params(benabled=v)
+            elif k == CAMERA_HOLE_LEVELS:
+                return self.hole.set_params(levels=v)
+            elif k == CAMERA_FOCUS:
+                return self.focus.set_params(method=v)
+            elif k == CAMERA_FOCUS_ROI:
+                return self.focus.set_params(roi=v)
+            elif k in (CAMERA_DISPLAY_WINDOW, CAMERA_DISPLAY_GAMMA) and self.mapper is not None:
+                if k == CAMERA_DISPLAY_WINDOW:
+                    return self.mapper.set_params(window=v)
+                return self.mapper.set_params(gamma=v)
+
+            if tf is not None:
+                self.debug("Setting ({} -> {})".format(tf, v))
+                cam.get_feature_by_name(tf).set(v)
+                res = True
+            else:
+                self.debug("Command ({} -> {}) is not supported".format(k, v))
+        except (AttributeError, VimbaFeatureError, VimbaTimeout) as e:
+            self.error("Cannot apply command ({} -> {}): {}".format(k, v, e))
+        return res
+
+    def apply_reference_command(self, k, v):
+        """
+        Requests a capture of dark/flat references or removes them
+        :param k: str() - command key
+        :param v: number of averaged frames; dark, flat or all references to remove
+        :return: bool() - True if the command was applied
+        """
+        res = False
+        if self.correction is None:
+            self.error("Dark/flat references are not available")
+        elif k == CAMERA_REFERENCE_DARK:
+            res = self.correction.request(FrameCorrection.KIND_DARK, v)
+        elif k == CAMERA_REFERENCE_FLAT:
+            res = self.correction.request(FrameCorrection.KIND_FLAT, v)
+        else:
+            self.correction.clear(v)
+            res = True
+        return res
+
+    def convert_frame(self, frame: Frame):
+        """
+        Converts a complete vimba frame into a preallocated buffer of the pool
+        :param frame:
+        :return: FrameBuffer() - buffer independent of the vimba frame, None if the pool is exhausted
+        """
+        ts = time.perf_counter()
+        (src, shape) = self.get_frame_data(frame)
+
+        res = self.pool.acquire(shape, src.dtype)
+        if res is not None:
+            self.copy_frame(src, res.data)
+            self.fill_meta(frame, res)
+            res.ts_capture = ts
+        else:
+            self.debug("Frame pool is exhausted, frame is dropped")
+        return res
+
+    def fill_meta(self, frame: Frame, res: FrameBuffer):
+        """
+        Stores the metadata of a vimba frame in the frame record
+        Exposure and gain are the cached feature values at the time the frame arrives
+        :param frame:
+        :param res:
+        :return:
+        """
+        res.roi = self.roi_geometry
+        res.frame_id = frame.get_id()
+        res.timestamp = frame.get_timestamp()
+        res.pixel_format = self.pixel_format
+        (res.exposure, res.gain) = self.get_exposure_gain()
+
+    def get_exposure_gain(self):
+        """
+        Returns the cached exposure and gain of the camera
+        :return: tuple() - (exposure, gain), None - unknown
+        """
+        (exposure, gain) = (None, None)
+        if self.feature_cache is not None:
+            if self.cam_exposure_feature is not None:
+                exposure = self.feature_cache.get(self.cam_exposure_feature)
+            if self.cam_gain_feature is not None:
+                gain = self.feature_cache.get(self.cam_gain_feature)
+        return (exposure, gain)
+
+    def get_frame_data(self, frame: Frame):
+        """
+        Returns data of a vimba frame and the shape of its copy
+        :param frame:
+        :return: tuple() - (np.ndarray(), shape)
+        """
+        if self.pixel_format == PixelFormat.BayerRG8 or self.pixel_bits > 8:
+            # raw data - demosaiced or mapped for display later, outside of the vimba callback
+            src = frame.as_numpy_ndarray()
+            shape = src.shape
+        else:
+            # as_opencv_image() returns a view of the vimba buffer, which is requeued after the call
+            src = frame.as_opencv_image()
+            shape = src.shape
+        return (src, shape)
+
+    def copy_frame(self, src, dst):
+        """
+        Copies frame data into a destination array
+        Color frames of the camera are BGR - converted to RGB by the copy itself if the display needs it
+        :param src: np.ndarray() - data of a vimba frame
+        :param dst: np.ndarray() - destination
+        :return:
+        """
+        if self.color_order == COLOR_ORDER_RGB and src.ndim == 3 and src.shape[2] == 3:
+            cv2.cvtColor(src, cv2.COLOR_BGR2RGB, dst=dst)
+        else:
+            np.copyto(dst, src)
+
+    def demosaic_frame(self, img: FrameBuffer):
+        """
+        Demosaics a raw bayer frame into a color buffer, the raw buffer stays attached to it
+        Executed by the consumer of the frames - never by the vimba callback
+        :param img: FrameBuffer() - raw frame
+        :return: FrameBuffer() - color frame, None if the pool is exhausted
+        """
+        if self.demosaic is None:
+            return img
+
+        src = img.data
+        res = self.pool_color.acquire(self.demosaic.get_shape(src.shape, self.demosaic_mode), src.dtype)
+        if res is None:
+            self.debug("Color frame pool is exhausted, frame is dropped")
+            img.release()
+            return res
+
+        self.demosaic.process(src, res.data, self.demosaic_mode)
+        res.raw = img
+        res.copy_meta(img)
+        return res
+
+    def request_burst(self, count):
+        """
+        Requests a burst capture - executed by the acquisition loop
+        :param count: int() - number of frames
+        :return: bool() - True if the request is valid
+        """
+        res = False
+        try:
+            count = int(count)
+            if count > 0:
+                with self.burst_lock:
+                    self.burst_request = count
+                res = True
+        except (TypeError, ValueError):
+            pass
+
+        if not res:
+            self.error("Invalid burst request ({})".format(count))
+        return res
+
+    def request_roi(self, roi=None, binning=None):
+        """
+        Requests a change of the acquired region and binning - applied by the acquisition loop
+        :param roi: list() - [x, y, width, height] in unbinned sensor pixels, [] - full frame
+        :param binning: int() - horizontal and vertical binning
+        :return: bool() - True if the request is valid
+        """
+        if roi is not None and (not isinstance(roi, (list, tuple)) or len(roi) not in (0, 4)):
+            self.error("Invalid region ({})".format(roi))
+            return False
+
+        if roi is None and binning is None:
+            return False
+
+        with self.roi_lock:
+            if self.roi_request is None:
+                self.roi_request = {}
+            if roi is not None:
+                self.roi_request["roi"] = list(roi)
+            if binning is not None:
+                self.roi_request["binning"] = binning
+        return True
+
+    def test_roi(self, cam: Camera, bstreaming=False):
+        """
+        Applies a requested region - the region cannot change while the camera streams
+        :param cam:
+        :param bstreaming: bool() - True if the stream has to be restarted
+        :return:
+        """
+        with self.roi_lock:
+            request, self.roi_request = self.roi_request, None
+
+        if request is None:
+            return
+
+        if bstreaming:
+            try:
+                cam.stop_streaming()
+            except VimbaCameraError as e:
+                self.error("Issue with a camera?\n{}".format(e))
+
+        try:
+            self.apply_roi(cam, request.get("roi"), request.get("binning"))
+        finally:
+            if bstreaming:
+                cam.start_streaming(handler=self.frame_handler_async, buffer_count=self.STREAM_BUFFER_COUNT)
+
+    def snap_feature(self, cam: Camera, name, value):
+        """
+        Sets an integer feature to a valid value - clamped to its range, snapped down to its increment
+        :param cam:
+        :param name: str() - feature name
+        :param value:
+        :return: int() - value read back
+        """
+        f = cam.get_feature_by_name(name)
+        (vmin, vmax) = f.get_range()
+        inc = max(1, f.get_increment())
+
+        v = min(max(int(value), vmin), vmax)
+        v = vmin + ((v - vmin) // inc) * inc
+        f.set(v)
+        return f.get()
+
+    def get_binning(self, cam: Camera):
+        """
+        Returns horizontal and vertical binning, 1 if the camera does not support it
+        :param cam:
+        :return: tuple()
+        """
+        res = []
+        for name in (CAMERA_BINNING_HORIZONTAL, CAMERA_BINNING_VERTICAL):
+            try:
+                res.append(max(1, int(cam.get_feature_by_name(name).get())))
+            except (AttributeError, VimbaFeatureError, VimbaTimeout):
+                res.append(1)
+        return tuple(res)
+
+    def apply_roi(self, cam: Camera, roi=None, binning=None):
+        """
+        Sets binning, offsets and size of the acquired region snapped to the camera increments
+        :param cam:
+        :param roi: list() - [x, y, width, height] in unbinned sensor pixels, [] - full frame, None - unchanged
+        :param binning: int() - horizontal and vertical binning, None - unchanged
+        :return:
+        """
+        try:
+            if binning is not None:
+                for name in (CAMERA_BINNING_HORIZONTAL, CAMERA_BINNING_VERTICAL):
+                    try:
+                        self.snap_feature(cam, name, binning)
+                    except (AttributeError, VimbaFeatureError) as e:
+                        self.error("Cannot set binning ({} -> {}): {}".format(name, binning, e))
+
+            if roi is not None:
+                (bx, by) = self.get_binning(cam)
+
+                # offsets first - ranges of the width and the height depend on them
+                self.snap_feature(cam, CAMERA_OFFSETX, 0)
+                self.snap_feature(cam, CAMERA_OFFSETY, 0)
+
+                if len(roi) == 4:
+                    (x, y, w, h) = roi
+                    self.snap_feature(cam, CAMERA_ROI_WIDTH, w / bx)
+                    self.snap_feature(cam, CAMERA_ROI_HEIGHT, h / by)
+                    self.snap_feature(cam, CAMERA_OFFSETX, x / bx)
+                    self.snap_feature(cam, CAMERA_OFFSETY, y / by)
+                else:
+                    self.snap_feature(cam, CAMERA_ROI_WIDTH, cam.get_feature_by_name(CAMERA_WIDTHMAX).get())
+                    self.snap_feature(cam, CAMERA_ROI_HEIGHT, cam.get_feature_by_name(CAMERA_HEIGHTMAX).get())
+        except (AttributeError, VimbaFeatureError, VimbaTimeout, TypeError, ValueError) as e:
+            self.error("Cannot apply the region ({}) with binning ({}): {}".format(roi, binning, e))
+
+        self.read_roi(cam)
+        self.info("Acquired region ({})".format(self.roi_geometry))
+
+    def read_roi(self, cam: Camera):
+        """
+        Reads the acquired region attached to the frames
+        :param cam:
+        :return:
+        """
+        try:
+            (bx, by) = self.get_binning(cam)
+            (x, y, w, h, wmax, hmax) = [cam.get_feature_by_name(name).get() for name in (
+                CAMERA_OFFSETX, CAMERA_OFFSETY, CAMERA_ROI_WIDTH, CAMERA_ROI_HEIGHT, CAMERA_WIDTHMAX, CAMERA_HEIGHTMAX)]
+            self.roi_geometry = [x * bx, y * by, w * bx, h * by, wmax * bx, hmax * by]
+        except (AttributeError, VimbaFeatureError, VimbaTimeout) as e:
+            self.debug("Acquired region is not available: {}".format(e))
+            self.roi_geometry = None
+
+    def test_burst(self, cam: Camera, bstart=False):
+        """
+        Runs a requested burst capture
+        :param cam:
+        :param bstart: bool() - True if the camera stream has to be started for the burst
+        :return:
+        """
+        with self.burst_lock:
+            count, self.burst_request = self.burst_request, None
+
+        if count is not None:
+            self.run_burst(cam, count, bstart=bstart)
+
+    def run_burst(self, cam: Camera, count, bstart=False):
+        """
+        Captures a burst of frames at the maximum rate into a preallocated array
+        Frames of the burst are not displayed
+        :param cam:
+        :param count: int() - number of complete frames
+        :param bstart: bool() - True if the camera stream has to be started for the burst
+        :return:
+        """
+        burst = FrameBurst(count)
+        try:
+            if self.pool.shape is not None:
+                burst.allocate(self.pool.shape, self.pool.dtype)
+        except (MemoryError, ValueError) as e:
+            self.error("Cannot allocate memory for a burst of ({}) frames: {}".format(count, e))
+            return
+
+        (exposure, gain) = self.get_exposure_gain()
+        burst.set_meta(exposure=exposure, gain=gain, pixel_format=self.pixel_format)
+
+        self.info("Starting a burst of ({}) frames".format(count))
+
+        rate = self.governor.get_rate()
+        self.governor.set_rate(FrameRateGovernor.RATE_MAX)
+
+        self.burst = burst
+        try:
+            if bstart:
+                cam.start_streaming(handler=self.frame_handler_async, buffer_count=self.STREAM_BUFFER_COUNT)
+
+            # burst is aborted if no frame arrives within the timeout
+            received = -1
+            while not burst.wait(self.SYNC_FRAMETIMEOUT):
+                if burst.get_received() == received:
+                    self.error("Burst is aborted - no frames within ({} s)".format(self.SYNC_FRAMETIMEOUT))
+                    break
+                received = burst.get_received()
+        finally:
+            self.burst = None
+
+            if bstart:
+                try:
+                    cam.stop_streaming()
+                except VimbaCameraError as e:
+                    self.error("Issue with a camera?\n{}".format(e))
+
+            self.governor.set_rate(rate)
+
+        info = burst.get_info()
+        self.info("Burst finished: frames ({}/{}) at ({:.02f} Hz); incomplete frames ({})".format(
+            info["frames"], info["count"], info["fps"], info["incomplete"]))
+
+        try:
+            self.feedback.reportBurst(burst)
+        except AttributeError:
+            pass
+
+    def record_burst(self, burst: FrameBurst, frame: Frame):
+        """
+        Writes a vimba frame into the next slot of the burst array
+        Executed by the vimba transport thread
+        :param burst:
+        :param frame:
+        :return:
+        """
+        if frame.get_status() != FrameStatus.Complete:
+            burst.add_incomplete()
+            return
+
+        (src, shape) = self.get_frame_data(frame)
+        slot = burst.next_slot(shape, src.dtype)
+        if slot is None:
+            burst.add_incomplete()
+            return
+
+        # saved for analysis - color frames keep the BGR order of the camera whatever the display needs
+        np.copyto(slot, src)
+        burst.commit(frame.get_id(), frame.get_timestamp())
+
+    def get_frames_dropped(self):
+        """
+        Returns the number of frames dropped by the frame queue and due to frame pool exhaustion
+        :return:
+        """
+        res = self.pool.get_dropped() + self.pool_color.get_dropped() + self.pool_display.get_dropped() + \
+              self.pool_view.get_dropped()
+        if self.qframes is not None:
+            res += self.qframes.get_dropped()
+        if self.pipeline is not None:
+            res += self.pipeline.get_dropped()
+        return res
+
+    def start_pipeline(self):
+        """
+        Starts processing stages declared in the configuration
+        :return:
+        """
+        try:
+            factories = {}
+            if self.correction is not None:
+                factories[STAGE_DARK_FLAT] = lambda: self.correction.process
+            factories[STAGE_AVERAGE] = lambda **params: self.make_stage(self.averager, params)
+            factories[STAGE_SPOT] = lambda **params: self.make_stage(self.spot, params)
+            factories[STAGE_HOLE] = lambda **params: self.make_stage(self.hole, params)
+            factories[STAGE_FOCUS] = lambda **params: self.make_stage(self.focus, params)
+
+            stages = FramePipeline.create_stages(self.pipeline_spec, factories=factories)
+        except (ValueError, TypeError) as e:
+            self.error("Processing pipeline is disabled: {}".format(e))
+            stages = []
+
+        self.pipeline_names = [name for (name, func) in stages]
+
+        if len(stages) > 0:
+            self.pipeline = FramePipeline(stages, self.display_frame)
+            self.pipeline.start()
+
+    def make_stage(self, obj, params):
+        """
+        Returns the processing of a built-in stage - parameters of the pipeline declaration are applied to it
+        e.g. ["spot", {"threshold": 0.3, "every": 2}] or ["average", {"mode": "ema", "alpha": 0.1}]
+        :param obj: stage object with set_params() and process()
+        :param params: dict()
+        :return: callable(np.ndarray)
+        """
+        if len(params) > 0 and not obj.set_params(**params):
+            raise ValueError("Invalid parameters ({}) of the pipeline stage ({})".format(params, obj.__class__.__name__))
+        return obj.process
+
+    def set_viewport(self, region=None, zoom=1.):
+        """
+        Sets the region of the frames visible in the view - called by the controller
+        :param region: list() - [x, y, width, height] in frame pixels, None - full frame
+        :param zoom: float() - screen pixels per frame pixel
+        :return:
+        """
+        self.viewer.set_viewport(region=region, zoom=zoom)
+
+    def display_frame(self, img: FrameBuffer):
+        """
+        Passes a processed frame to the controller, high bit depth frames are mapped to 8 bits for display
+        The full depth frame stays attached to the display frame as raw
+        Only the visible region is passed at the screen resolution, the full frame stays attached to it
+        :param img:
+        :return:
+        """
+        if self.mapper is not None:
+            res = self.pool_display.acquire(img.data.shape, np.uint8)
+            if res is None:
+                self.debug("Display frame pool is exhausted, frame is dropped")
+                img.release()
+                return
+
+            self.mapper.process(img.data, res.data)
+            res.raw = img
+            res.copy_meta(img)
+            img = res
+
+        res = self.viewer.process(img, self.pool_view)
+        if res is None:
+            self.debug("View frame pool is exhausted, frame is dropped")
+            img.release()
+            return
+
+        res.ts_convert = time.perf_counter()
+        self.feedback.reportNewFrame(res)
+
+    def report_spot(self, res):
+        """
+        Passes the result of the spot detection to the controller
+        :param res: dict() - empty if the detection is disabled
+        :return:
+        """
+        try:
+            self.feedback.reportSpot(res)
+        except AttributeError:
+            pass
+
+    def report_hole(self, res):
+        """
+        Passes the result of the gasket hole detection to the controller
+        :param res: dict() - empty if the detection is disabled
+        :return:
+        """
+        try:
+            self.feedback.reportHole(res)
+        except AttributeError:
+            pass
+
+    def report_focus(self, res):
+        """
+        Passes the focus metric of a frame to the controller
+        :param res: dict() - empty if the metric is disabled
+        :return:
+        """
+        try:
+            self.feedback.reportFocus(res)
+        except AttributeError:
+            pass
+
+    def deliver_frame(self, img: FrameBuffer):
+        """
+        Passes a frame to the processing pipeline or straight to the controller
+        :param img:
+        :return:
+        """
+        # references are captured from uncorrected frames
+        if self.correction is not None:
+            self.correction.accumulate(img.data)
+
+        if STAGE_AVERAGE not in self.pipeline_names and self.averager.test_active():
+            self.averager.process(img.data)
+
+        if STAGE_SPOT not in self.pipeline_names and self.spot.test_enabled():
+            self.spot.process(img.data)
+
+        if STAGE_HOLE not in self.pipeline_names and self.hole.test_enabled():
+            self.hole.process(img.data)
+
+        if STAGE_FOCUS not in self.pipeline_names and self.focus.test_enabled():
+            self.focus.process(img.data)
+
+        if self.pipeline is not None:
+            self.pipeline.put(img)
+        else:
+            self.display_frame(img)
+
     def work_sync(self, cam: Camera):
         """
         Sets a work in synchronous way
         :return:
         """
-        self.debug("Processing data synchronously")
-        max_delay = float(self.SYNC_SLEEP)/float(self.SYNC_FRAMERATE)
+        if self.bstream:
+            self.work_sync_stream(cam)
+        else:
+            self.work_sync_single(cam)
 
-        told_feature_request = 0
+    def work_sync_single(self, cam: Camera):
+        """
+        Synchronous work - acquisition is started and stopped for every frame
+        :return:
+        """
+        self.debug("Processing data synchronously, frame by frame")
 
         while True:
             tstart = time.time()
@@ -281,67 +1092,13 @@ class ThreadCameraAllied(threading.Thread, Tester):
             # make a test
             self.setCamAlive(True)
 
-            try:
-                self.qstop.get(block=False)
-                self.qstop.task_done()
+            if self.test_stop():
                 return
-            except queue.Empty:
-                pass
 
             # updates information on features
             try:
-
-                # pass commands if necessary before reading out
-                if self._test_queue_commands() or self.cam_exposure_feature is not None:
-                    bempty = False
-                    bdata = False
-                    self.debug("Applying external commands")
-                    # collect all changes in one go - overwrite the oldest ones
-                    while not bempty:
-                        try:
-                            cmd = self.qcommands.get(block=False)
-                            # parse commands
-                            if isinstance(cmd, dict) and len(cmd.keys()) > 0:
-                                for (k, v) in cmd.items():
-                                    if k in self.cmddict.keys():
-                                        self.cmddict[k] = v
-                                        bdata = True
-
-                            self.qcommands.task_done()
-                        except queue.Empty:
-                            bempty = True
-
-                    # apply values
-
-                    if bdata:
-                        self.debug("Applying external commands ({}, {}, {})".format(self.cmddict, self.cam_exposure_feature, CAMERA_EXPOSUREMERGED))
-
-                        for k in self.cmddict.keys():
-                            v = self.cmddict[k]
-
-                            if v is not None:
-                                if k == CAMERA_EXPOSUREMERGED and self._test_cam_exposure_feature():
-                                    if self.cam_exposure_feature == CAMERA_EXPOSUREABS:
-                                        self.debug("Setting ({} -> {})".format(k, v))
-                                        cam.ExposureTimeAbs.set(v)
-                                    elif self.cam_exposure_feature == CAMERA_EXPOSURE:
-                                        self.debug("Setting ({} -> {})".format(k, v))
-                                        cam.ExposureTime.set(v)
-                                elif k == CAMERA_GAINMERGED and self._test_cam_gain_feature():
-                                    if self.cam_gain_feature == CAMERA_GAIN_RAW:
-                                        self.debug("Setting ({} -> {})".format(k, v))
-                                        cam.GainRaw.set(v)
-                                    elif self.cam_gain_feature == CAMERA_GAIN:
-                                        self.debug("Setting ({} -> {})".format(k, v))
-                                        cam.Gain.set(v)
-                                elif k == CAMERA_GAIN_MODE:
-                                    self.debug("Setting ({} -> {})".format(k, v))
-                                    cam.GainAuto.set(v)
-                                elif k == CAMERA_EXPOSURE_MODE:
-                                    self.debug("Setting ({} -> {})".format(k, v))
-                                    cam.ExposureAuto.set(v)
-
-                                self.cmddict[k] = None
+                self.test_roi(cam)
+                self.test_burst(cam, bstart=True)
 
                 # retrieve features
                 tgetfeature = time.time()
@@ -354,19 +1111,14 @@ class ThreadCameraAllied(threading.Thread, Tester):
                     try:
                         self.debug("Obtained frame {}".format(frame))
                         if frame.get_status() == FrameStatus.Complete:
-                            img = None
-
-                            if self.pixel_format == PixelFormat.BayerRG8:
-                                img = frame.as_numpy_ndarray()
-                                img = cv2.cvtColor(img, cv2.COLOR_BayerBG2RGB)
-                            else:
-                                img = frame.as_opencv_image()
-                            self.feedback.reportNewFrame(img)
-                            pass
-                    except (RuntimeError, AttributeError):
-                        pass
-                # collect garbage - frames are large
-                gc.collect()
+                            img = self.convert_frame(frame)
+                            if img is not None:
+                                img = self.demosaic_frame(img)
+                            if img is not None:
+                                self.deliver_frame(img)
+                    except Exception as e:
+                        # a failing frame must not end the acquisition
+                        self.error("Error while processing a frame: {}".format(e))
 
                 tgetframe = time.time()-tgetframe
 
@@ -391,34 +1143,118 @@ class ThreadCameraAllied(threading.Thread, Tester):
                 if self.count >= self.frame_count:
                     return
 
-            if td > max_delay:
-                self.debug("Real delay ({} s) is larger than the maximum delay ({} s)".format(td, max_delay))
-                continue
+            # acquisition is restarted for every frame - the camera cannot pace it
+            self.governor.wait(bforce=True)
+
+    def work_sync_stream(self, cam: Camera):
+        """
+        Synchronous work on a continuous stream - acquisition stays open, frames are pulled from a queue
+        :return:
+        """
+        self.debug("Processing data synchronously, continuous streaming")
+
+        self.qframes = FrameQueue(maxsize=self.queue_size, policy=self.queue_policy)
+
+        try:
+            self.debug("Starting streaming")
+            cam.start_streaming(handler=self.frame_handler_async, buffer_count=self.STREAM_BUFFER_COUNT)
+
+            tlast = time.time()
+            while True:
+                # make a test
+                self.setCamAlive(True)
+
+                if self.test_stop():
+                    return
+
+                tgetfeature = 0.
+                try:
+                    self.test_roi(cam, bstreaming=True)
+                    self.test_burst(cam)
+
+                    # retrieve features
+                    tgetfeature = time.time()
+                    self.get_feature_info(cam)
+                    tgetfeature = time.time() - tgetfeature
+                except (VimbaTimeout, VimbaFeatureError) as e:
+                    self.error("Vimba Timeout message {}".format(e))
+
+                # retrieve frame - the stream is kept open, a frame is simply taken from the queue
+                tgetframe = time.time()
+                try:
+                    img = self.qframes.get(timeout=self.SYNC_FRAMETIMEOUT)
+                except queue.Empty:
+                    self.error("No frame was received within ({} s)".format(self.SYNC_FRAMETIMEOUT))
+                    continue
+
+                try:
+                    img = self.demosaic_frame(img)
+                    if img is not None:
+                        self.deliver_frame(img)
+                except Exception as e:
+                    # a failing frame must not end the acquisition
+                    self.error("Error while processing a frame: {}".format(e))
+
+                tstop = time.time()
+                tgetframe = tstop - tgetframe
 
-            # sleep only if necessary
-            if max_delay-td > 0:
-                time.sleep(max_delay-td)
+                self.debug("Get features ({}s); Get Frame ({}s)".format(tgetfeature, tgetframe))
+
+                td = tstop - tlast
+                tlast = tstop
+
+                if td > 0:
+                    self.frame_rate_real = float(1.) / float(td)
+                self.debug("Frame rate is ({:2.2f} Hz)".format(self.frame_rate_real))
+
+                if self.frame_count > 0:
+                    self.count += 1
+
+                    if self.count >= self.frame_count:
+                        return
+
+                # host pacing if the camera has no frame rate control - the queue keeps the newest frames
+                self.governor.wait()
+        finally:
+            self.debug("Stop streaming; frames dropped ({})".format(self.qframes.get_dropped()))
+
+            try:
+                cam.stop_streaming()
+            except VimbaCameraError as e:
+                self.error("Issue with a camera?\n{}".format(e))
+
+            self.qframes.clear()
 
     def work_async(self, cam: Camera):
         """
         Sets an asyncronous data collection
+        Vimba callback copies frames into a bounded queue, a consumer thread passes them to the controller
         :param cam:
         :return:
         """
 
         self.debug("Processing data asynchronously")
 
+        self.qframes = FrameQueue(maxsize=self.queue_size, policy=self.queue_policy)
+        consumer = ThreadFrameConsumer(self.qframes, self.report_frame, timeout=self.sleep_delay)
+        consumer.start()
+
         try:
             # Start Streaming with a custom a buffer of 10 Frames (defaults to 5)
             self.debug("Starting streaming")
-            cam.start_streaming(handler=self.frame_handler, buffer_count=5)
+            cam.start_streaming(handler=self.frame_handler_async, buffer_count=self.STREAM_BUFFER_COUNT)
 
             delay = float(self.sleep_delay) / float(self.WAIT_STEPS)
             while True:
+                self.setCamAlive(True)
+
                 # updates information on features
                 self.get_feature_info(cam)
 
                 for i in range(self.WAIT_STEPS):
+                    self.test_roi(cam, bstreaming=True)
+                    self.test_burst(cam)
+
                     try:
                         self.qstop.get(block=False)
                         self.qstop.task_done()
@@ -444,48 +1280,95 @@ class ThreadCameraAllied(threading.Thread, Tester):
         except ValueError:
             self.debug("Value error")
         finally:
-            self.debug("Stop streaming")
+            self.debug("Stop streaming; frames dropped ({})".format(self.qframes.get_dropped()))
 
             try:
                 cam.stop_streaming()
             except VimbaCameraError as e:
                 self.error("Issue with a camera?\n{}".format(e))
 
+            consumer.stop()
+            self.qframes.clear()
+
+    def report_frame(self, img):
+        """
+        Passes a converted frame to the controller, keeps track of the frame rate and the frame count
+        Executed by the consumer thread in asynchronous mode
+        :param img:
+        :return:
+        """
+        try:
+            img = self.demosaic_frame(img)
+            if img is not None:
+                self.deliver_frame(img)
+        except Exception as e:
+            # a failing frame must not end the consumer
+            self.error("Error while processing a frame: {}".format(e))
+
+        ts = time.time()
+        if self.ts_frame is not None and ts > self.ts_frame:
+            self.frame_rate_real = float(1.) / float(ts - self.ts_frame)
+        self.ts_frame = ts
+
+        if self.frame_count > 0:
+            self.count += 1
+
+            if self.count >= self.frame_count:
+                if self.qlocalstop.empty():
+                    self.debug("!!! Stop queue")
+                    self.qlocalstop.put(self.QUEUE_STOP_MSG)
+
+        self.governor.wait()
+
     def get_feature_info(self, cam: Camera):
         """
-        Receives and reports information on gain, exposure and etc at a certain delay
+        Reports information on gain, exposure and etc at a certain delay
+        Values come from the feature cache, only features without change notification are read from the camera
         :return:
         """
         if time.time()-self.ts_features > self.CAMERA_FEATURE_UPDATE:
-            feature_list = (CAMERA_EXPOSUREABS, CAMERA_EXPOSURE_MODE,
-                            CAMERA_GAIN, CAMERA_GAIN_RAW, CAMERA_GAIN_MODE,
-                            CAMERA_GAINMAX, CAMERA_GAINMIN,
-                            CAMERA_EXPOSURE,
-                            CAMERA_WIDTH, CAMERA_HEIGHT)
+            self.ts_features = time.time()
 
             features = {CAMERA_EXPOSUREMAX: self.CAMERA_MAX, CAMERA_EXPOSUREMIN: self.CAMERA_MIN,
-                        CAMERA_FREQUENCY: self.frame_rate_real}
+                        CAMERA_FREQUENCY: self.frame_rate_real,
+                        CAMERA_FRAME_RATE: self.governor.get_rate(),
+                        CAMERA_FRAMES_DROPPED: self.get_frames_dropped(),
+                        CAMERA_FRAMES_MEMORY: self.pool.get_resident_bytes() + self.pool_color.get_resident_bytes() +
+                                              self.pool_display.get_resident_bytes() + self.pool_view.get_resident_bytes(),
+                        CAMERA_PIXEL_BITS: self.pixel_bits,
+                        CAMERA_ROI: self.roi_geometry}
 
-            for f in feature_list:
-                try:
-                    tf = cam.get_feature_by_name(f)
-                except VimbaFeatureError:
-                    self.debug("Feature {} is not available".format(f))
-                    continue
+            if self.mapper is not None:
+                features[CAMERA_DISPLAY] = self.mapper.get_state()
 
-                value = None
-                try:
-                    value = tf.get()
-                    self.debug("Feature {} value {} type {}".format(tf.get_name(), value, type(value)))
+            if self.command_engine is not None:
+                features[CAMERA_COMMAND_LATENCY] = self.command_engine.get_stats()
 
-                    if isinstance(value, feature.EnumEntry):
-                        value = str(value)
-                except (AttributeError, VimbaFeatureError):
-                    pass
+            if self.correction is not None:
+                self.correction.set_settings({"exposure": self.exposure, "gain": self.gain,
+                                              "pixel_format": str(self.pixel_format)})
+                features[CAMERA_CORRECTION] = self.correction.get_state()
+
+            features[CAMERA_AVERAGE] = self.averager.get_state()
+
+            if self.pipeline is not None:
+                features[CAMERA_PIPELINE] = self.pipeline.get_stats()
+                self.debug("Pipeline stages ({})".format(features[CAMERA_PIPELINE]))
+
+            self.debug("Frame memory ({:.01f} MB), buffers in use ({}/{})".format(
+                features[CAMERA_FRAMES_MEMORY] / self.MEGABYTE, self.pool.get_in_use(), self.pool.size))
+
+            self.feature_cache.poll()
+            values = self.feature_cache.snapshot()
+
+            for f in self.FEATURE_LIST:
+                value = values.get(f)
 
                 if value is None:
                     continue
 
+                self.debug("Feature {} value {} type {}".format(f, value, type(value)))
+
                 if f == CAMERA_EXPOSURE or f == CAMERA_EXPOSUREABS:
                     tf = CAMERA_EXPOSUREMERGED
                     features.setdefault(tf, value)
@@ -514,28 +1397,23 @@ class ThreadCameraAllied(threading.Thread, Tester):
 
     def frame_handler_async(self, cam: Camera, frame: Frame):
         """
-        Callbacck function handles frames and passes them into the feedback object if necessary
+        Callbacck function copies a complete frame into the bounded queue and requeues the vimba buffer right away
+        Executed by the vimba transport thread - should never block
         :return:
         """
-        self.debug("Camera {}; Frame {}".format(cam.get_id(), frame))
-
-        if self.frame_count > 0:
-            self.count += 1
-
-            if self.count >= self.frame_count:
-                if self.qlocalstop.empty():
-                    self.debug("!!! Stop queue")
-                    self.qlocalstop.put(self.QUEUE_STOP_MSG)
-
-        if frame.get_status() == FrameStatus.Complete:
-            self.debug("Frame with id {} is complete".format(frame.get_id()))
-
-            try:
-                self.feedback.registerNewFrame(frame)
-            except (RuntimeError, AttributeError):
-                pass
-
-        cam.queue_frame(frame)
+        try:
+            burst = self.burst
+            if burst is not None and not burst.is_done():
+                self.record_burst(burst, frame)
+            elif frame.get_status() == FrameStatus.Complete and self.qframes is not None:
+                img = self.convert_frame(frame)
+                if img is not None:
+                    self.qframes.put(img)
+        except Exception as e:
+            # exceptions must not reach the vimba transport thread - the frame is requeued
+            self.error("Error while handling a frame: {}".format(e))
+        finally:
+            cam.queue_frame(frame)
 
     def reportCameraState(self, bstate):
         """
@@ -548,4 +1426,4 @@ class ThreadCameraAllied(threading.Thread, Tester):
                 self.camera_state = bstate
                 self.feedback.reportStateCamera(bstate)
         except AttributeError:
-            pass
\ No newline at end of file
+            pass
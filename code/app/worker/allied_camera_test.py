@@ -15,6 +15,15 @@ class ThreadCameraAlliedTest(threading.Thread, Tester):
     ACCESS_MODE_READ = 2
     ACCESS_MODE_CONFIG = 4
 
+    # features read once per connection of the camera
+    STATIC_FEATURES = (CAMERA_GAINMAX, CAMERA_GAINMIN,
+                       CAMERA_WIDTH, CAMERA_HEIGHT)
+
+    # features read on every poll
+    DYNAMIC_FEATURES = (CAMERA_EXPOSUREABS, CAMERA_EXPOSURE_MODE,
+                        CAMERA_GAIN, CAMERA_GAIN_MODE,
+                        CAMERA_EXPOSURE)
+
     def __init__(self, id: str, obj_feedback: QtCore.QObject, queue_stop: queue.Queue,
                  sleep_delay=0.5):
         """
@@ -59,6 +68,9 @@ class ThreadCameraAlliedTest(threading.Thread, Tester):
         self.exposure = None
         self.gain = None
 
+        # features which do not change while the camera stays connected - reset on camera loss
+        self.static_features = None
+
     def get_camera(self, v, camera_id) -> None:
         """
         Returns a camera instance
@@ -93,17 +105,39 @@ class ThreadCameraAlliedTest(threading.Thread, Tester):
         """
         self.error(msg)
 
-    def get_feature_info(self, v, cam: Camera):
+    def read_features(self, cam: Camera, feature_list):
         """
-        Receives and reports information on gain, exposure and etc at a certain delay
-        :return:
+        Reads a list of features from the camera
+        :param cam:
+        :param feature_list:
+        :return: dict()
         """
-        feature_list = (CAMERA_EXPOSUREABS, CAMERA_EXPOSURE_MODE,
-                        CAMERA_GAIN, CAMERA_GAIN_MODE,
-                        CAMERA_GAINMAX, CAMERA_GAINMIN,
-                        CAMERA_EXPOSURE,
-                        CAMERA_WIDTH, CAMERA_HEIGHT)
+        res = {}
+        for f in feature_list:
+            try:
+                tf = cam.get_feature_by_name(f)
+            except VimbaFeatureError:
+                self.debug("Feature {} is not available".format(f))
+                continue
+
+            value = None
+            try:
+                value = tf.get()
+                self.debug("Feature {} value {} type {}".format(tf.get_name(), value, type(value)))
+
+                if isinstance(value, feature.EnumEntry):
+                    value = str(value)
+            except (AttributeError, VimbaFeatureError):
+                pass
+
+            res[f] = value
+        return res
 
+    def get_static_info(self, cam: Camera):
+        """
+        Reads information which does not change while the camera is connected
+        :return: dict()
+        """
         modes = cam.get_permitted_access_modes()
         bcapture = False
         if self.ACCESS_MODE_FULL in modes:
@@ -121,27 +155,29 @@ class ThreadCameraAlliedTest(threading.Thread, Tester):
         except VimbaFeatureError:
             pass
 
-        features = {CAMERA_EXPOSUREMAX: self.CAMERA_MAX, CAMERA_EXPOSUREMIN: self.CAMERA_MIN,
-                    CAMERA_MODEL: cam.get_model(), CAMERA_INTERFACE: cam.get_interface_id(), CAMERA_IP: ip,
-                    CAMERA_CAPTURE_ALLOWED: bcapture}
+        res = {CAMERA_EXPOSUREMAX: self.CAMERA_MAX, CAMERA_EXPOSUREMIN: self.CAMERA_MIN,
+               CAMERA_MODEL: cam.get_model(), CAMERA_INTERFACE: cam.get_interface_id(), CAMERA_IP: ip,
+               CAMERA_CAPTURE_ALLOWED: bcapture}
+        res.update(self.read_features(cam, self.STATIC_FEATURES))
+        return res
 
-        for f in feature_list:
-            try:
-                tf = cam.get_feature_by_name(f)
-            except VimbaFeatureError:
-                self.debug("Feature {} is not available".format(f))
-                continue
+    def get_feature_info(self, v, cam: Camera):
+        """
+        Receives and reports information on gain, exposure and etc at a certain delay
+        Static information is read once per connection, only gain, exposure and their modes are polled
+        :return:
+        """
+        if self.static_features is None:
+            self.static_features = self.get_static_info(cam)
 
-            value = None
-            try:
-                value = tf.get()
-                self.debug("Feature {} value {} type {}".format(tf.get_name(), value, type(value)))
+        features = dict(self.static_features)
 
-                if isinstance(value, feature.EnumEntry):
-                    value = str(value)
-            except (AttributeError, VimbaFeatureError):
-                pass
+        values = self.read_features(cam, self.DYNAMIC_FEATURES)
+        for f in self.DYNAMIC_FEATURES:
+            if f not in values:
+                continue
 
+            value = values[f]
             if f == CAMERA_EXPOSURE or f == CAMERA_EXPOSUREABS:
                 f = CAMERA_EXPOSUREMERGED
                 features.setdefault(f, value)
@@ -211,6 +247,9 @@ class ThreadCameraAlliedTest(threading.Thread, Tester):
                         pass
 
                 except (AttributeError, ValueError):
+                    # the camera may come back with a different configuration
+                    self.static_features = None
+
                     # handle an issue of camera accessibility
                     self.handle_error("Camera is not available")
                     # report absence of camera
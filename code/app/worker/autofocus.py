@@ -0,0 +1,160 @@
+from app.common.imports import *
+
+__all__ = ["AutofocusRunnable"]
+
+class AutofocusStopped(Exception):
+    pass
+
+class AutofocusRunnable(QtCore.QRunnable, Tester):
+    """
+    Autofocus scan - golden-section search of the focus metric maximum along Z
+    Z is moved by a plugin, the metric is computed on the acquisition thread for every frame
+    Results evaluated while the motor moves are discarded, so a step costs the move and a few frame periods
+    """
+    GOLDEN = (np.sqrt(5.) - 1.) / 2.
+
+    MAX_STEPS = 30
+    SAMPLE_TIMEOUT = 5.         # seconds without a focus metric after which the scan is aborted
+
+    def __init__(self, move, span, tolerance, frames=1, skip=1, feedback=None):
+        """
+        Class constructor
+        :param move: callable(dz) - relative Z move of the plugin, must return only once the motor has stopped
+                     (see TangoFocuser of the plugins) - frames of a move still running are taken as focused
+        :param span: float() - scanned range centered on the current position, plugin units
+        :param tolerance: float() - width of the final bracket, plugin units
+        :param frames: int() - metric values averaged per step
+        :param skip: int() - metric values discarded after a move - frames exposed during the move
+        :param feedback:
+        """
+        QtCore.QRunnable.__init__(self)
+        Tester.__init__(self, def_file="{}".format(self.__class__.__name__.lower()))
+        self.setAutoDelete(False)
+
+        self.move = move
+        self.span = abs(float(span))
+        self.tolerance = max(abs(float(tolerance)), 1e-12)
+        self.frames = max(1, int(frames))
+        self.skip = max(0, int(skip))
+        self.feedback = feedback
+
+        # focus metric results passed by the controller
+        self.qmetric = queue.Queue()
+
+        self.bstop = threading.Event()
+        self.bdone = threading.Event()
+
+        # position relative to the start of the scan and the sampled points
+        self.position = 0.
+        self.points = []
+
+    def put(self, res):
+        """
+        Passes a focus metric result - called by the acquisition thread through the controller
+        :param res: dict()
+        :return:
+        """
+        if isinstance(res, dict) and "value" in res:
+            self.qmetric.put(res["value"])
+
+    def stop(self):
+        self.bstop.set()
+
+    def is_running(self):
+        return not self.bdone.is_set()
+
+    def sample(self):
+        """
+        Returns the mean metric of frames acquired after the last move
+        :return: float()
+        """
+        # results evaluated before the end of the move
+        while True:
+            try:
+                self.qmetric.get_nowait()
+            except queue.Empty:
+                break
+
+        values = []
+        skipped = 0
+        while len(values) < self.frames:
+            if self.bstop.is_set():
+                raise AutofocusStopped()
+
+            v = self.qmetric.get(timeout=self.SAMPLE_TIMEOUT)
+            if skipped < self.skip:
+                skipped += 1
+                continue
+            values.append(v)
+        return float(np.mean(values))
+
+    def measure(self, z):
+        """
+        Moves to a position and samples the metric
+        :param z: float() - position relative to the start
+        :return: float()
+        """
+        if self.bstop.is_set():
+            raise AutofocusStopped()
+
+        self.move_to(z)
+        v = self.sample()
+        self.points.append([z, v])
+        self.report({"state": "scanning", "step": len(self.points), "position": z, "value": v})
+        return v
+
+    def move_to(self, z):
+        if z != self.position:
+            self.move(z - self.position)
+            self.position = z
+
+    def run(self):
+        """
+        Golden-section search of the maximum - one new point per step, the bracket shrinks by 0.618
+        :return:
+        """
+        ts = time.perf_counter()
+        try:
+            (a, b) = (-self.span / 2., self.span / 2.)
+            g = self.GOLDEN
+
+            (c, d) = (b - g * (b - a), a + g * (b - a))
+            (fc, fd) = (self.measure(c), self.measure(d))
+
+            while b - a > self.tolerance and len(self.points) < self.MAX_STEPS:
+                if fc >= fd:
+                    (b, d, fd) = (d, c, fc)
+                    c = b - g * (b - a)
+                    fc = self.measure(c)
+                else:
+                    (a, c, fc) = (c, d, fd)
+                    d = a + g * (b - a)
+                    fd = self.measure(d)
+
+            best = c if fc >= fd else d
+            self.move_to(best)
+            self.report({"state": "done", "step": len(self.points), "position": best, "value": max(fc, fd),
+                         "points": self.points, "time": time.perf_counter() - ts})
+        except (AutofocusStopped, queue.Empty) as e:
+            # the scan is abandoned at the starting position
+            state = "stopped" if isinstance(e, AutofocusStopped) else "timeout"
+            try:
+                self.move_to(0.)
+            except Exception as e:
+                self.error("Could not return to the start position: {}".format(e))
+            self.report({"state": state, "step": len(self.points), "position": 0., "points": self.points,
+                         "time": time.perf_counter() - ts})
+        except Exception as e:
+            # plugins are external code
+            self.error("Autofocus scan failed: {}".format(e))
+            self.report({"state": "error", "step": len(self.points), "error": str(e), "points": self.points,
+                         "time": time.perf_counter() - ts})
+        finally:
+            self.bdone.set()
+
+    def report(self, res):
+        if self.feedback is not None:
+            try:
+                self.feedback.reportAutofocus(res)
+            except AttributeError:
+                pass
@@ -0,0 +1,144 @@
+from app.common.imports import *
+
+__all__ = ["CommandQueue", "ThreadCommandEngine"]
+
+class CommandQueue(queue.Queue):
+    """
+    Queue of commands (dict of feature: value) stamped with the time of enqueueing
+    """
+    def put(self, item, block=True, timeout=None):
+        queue.Queue.put(self, (time.monotonic(), item), block=block, timeout=timeout)
+
+
+class ThreadCommandEngine(threading.Thread, Tester):
+    """
+    Thread applying commands independently of the frame cadence
+    A burst of commands is coalesced to the newest value per feature
+    """
+    QUEUE_TIMEOUT = 0.2        # seconds - delay between tests for the stop event
+    COALESCE_DELAY = 0.02      # seconds - time given to a burst of commands to settle
+
+    MILLISECONDS = 1000.
+
+    def __init__(self, qcommands: CommandQueue, func, order=()):
+        """
+        Class constructor
+        :param qcommands: CommandQueue() - source of the commands
+        :param func: callable(key, value) - applies a single command, returns True on success
+        :param order: tuple() - keys applied first, in the given order
+        """
+        threading.Thread.__init__(self)
+        Tester.__init__(self, def_file="{}-{}".format(self.__class__.__name__, threading.current_thread().name))
+
+        self.qcommands = qcommands
+        self.func = func
+        self.order = tuple(order)
+
+        self.evstop = threading.Event()
+
+        # latency statistics per command key
+        self.stats = {}
+        self.stats_lock = threading.Lock()
+
+        self.daemon = True
+
+    def run(self):
+        """
+        Main loop of the engine
+        :return:
+        """
+        while not self.evstop.is_set():
+            try:
+                item = self.qcommands.get(timeout=self.QUEUE_TIMEOUT)
+                self.qcommands.task_done()
+            except queue.Empty:
+                continue
+
+            # let a burst of slider moves arrive, then collect all waiting commands in one go
+            time.sleep(self.COALESCE_DELAY)
+
+            items = [item]
+            while True:
+                try:
+                    items.append(self.qcommands.get(block=False))
+                    self.qcommands.task_done()
+                except queue.Empty:
+                    break
+
+            self.apply(self.coalesce(items))
+
+    def coalesce(self, items):
+        """
+        Keeps the newest value per key
+        :param items: list() - (timestamp, dict()) tuples
+        :return: dict() - key: [value, timestamp of the newest command, number of superseded commands]
+        """
+        res = {}
+        for (ts, cmd) in items:
+            if not isinstance(cmd, dict):
+                continue
+
+            for (k, v) in cmd.items():
+                if k in res:
+                    res[k] = [v, ts, res[k][2] + 1]
+                else:
+                    res[k] = [v, ts, 0]
+        return res
+
+    def apply(self, commands: dict):
+        """
+        Applies coalesced commands and records their latency
+        :param commands:
+        :return:
+        """
+        keys = [k for k in self.order if k in commands]
+        keys.extend([k for k in commands.keys() if k not in self.order])
+
+        for k in keys:
+            (v, ts, superseded) = commands[k]
+
+            bapplied = False
+            try:
+                bapplied = self.func(k, v)
+            except Exception as e:
+                self.error("Error while applying command ({} -> {}): {}".format(k, v, e))
+
+            if not bapplied:
+                continue
+
+            latency = (time.monotonic() - ts) * self.MILLISECONDS
+            self.record(k, latency, superseded)
+            self.info("Command ({} -> {}) applied within ({:.01f} ms); superseded commands ({})".format(k, v, latency, superseded))
+
+    def record(self, key, latency, superseded):
+        """
+        Records an enqueue-to-applied latency
+        :param key:
+        :param latency: float() - ms
+        :param superseded: int() - number of coalesced commands
+        :return:
+        """
+        with self.stats_lock:
+            st = self.stats.setdefault(key, {"count": 0, "superseded": 0, "last": 0., "mean": 0., "max": 0.})
+            st["count"] += 1
+            st["superseded"] += superseded
+            st["last"] = latency
+            st["mean"] += (latency - st["mean"]) / st["count"]
+            st["max"] = max(st["max"], latency)
+
+    def get_stats(self):
+        """
+        Returns a copy of the latency statistics (ms) per command key
+        :return: dict()
+        """
+        with self.stats_lock:
+            return copy.deepcopy(self.stats)
+
+    def stop(self):
+        """
+        Stops the engine and waits for it
+        :return:
+        """
+        self.evstop.set()
+        if self.is_alive() and threading.current_thread() != self:
+            self.join()
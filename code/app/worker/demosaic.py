@@ -0,0 +1,158 @@
+from app.common.imports import *
+from app.common.keys import *
+
+from concurrent.futures import ThreadPoolExecutor
+
+__all__ = ["BayerDemosaic"]
+
+class BayerDemosaic(Tester):
+    """
+    Demosaicing of BayerRG frames split into row bands processed by a pool of worker threads
+    OpenCV releases the GIL, bands of a frame are converted on several cores at once
+    Frames are written in the channel order of the display - they are never swizzled afterwards
+    """
+    MODE_NEAREST = "nearest"        # superpixel replicated to the full resolution - live preview
+    MODE_BILINEAR = "bilinear"      # live preview
+    MODE_VNG = "vng"                # edge aware, variable number of gradients - snapshots
+    MODE_EA = "ea"                  # edge aware - snapshots
+    MODE_SUPERPIXEL = "superpixel"  # half resolution, no interpolation - fastest preview
+
+    MODES = (MODE_NEAREST, MODE_BILINEAR, MODE_VNG, MODE_EA, MODE_SUPERPIXEL)
+
+    # vimba BayerRG corresponds to the OpenCV BayerBG naming - frames are converted into the requested order directly
+    CODES = {
+        COLOR_ORDER_RGB: {
+            MODE_BILINEAR: cv2.COLOR_BayerBG2RGB,
+            MODE_VNG: cv2.COLOR_BayerBG2RGB_VNG,
+            MODE_EA: cv2.COLOR_BayerBG2RGB_EA,
+        },
+        COLOR_ORDER_BGR: {
+            MODE_BILINEAR: cv2.COLOR_BayerBG2BGR,
+            MODE_VNG: cv2.COLOR_BayerBG2BGR_VNG,
+            MODE_EA: cv2.COLOR_BayerBG2BGR_EA,
+        },
+    }
+
+    # rows shared by neighbouring bands - interpolation of the band edges, even to keep the bayer phase
+    BAND_MARGIN = 4
+    # smallest band worth a separate task
+    BAND_MIN_ROWS = 64
+
+    def __init__(self, bands=0, order=COLOR_ORDER_BGR):
+        """
+        Class constructor
+        :param bands: int() - maximum number of row bands processed in parallel, <=0 - number of cpu cores
+        :param order: str() - channel order of the color frames - bgr, rgb
+        """
+        Tester.__init__(self, def_file="{}".format(self.__class__.__name__.lower()))
+
+        if order not in self.CODES:
+            order = COLOR_ORDER_BGR
+        self.order = order
+
+        # channels of the red and blue pixels of the superpixel modes
+        (self.red, self.blue) = (2, 0) if order == COLOR_ORDER_BGR else (0, 2)
+
+        if not isinstance(bands, int) or bands <= 0:
+            bands = multiprocessing.cpu_count()
+
+        self.bands = max(1, bands)
+        self.executor = None
+        if self.bands > 1:
+            self.executor = ThreadPoolExecutor(max_workers=self.bands, thread_name_prefix=self.__class__.__name__)
+
+    def test_mode(self, mode):
+        """
+        Returns a valid demosaicing mode
+        :param mode:
+        :return:
+        """
+        if mode not in self.MODES:
+            mode = self.MODE_BILINEAR
+        return mode
+
+    def get_shape(self, shape, mode):
+        """
+        Returns the shape of a color frame
+        :param shape: tuple() - shape of the raw frame (H, W) or (H, W, 1)
+        :param mode: str() - demosaicing mode
+        :return: tuple()
+        """
+        (h, w) = shape[:2]
+        if self.test_mode(mode) == self.MODE_SUPERPIXEL:
+            (h, w) = (h // 2, w // 2)
+        return (h, w, 3)
+
+    def process(self, src, dst, mode):
+        """
+        Converts a raw bayer frame into a preallocated color frame
+        :param src: np.ndarray() - raw frame (H, W) or (H, W, 1)
+        :param dst: np.ndarray() - color frame of the shape returned by get_shape()
+        :param mode: str() - demosaicing mode
+        :return:
+        """
+        mode = self.test_mode(mode)
+        src = src.reshape(src.shape[0], src.shape[1])
+
+        # bands are aligned to even rows of the raw frame
+        rows = src.shape[0] // 2
+        nbands = max(1, min(self.bands, rows * 2 // self.BAND_MIN_ROWS))
+        edges = [2 * (rows * i // nbands) for i in range(nbands + 1)]
+        edges[-1] = src.shape[0]
+
+        tasks = [(src, dst, mode, edges[i], edges[i+1]) for i in range(nbands)]
+
+        if self.executor is None or nbands == 1:
+            for task in tasks:
+                self.process_band(*task)
+        else:
+            for res in self.executor.map(lambda task: self.process_band(*task), tasks):
+                pass
+
+    def process_band(self, src, dst, mode, y0, y1):
+        """
+        Converts rows [y0, y1) of the raw frame
+        :param src: np.ndarray() - raw frame (H, W)
+        :param dst: np.ndarray() - color frame
+        :param mode: str() - demosaicing mode
+        :param y0: int() - first row, even
+        :param y1: int() - row after the last one
+        :return:
+        """
+        if mode in (self.MODE_SUPERPIXEL, self.MODE_NEAREST):
+            (h2, w2) = ((y1 - y0) // 2, src.shape[1] // 2)
+            (ys, xs) = (slice(y0, y0 + 2 * h2, 2), slice(0, 2 * w2, 2))
+            (ys1, xs1) = (slice(y0 + 1, y0 + 2 * h2, 2), slice(1, 2 * w2, 2))
+
+            if mode == self.MODE_SUPERPIXEL:
+                tdst = dst[y0 // 2:y0 // 2 + h2, :w2]
+            else:
+                tdst = np.empty((h2, w2, 3), dtype=dst.dtype)
+
+            tdst[..., self.red] = src[ys, xs]
+            tdst[..., 1] = (src[ys, xs1].astype(np.uint32) + src[ys1, xs]) >> 1
+            tdst[..., self.blue] = src[ys1, xs1]
+
+            if mode == self.MODE_NEAREST:
+                dst[y0:y0 + 2 * h2, :2 * w2] = np.repeat(np.repeat(tdst, 2, axis=0), 2, axis=1)
+
+                # odd sensor dimensions - replicate the last row/column
+                if 2 * h2 < y1 - y0:
+                    dst[y1 - 1, :2 * w2] = dst[y1 - 2, :2 * w2]
+                if 2 * w2 < src.shape[1]:
+                    dst[y0:y1, -1] = dst[y0:y1, -2]
+        else:
+            a = max(0, y0 - self.BAND_MARGIN)
+            b = min(src.shape[0], y1 + self.BAND_MARGIN)
+
+            tdst = cv2.cvtColor(src[a:b], self.CODES[self.order][mode])
+            dst[y0:y1] = tdst[y0 - a:y1 - a]
+
+    def close(self):
+        """
+        Stops the worker threads
+        :return:
+        """
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
@@ -0,0 +1,101 @@
+from app.common.imports import *
+
+__all__ = ["DisplayMapper"]
+
+class DisplayMapper(Tester):
+    """
+    Mapping of high bit depth mono frames (Mono10/12/14/16) to 8 bits for display
+    Window/level and gamma are precomputed into a 65536-entry lookup table applied in a single vectorized pass
+    """
+    LUT_SIZE = 65536
+
+    GAMMA_MIN = 0.05
+    GAMMA_MAX = 20.
+
+    def __init__(self, bits=16, window=None, gamma=1.):
+        """
+        Class constructor
+        :param bits: int() - significant bits of the frames
+        :param window: list() - [black, white] levels in counts, None - full range of the bit depth
+        :param gamma: float() - display gamma
+        """
+        Tester.__init__(self, def_file="{}".format(self.__class__.__name__.lower()))
+
+        self.lock = threading.Lock()
+
+        self.bits = min(max(1, int(bits)), 16)
+        self.window = None
+        self.gamma = 1.
+
+        self.lut = None
+
+        self.set_params(window=window, gamma=gamma)
+
+    def get_full_window(self):
+        return [0, (1 << self.bits) - 1]
+
+    def set_params(self, window=None, gamma=None):
+        """
+        Changes window/level and gamma, rebuilds the lookup table
+        :param window: list() - [black, white] levels in counts, empty list - full range of the bit depth
+        :param gamma: float() - display gamma
+        :return: bool() - True if the parameters are valid
+        """
+        res = True
+        with self.lock:
+            if window is not None:
+                if isinstance(window, (list, tuple)) and len(window) == 0:
+                    self.window = None
+                elif isinstance(window, (list, tuple)) and len(window) == 2 and all([self.testInt(v) or self.testFloat(v) for v in window]):
+                    (black, white) = [min(max(0, int(v)), self.LUT_SIZE - 1) for v in window]
+                    self.window = [min(black, white), max(black, white)]
+                else:
+                    res = False
+
+            if gamma is not None:
+                try:
+                    self.gamma = min(max(float(gamma), self.GAMMA_MIN), self.GAMMA_MAX)
+                except (TypeError, ValueError):
+                    res = False
+
+            (black, white) = self.window if self.window is not None else self.get_full_window()
+            self.lut = self.make_lut(black, white, self.gamma)
+
+        if not res:
+            self.error("Invalid display mapping parameters ({}, {})".format(window, gamma))
+        self.info("Display mapping of ({}) bits; window ({}); gamma ({})".format(self.bits, self.window, self.gamma))
+        return res
+
+    def make_lut(self, black, white, gamma):
+        """
+        Computes the lookup table
+        :param black: int() - level mapped to 0
+        :param white: int() - level mapped to 255
+        :param gamma: float()
+        :return: np.ndarray() - (65536,) uint8
+        """
+        x = np.arange(self.LUT_SIZE, dtype=np.float32)
+        x = np.clip((x - black) / float(max(white - black, 1)), 0., 1.)
+        if gamma != 1.:
+            np.power(x, 1. / gamma, out=x)
+        return np.rint(x * 255.).astype(np.uint8)
+
+    def process(self, src, dst):
+        """
+        Maps a frame into a preallocated 8-bit frame
+        :param src: np.ndarray() - uint16 frame
+        :param dst: np.ndarray() - uint8 frame of the same shape
+        :return:
+        """
+        with self.lock:
+            lut = self.lut
+        np.take(lut, src, out=dst, mode="clip")
+
+    def get_state(self):
+        """
+        Returns mapping parameters
+        :return: dict()
+        """
+        with self.lock:
+            window = self.window if self.window is not None else self.get_full_window()
+            return {"bits": self.bits, "window": list(window), "gamma": self.gamma}
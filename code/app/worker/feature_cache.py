@@ -0,0 +1,152 @@
+from app.common.imports import *
+from app.common.keys import *
+
+from vimba import Camera, VimbaFeatureError, feature
+
+__all__ = ["FeatureCache"]
+
+class FeatureCache(Tester):
+    """
+    Cache of camera feature values for a single camera session
+    Feature handles are resolved once, values are updated by vimba feature change callbacks
+    Only features without invalidation (or changed by the camera itself in auto mode) are polled
+    """
+    # features changed by the camera itself while the corresponding auto mode is active
+    AUTO_FEATURES = {
+        CAMERA_EXPOSUREABS: CAMERA_EXPOSURE_MODE,
+        CAMERA_EXPOSURE: CAMERA_EXPOSURE_MODE,
+        CAMERA_GAIN: CAMERA_GAIN_MODE,
+        CAMERA_GAIN_RAW: CAMERA_GAIN_MODE,
+    }
+
+    AUTO_OFF = "Off"
+
+    def __init__(self, cam: Camera, names):
+        """
+        Class constructor
+        :param cam: Camera() - opened camera
+        :param names: tuple() - names of the cached features
+        """
+        Tester.__init__(self, def_file="{}".format(self.__class__.__name__.lower()))
+
+        self.cam = cam
+        self.names = tuple(names)
+
+        self.handles = {}
+        self.values = {}
+        self.lock = threading.Lock()
+
+        # features with a registered change handler
+        self.bevent = set()
+
+    def open(self):
+        """
+        Resolves feature handles, reads initial values and subscribes to feature changes
+        :return:
+        """
+        for name in self.names:
+            try:
+                tf = self.cam.get_feature_by_name(name)
+            except VimbaFeatureError:
+                self.debug("Feature {} is not available".format(name))
+                continue
+
+            self.handles[name] = tf
+            self.store(name, self.read(tf))
+
+            try:
+                tf.register_change_handler(self.change_handler)
+                self.bevent.add(name)
+            except (AttributeError, VimbaFeatureError) as e:
+                self.debug("Feature {} has no change notification, polling: {}".format(name, e))
+
+        self.debug("Cached features ({}); event driven ({})".format(list(self.handles.keys()), list(self.bevent)))
+
+    def close(self):
+        """
+        Unsubscribes from feature changes, forgets the handles
+        :return:
+        """
+        for name in self.bevent:
+            try:
+                self.handles[name].unregister_change_handler(self.change_handler)
+            except (AttributeError, KeyError, VimbaFeatureError):
+                pass
+
+        self.bevent = set()
+        self.handles = {}
+
+    def read(self, tf):
+        """
+        Reads a feature value from the camera
+        :param tf: feature handle
+        :return: value or None
+        """
+        res = None
+        try:
+            res = tf.get()
+            if isinstance(res, feature.EnumEntry):
+                res = str(res)
+        except (AttributeError, VimbaFeatureError):
+            pass
+        return res
+
+    def store(self, name, value):
+        with self.lock:
+            self.values[name] = value
+
+    def change_handler(self, tf):
+        """
+        Vimba callback for a feature change
+        :param tf: feature handle
+        :return:
+        """
+        try:
+            name = tf.get_name()
+        except AttributeError:
+            return
+
+        self.store(name, self.read(tf))
+
+    def test_polled(self, name):
+        """
+        Tests if a feature has to be polled
+        :param name:
+        :return:
+        """
+        res = name not in self.bevent
+        if not res and name in self.AUTO_FEATURES:
+            auto = self.get(self.AUTO_FEATURES[name])
+            res = auto is not None and auto != self.AUTO_OFF
+        return res
+
+    def poll(self):
+        """
+        Reads features without invalidation in one pass
+        :return:
+        """
+        for (name, tf) in self.handles.items():
+            if self.test_polled(name):
+                self.store(name, self.read(tf))
+
+    def get(self, name, default=None):
+        """
+        Returns a cached value
+        :param name:
+        :param default:
+        :return:
+        """
+        res = default
+        with self.lock:
+            v = self.values.get(name)
+            if v is not None:
+                res = v
+        return res
+
+    def snapshot(self):
+        """
+        Returns a copy of all cached values
+        :return: dict()
+        """
+        with self.lock:
+            return dict(self.values)
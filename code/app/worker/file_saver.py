@@ -6,21 +6,53 @@ class FilesavingRunner(QtCore.QRunnable):
     """
     Simple thread saving a file
     """
-    def __init__(self, filename, image, feedback=None):
+    NUMPY_EXT = ".npy"
+    META_EXT = ".json"
+
+    def __init__(self, filename, image, feedback=None, convert=None):
+        """
+        Class constructor
+        :param filename: str() - file name, numpy arrays are saved as .npy or as pictures (BGR)
+        :param image: QImage() or np.ndarray(), dict() - frame metadata saved as json
+        :param feedback:
+        :param convert: callable() - conversion of the image executed by the thread before saving
+        """
         QtCore.QRunnable.__init__(self)
         self.setAutoDelete(True)
 
         self.filename = filename
         self.image = image
         self.feedback = feedback
+        self.convert = convert
 
     def run(self) -> None:
         try:
-            if isinstance(self.image, QtGui.QImage):
-                self.image.save(self.filename)
-        except (IOError, OSError) as e:
+            image = self.image
+            if self.convert is not None:
+                image = self.convert(image)
+
+            if isinstance(image, QtGui.QImage):
+                image.save(self.filename)
+            elif isinstance(image, np.ndarray):
+                if self.filename.lower().endswith(self.NUMPY_EXT):
+                    np.save(self.filename, image)
+                else:
+                    cv2.imwrite(self.filename, image)
+            elif isinstance(image, dict):
+                with open(self.filename, "w") as fh:
+                    json.dump(image, fh, indent=4)
+        except (IOError, OSError, TypeError, ValueError, cv2.error) as e:
             self.reportMessage("Error while saving file ({}): {}".format(self.filename, e))
 
+    @classmethod
+    def getMetaFilename(cls, filename):
+        """
+        Returns the name of the metadata file saved next to a frame file
+        :param filename: str()
+        :return: str()
+        """
+        return os.path.splitext(filename)[0] + cls.META_EXT
+
     def reportMessage(self, msg):
         if self.feedback is not None:
             try:
@@ -0,0 +1,154 @@
+from app.common.imports import *
+from app.common.keys import *
+
+__all__ = ["FocusMetric"]
+
+class FocusMetric(Tester):
+    """
+    Sharpness of the frame within a region of interest (the marker)
+    Variance of the laplacian, Tenengrad (mean squared Sobel gradient) or Brenner (mean squared difference of pixels
+    two columns apart); a higher value is a sharper image
+    """
+    METHOD_OFF = FOCUS_OFF
+    METHOD_LAPLACIAN = FOCUS_LAPLACIAN
+    METHOD_TENENGRAD = FOCUS_TENENGRAD
+    METHOD_BRENNER = FOCUS_BRENNER
+
+    METHODS = FOCUS_METHODS
+
+    MILLISECONDS = 1000.
+
+    def __init__(self, output=None, method=METHOD_OFF, roi=None, order=COLOR_ORDER_BGR):
+        """
+        Class constructor
+        :param output: callable(dict) - receives the metric of every analysed frame
+        :param method: str() - off, laplacian, tenengrad, brenner
+        :param roi: list() - [x, y, width, height] in frame pixels, None - full frame
+        :param order: str() - channel order of color frames - bgr, rgb
+        """
+        Tester.__init__(self, def_file="{}".format(self.__class__.__name__.lower()))
+
+        self.output = output
+        self.gray = cv2.COLOR_RGB2GRAY if order == COLOR_ORDER_RGB else cv2.COLOR_BGR2GRAY
+
+        self.lock = threading.Lock()
+
+        self.method = self.METHOD_OFF
+        self.roi = None
+
+        # number of analysed frames - results of frames captured after a moment are told apart by it
+        self.frames = 0
+
+        self.set_params(method=method, roi=roi)
+
+    def set_params(self, method=None, roi=None):
+        """
+        Changes the metric parameters
+        :param method: str() - off, laplacian, tenengrad, brenner
+        :param roi: list() - [x, y, width, height] in frame pixels, empty list - full frame
+        :return: bool() - True if the parameters are valid
+        """
+        res = True
+        bdisabled = False
+        with self.lock:
+            if method is not None:
+                if method in self.METHODS:
+                    bdisabled = self.method != self.METHOD_OFF and method == self.METHOD_OFF
+                    self.method = method
+                else:
+                    res = False
+
+            if roi is not None:
+                if isinstance(roi, (list, tuple)) and len(roi) == 0:
+                    self.roi = None
+                elif isinstance(roi, (list, tuple)) and len(roi) == 4 and all([self.testInt(v) or self.testFloat(v) for v in roi]):
+                    self.roi = [int(v) for v in roi]
+                else:
+                    res = False
+
+        if not res:
+            self.error("Invalid focus metric parameters ({}, {})".format(method, roi))
+        self.debug("Focus metric ({}); roi ({})".format(self.method, self.roi))
+
+        # the last result is withdrawn
+        if bdisabled:
+            self.report({})
+        return res
+
+    def test_enabled(self):
+        with self.lock:
+            return self.method != self.METHOD_OFF
+
+    def get_frames(self):
+        """
+        Returns the number of analysed frames
+        :return: int()
+        """
+        with self.lock:
+            return self.frames
+
+    def report(self, res):
+        if self.output is not None:
+            try:
+                self.output(res)
+            except (RuntimeError, AttributeError) as e:
+                self.error("Error while reporting a focus metric: {}".format(e))
+
+    def process(self, img):
+        """
+        Computes the metric of a frame, reports the result - pipeline stage
+        :param img: np.ndarray() - frame (H, W, C)
+        :return:
+        """
+        with self.lock:
+            (method, roi) = (self.method, self.roi)
+
+        if method == self.METHOD_OFF:
+            return None
+
+        ts = time.perf_counter()
+
+        (h, w) = img.shape[:2]
+        (x0, y0, x1, y1) = (0, 0, w, h)
+        if roi is not None:
+            (x0, y0) = (min(max(0, roi[0]), w - 1), min(max(0, roi[1]), h - 1))
+            (x1, y1) = (min(max(x0 + 1, roi[0] + roi[2]), w), min(max(y0 + 1, roi[1] + roi[3]), h))
+
+        timg = img[y0:y1, x0:x1]
+        if img.ndim == 3 and img.shape[2] == 3:
+            timg = cv2.cvtColor(timg, self.gray)
+        elif img.ndim == 3:
+            timg = timg[..., 0]
+
+        value = self.measure(timg, method)
+
+        with self.lock:
+            self.frames += 1
+            frame = self.frames
+
+        self.report({"value": value, "method": method, "roi": [x0, y0, x1 - x0, y1 - y0], "frame": frame,
+                     "time": (time.perf_counter() - ts) * self.MILLISECONDS})
+        return None
+
+    def measure(self, img, method):
+        """
+        Computes the sharpness of a grayscale image
+        :param img: np.ndarray() - (H, W)
+        :param method: str()
+        :return: float()
+        """
+        img = img.astype(np.float32)
+
+        if method == self.METHOD_LAPLACIAN:
+            (mean, std) = cv2.meanStdDev(cv2.Laplacian(img, cv2.CV_32F))
+            return float(std[0][0] ** 2)
+        elif method == self.METHOD_TENENGRAD:
+            gx = cv2.Sobel(img, cv2.CV_32F, 1, 0, ksize=3)
+            gy = cv2.Sobel(img, cv2.CV_32F, 0, 1, ksize=3)
+            return float(cv2.mean(cv2.magnitude(gx, gy) ** 2)[0])
+        elif method == self.METHOD_BRENNER:
+            if img.shape[1] < 3:
+                return 0.
+            d = img[:, 2:] - img[:, :-2]
+            return float(np.mean(d * d))
+        return 0.
@@ -0,0 +1,155 @@
+from app.common.imports import *
+from app.common.keys import *
+
+__all__ = ["FrameAverager"]
+
+class FrameAverager(Tester):
+    """
+    Temporal averaging of frames - running boxcar over N frames or exponential moving average
+    Both modes are incremental: constant cost per frame independent of N
+    """
+    MODE_OFF = AVERAGE_OFF
+    MODE_BOXCAR = AVERAGE_BOXCAR
+    MODE_EMA = AVERAGE_EMA
+
+    MODES = AVERAGE_MODES
+
+    DEFAULT_LENGTH = 8
+    DEFAULT_ALPHA = 0.2
+
+    MAX_LENGTH = 256    # uint32 sum of 16-bit frames stays below 2^32 for up to 65537 frames
+
+    def __init__(self, mode=MODE_OFF, length=DEFAULT_LENGTH, alpha=DEFAULT_ALPHA):
+        """
+        Class constructor
+        :param mode: str() - off, boxcar, ema
+        :param length: int() - number of frames of the boxcar
+        :param alpha: float() - weight of the last frame of the exponential moving average
+        """
+        Tester.__init__(self, def_file="{}".format(self.__class__.__name__.lower()))
+
+        self.lock = threading.Lock()
+
+        self.mode = self.MODE_OFF
+        self.length = self.DEFAULT_LENGTH
+        self.alpha = self.DEFAULT_ALPHA
+
+        # parameter generation - the processing thread resets its accumulators on change
+        self.generation = 0
+
+        # accumulators - owned by the processing thread
+        self.state_generation = None
+        self.ring = None
+        self.sum = None
+        self.acc = None
+        self.work = None
+        self.index = 0
+        self.frames = 0
+
+        self.set_params(mode=mode, length=length, alpha=alpha)
+
+    def set_params(self, mode=None, length=None, alpha=None):
+        """
+        Changes averaging parameters
+        :param mode: str() - off, boxcar, ema
+        :param length: int() - number of frames of the boxcar
+        :param alpha: float() - weight of the last frame of the exponential moving average
+        :return: bool() - True if the parameters are valid
+        """
+        res = True
+        with self.lock:
+            if mode is not None:
+                if mode in self.MODES:
+                    self.mode = mode
+                else:
+                    res = False
+
+            if length is not None:
+                try:
+                    self.length = min(max(1, int(length)), self.MAX_LENGTH)
+                except (TypeError, ValueError):
+                    res = False
+
+            if alpha is not None:
+                try:
+                    self.alpha = min(max(float(alpha), 1e-3), 1.)
+                except (TypeError, ValueError):
+                    res = False
+
+            self.generation += 1
+
+        if not res:
+            self.error("Invalid averaging parameters ({}, {}, {})".format(mode, length, alpha))
+        self.info("Averaging ({}); length ({}); alpha ({})".format(self.mode, self.length, self.alpha))
+        return res
+
+    def test_active(self):
+        with self.lock:
+            return self.mode != self.MODE_OFF
+
+    def reset(self, img, mode, length):
+        """
+        Allocates accumulators for the frame shape
+        :param img: np.ndarray()
+        :param mode:
+        :param length:
+        :return:
+        """
+        self.ring = None
+        self.sum = None
+        self.acc = None
+        self.index = 0
+        self.frames = 0
+
+        if mode == self.MODE_BOXCAR:
+            self.ring = np.zeros((length,) + img.shape, dtype=img.dtype)
+            self.sum = np.zeros(img.shape, dtype=np.uint32)
+            self.work = np.empty(img.shape, dtype=np.uint32)
+        elif mode == self.MODE_EMA:
+            self.acc = img.astype(np.float32)
+            self.work = np.empty(img.shape, dtype=np.float32)
+
+    def process(self, img):
+        """
+        Replaces a frame by the average in place - pipeline stage
+        :param img: np.ndarray() - integer frame
+        :return:
+        """
+        with self.lock:
+            (mode, length, alpha, generation) = (self.mode, self.length, self.alpha, self.generation)
+
+        if mode == self.MODE_OFF:
+            self.ring = self.sum = self.acc = self.work = None
+            return None
+
+        if generation != self.state_generation or self.work is None or self.work.shape != img.shape:
+            self.state_generation = generation
+            self.reset(img, mode, length)
+
+        if mode == self.MODE_BOXCAR:
+            # the oldest frame leaves the sum, the new one enters it
+            np.subtract(self.sum, self.ring[self.index], out=self.sum, casting="unsafe")
+            np.add(self.sum, img, out=self.sum, casting="unsafe")
+            np.copyto(self.ring[self.index], img)
+
+            self.index = (self.index + 1) % length
+            self.frames = min(self.frames + 1, length)
+
+            np.floor_divide(self.sum, self.frames, out=self.work)
+            np.copyto(img, self.work, casting="unsafe")
+        else:
+            cv2.accumulateWeighted(img, self.acc, alpha)
+
+            # rounding to the nearest integer
+            np.add(self.acc, 0.5, out=self.work)
+            np.copyto(img, self.work, casting="unsafe")
+            self.frames += 1
+        return None
+
+    def get_state(self):
+        """
+        Returns averaging parameters
+        :return: dict()
+        """
+        with self.lock:
+            return {"mode": self.mode, "length": self.length, "alpha": self.alpha}
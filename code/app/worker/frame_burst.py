@@ -0,0 +1,166 @@
+from app.common.imports import *
+
+__all__ = ["FrameBurst"]
+
+class FrameBurst(object):
+    """
+    Burst of frames captured at the maximum rate into a preallocated contiguous array (N, H, W, C)
+    Frames are written by the vimba callback, the array is read once the burst is finished
+    Frame ids and device timestamps are kept in preallocated arrays next to the frames
+    """
+    NO_VALUE = -1
+
+    def __init__(self, count):
+        """
+        Class constructor
+        :param count: int() - number of complete frames to capture
+        """
+        self.count = max(1, int(count))
+
+        self.data = None
+
+        # vimba frame ids and device timestamps (ticks) of the captured frames, NO_VALUE - unknown
+        self.frame_ids = np.full(self.count, self.NO_VALUE, dtype=np.int64)
+        self.timestamps = np.full(self.count, self.NO_VALUE, dtype=np.int64)
+
+        # exposure, gain and pixel format of the burst
+        self.meta = {}
+
+        self._lock = threading.Lock()
+        self._evdone = threading.Event()
+
+        self.frames = 0
+        self.incomplete = 0
+
+        # arrival time of the first and the last captured frame
+        self.ts_start = None
+        self.ts_stop = None
+
+    def allocate(self, shape, dtype):
+        """
+        Preallocates the array - pages are touched before the burst, not while frames arrive
+        :param shape: tuple() - shape of a single frame
+        :param dtype: numpy dtype of the frames
+        :return:
+        """
+        self.data = np.empty((self.count,) + tuple(shape), dtype=dtype)
+        self.data.fill(0)
+
+    def next_slot(self, shape, dtype):
+        """
+        Returns the array slot for the next frame
+        :param shape: tuple() - shape of the frame
+        :param dtype: numpy dtype of the frame
+        :return: np.ndarray() view or None if the frame does not fit
+        """
+        if self.data is None:
+            self.allocate(shape, dtype)
+
+        if self.frames >= self.count or self.data.shape[1:] != tuple(shape) or self.data.dtype != np.dtype(dtype):
+            return None
+        return self.data[self.frames]
+
+    def commit(self, frame_id=None, timestamp=None):
+        """
+        Counts the frame written into the last slot
+        :param frame_id: int() - vimba frame id
+        :param timestamp: int() - device timestamp of the frame
+        :return:
+        """
+        ts = time.time()
+        with self._lock:
+            if self.ts_start is None:
+                self.ts_start = ts
+            self.ts_stop = ts
+
+            if frame_id is not None:
+                self.frame_ids[self.frames] = frame_id
+            if timestamp is not None:
+                self.timestamps[self.frames] = timestamp
+
+            self.frames += 1
+            if self.frames >= self.count:
+                self._evdone.set()
+
+    def add_incomplete(self):
+        with self._lock:
+            self.incomplete += 1
+
+    def is_done(self):
+        return self._evdone.is_set()
+
+    def wait(self, timeout=None):
+        """
+        Waits for the burst to finish
+        :param timeout: float() - seconds
+        :return: bool() - True if the burst is finished
+        """
+        return self._evdone.wait(timeout=timeout)
+
+    def get_received(self):
+        """
+        Returns number of frames received so far - complete and incomplete
+        :return:
+        """
+        with self._lock:
+            return self.frames + self.incomplete
+
+    def get_frame_rate(self):
+        """
+        Returns the achieved frame rate
+        :return:
+        """
+        res = 0.
+        with self._lock:
+            if self.frames > 1 and self.ts_stop > self.ts_start:
+                res = float(self.frames - 1) / (self.ts_stop - self.ts_start)
+        return res
+
+    def get_data(self):
+        """
+        Returns the captured frames
+        :return: np.ndarray() - (frames, H, W, C) or None
+        """
+        res = None
+        if self.data is not None:
+            res = self.data[:self.frames]
+        return res
+
+    def set_meta(self, exposure=None, gain=None, pixel_format=None):
+        """
+        Stores the acquisition settings of the burst
+        :param exposure: float() - exposure in camera units
+        :param gain: float()
+        :param pixel_format:
+        :return:
+        """
+        self.meta = {"exposure": exposure, "gain": gain,
+                     "pixel_format": None if pixel_format is None else str(pixel_format)}
+
+    def get_meta(self):
+        """
+        Returns the metadata of the captured frames
+        :return: dict() - acquisition settings, frame ids and timestamps per frame
+        """
+        with self._lock:
+            frames = self.frames
+
+        res = dict(self.meta)
+        res["frame_id"] = self.frame_ids[:frames].tolist()
+        res["timestamp"] = self.timestamps[:frames].tolist()
+        return res
+
+    def get_info(self):
+        """
+        Returns a summary of the burst
+        :return: dict()
+        """
+        shape = []
+        if self.data is not None:
+            shape = list(self.data.shape[1:])
+
+        with self._lock:
+            frames, incomplete = self.frames, self.incomplete
+
+        return {"count": self.count, "frames": frames, "incomplete": incomplete,
+                "fps": self.get_frame_rate(), "shape": shape}
@@ -0,0 +1,386 @@
+from app.common.imports import *
+
+from concurrent.futures import ThreadPoolExecutor
+
+__all__ = ["FrameCorrection"]
+
+class FrameCorrection(Tester):
+    """
+    Dark-frame and flat-field correction of frames with reference frames stored per camera
+    References are saved as .npy files next to the camera configuration and memory-mapped on load
+    A reference is only applied while camera settings (exposure, gain, pixel format) match the ones of its capture
+    Correction is a vectorized fixed-point operation: ((frame - dark) * gain_map) >> SHIFT
+    References are captured and saved by a worker thread - the acquisition only copies the frames of a capture
+    Files are replaced atomically, a mapping in use by the correction is never truncated
+    """
+    KIND_DARK = "dark"
+    KIND_FLAT = "flat"
+    KINDS = (KIND_DARK, KIND_FLAT)
+
+    NUMPY_EXT = ".npy"
+    META_EXT = ".json"
+    TEMP_EXT = ".tmp"
+
+    CAPTURE_PENDING = 2         # frames waiting for the capture worker, further frames are skipped
+    REPLACE_RETRIES = 5         # a file mapped by another thread cannot be replaced on Windows until it is unmapped
+    REPLACE_DELAY = 0.1
+
+    SHIFT = 12          # fixed-point fraction bits of the gain map
+    GAIN_MAX = 4.       # maximum flat-field gain - keeps 16-bit data within int32
+
+    SETTINGS_TOLERANCE = 1e-3   # relative tolerance of numeric settings
+
+    def __init__(self, camid, folder):
+        """
+        Class constructor
+        :param camid: str() - camera ID, prefix of the reference files
+        :param folder: str() - folder of the camera configuration files
+        """
+        Tester.__init__(self, def_file="{}".format(self.__class__.__name__.lower()))
+
+        self.camid = camid
+        self.folder = folder
+
+        self.lock = threading.Lock()
+
+        # references - memory-mapped arrays and settings of their capture
+        self.refs = {kind: None for kind in self.KINDS}
+        self.meta = {kind: None for kind in self.KINDS}
+        self.valid = {kind: False for kind in self.KINDS}
+
+        # fixed-point gain map derived from the flat and the dark, the flat and the dark it was derived from
+        self.gain = None
+        self.gain_source = (None, None)
+
+        # current camera settings - references are not applied until they are known
+        self.settings = {}
+
+        # capture in progress - kind, requested and accumulated frames, sum, frames waiting for the worker
+        self.capture = None
+        self.executor = None
+
+        # intermediate result of the correction - owned by the processing thread
+        self.work = None
+
+    def get_filename(self, kind, ext=NUMPY_EXT):
+        return os.path.join(self.folder, "{}_{}{}".format(self.camid, kind, ext))
+
+    def load(self):
+        """
+        Loads references saved for the camera
+        :return:
+        """
+        for kind in self.KINDS:
+            fn = self.get_filename(kind)
+            if not os.path.isfile(fn):
+                continue
+
+            try:
+                ref = np.load(fn, mmap_mode="r")
+                with open(self.get_filename(kind, ext=self.META_EXT), "r") as fh:
+                    meta = json.load(fh)
+            except (IOError, OSError, ValueError) as e:
+                self.error("Cannot load the {} reference ({}): {}".format(kind, fn, e))
+                continue
+
+            with self.lock:
+                self.refs[kind] = ref
+                self.meta[kind] = meta
+            self.info("Loaded the {} reference ({}) captured with ({})".format(kind, fn, meta.get("settings")))
+
+        self.update()
+
+    def save(self, kind, ref, frames, settings):
+        """
+        Saves a reference with the settings of its capture and reloads it memory-mapped
+        :param kind:
+        :param ref: np.ndarray()
+        :param frames: int() - number of averaged frames
+        :param settings: dict() - camera settings at the start of the capture
+        :return:
+        """
+        fn = self.get_filename(kind)
+        meta = {"settings": dict(settings), "frames": frames, "shape": list(ref.shape), "dtype": str(ref.dtype),
+                "time": time.strftime("%Y-%m-%d %H:%M:%S")}
+
+        # the new reference is used from memory - the old mapping is released before its file is replaced
+        with self.lock:
+            self.refs[kind] = ref
+            self.meta[kind] = meta
+        self.update()
+
+        try:
+            tfn = fn + self.TEMP_EXT
+            with open(tfn, "wb") as fh:
+                np.save(fh, ref)
+            self.replace(tfn, fn)
+
+            tfn = self.get_filename(kind, ext=self.META_EXT) + self.TEMP_EXT
+            with open(tfn, "w") as fh:
+                json.dump(meta, fh)
+            self.replace(tfn, self.get_filename(kind, ext=self.META_EXT))
+
+            mapped = np.load(fn, mmap_mode="r")
+        except (IOError, OSError, ValueError) as e:
+            self.error("Cannot save the {} reference ({}): {}".format(kind, fn, e))
+            return
+
+        with self.lock:
+            if self.refs[kind] is ref:
+                self.refs[kind] = mapped
+        self.info("Saved the {} reference ({}) of ({}) frames".format(kind, fn, frames))
+
+        self.update()
+
+    def replace(self, src, dst):
+        """
+        Replaces a file atomically - retried while the old file is still mapped by a frame being corrected
+        :param src: str() - temporary file in the same folder
+        :param dst: str()
+        :return:
+        """
+        for i in range(self.REPLACE_RETRIES):
+            try:
+                os.replace(src, dst)
+                return
+            except PermissionError:
+                if i == self.REPLACE_RETRIES - 1:
+                    raise
+                time.sleep(self.REPLACE_DELAY)
+
+    def clear(self, kind):
+        """
+        Removes references and their files
+        :param kind: str() - dark, flat or any other value for both
+        :return:
+        """
+        for tkind in self.KINDS:
+            if kind in self.KINDS and kind != tkind:
+                continue
+
+            with self.lock:
+                self.refs[tkind] = None
+                self.meta[tkind] = None
+
+            for ext in (self.NUMPY_EXT, self.META_EXT):
+                try:
+                    os.remove(self.get_filename(tkind, ext=ext))
+                except (IOError, OSError):
+                    pass
+
+        self.update()
+
+    def test_settings(self, settings):
+        """
+        Compares settings of a reference with the current ones
+        :param settings: dict()
+        :return:
+        """
+        if not isinstance(settings, dict) or len(self.settings) == 0:
+            return False
+
+        for (k, v) in self.settings.items():
+            tv = settings.get(k)
+            if isinstance(v, (int, float)) and isinstance(tv, (int, float)):
+                if abs(v - tv) > self.SETTINGS_TOLERANCE * max(abs(v), abs(tv), 1.):
+                    return False
+            elif v != tv:
+                return False
+        return True
+
+    def set_settings(self, settings):
+        """
+        Sets current camera settings, references captured with other settings are invalidated
+        :param settings: dict() - exposure, gain, pixel format
+        :return:
+        """
+        if settings != self.settings:
+            self.settings = dict(settings)
+            self.update()
+
+    def update(self):
+        """
+        Recalculates validity of the references and the fixed-point gain map
+        The gain map is rebuilt only if the flat or the dark it depends on change
+        :return:
+        """
+        with self.lock:
+            for kind in self.KINDS:
+                bvalid = self.refs[kind] is not None and self.test_settings(self.meta[kind].get("settings"))
+                if self.valid[kind] and not bvalid:
+                    self.info("The {} reference is invalidated by camera settings ({})".format(kind, self.settings))
+                self.valid[kind] = bvalid
+
+            (dark, flat) = (self.refs[self.KIND_DARK], self.refs[self.KIND_FLAT])
+            if not self.valid[self.KIND_DARK] or (flat is not None and dark.shape != flat.shape):
+                dark = None
+
+            if not self.valid[self.KIND_FLAT]:
+                flat = None
+
+            # settings changes keeping the validity (auto exposure) do not touch the gain map
+            if flat is self.gain_source[0] and dark is self.gain_source[1]:
+                return
+            self.gain_source = (flat, dark)
+
+            gain = None
+            if flat is not None:
+                signal = np.array(flat, dtype=np.float32)
+                if dark is not None:
+                    signal -= dark
+
+                # per channel mean signal over the per pixel signal
+                mean = signal.mean(axis=(0, 1), keepdims=True)
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    tgain = np.where(signal > 0, mean / signal, 1.)
+                tgain = np.clip(tgain, 0., self.GAIN_MAX) * (1 << self.SHIFT)
+                gain = np.rint(tgain).astype(np.int32)
+
+            self.gain = gain
+
+    def request(self, kind, count):
+        """
+        Requests a capture of a reference averaged over a number of frames
+        :param kind: str() - dark or flat
+        :param count: int() - number of frames
+        :return: bool() - True if the request is valid
+        """
+        try:
+            count = int(count)
+        except (TypeError, ValueError):
+            count = 0
+
+        if kind not in self.KINDS or count <= 0:
+            self.error("Invalid reference request ({}, {})".format(kind, count))
+            return False
+
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=self.__class__.__name__)
+            self.capture = {"kind": kind, "count": count, "frames": 0, "sum": None, "pending": 0,
+                            "settings": dict(self.settings)}
+        self.info("Capturing the {} reference of ({}) frames".format(kind, count))
+        return True
+
+    def accumulate(self, img):
+        """
+        Passes a copy of an uncorrected frame to the capture worker - called by the acquisition
+        Frames arriving while the worker is busy are skipped, the capture takes longer
+        :param img: np.ndarray()
+        :return:
+        """
+        with self.lock:
+            capture = self.capture
+            if capture is None or capture["pending"] >= self.CAPTURE_PENDING:
+                return
+            capture["pending"] += 1
+            executor = self.executor
+
+        try:
+            executor.submit(self.accumulate_frame, capture, np.array(img))
+        except RuntimeError:
+            # worker stopped by close()
+            with self.lock:
+                capture["pending"] -= 1
+
+    def accumulate_frame(self, capture, img):
+        """
+        Adds a frame to the reference being captured, saves the reference once complete - capture worker
+        :param capture: dict()
+        :param img: np.ndarray() - copy of the frame
+        :return:
+        """
+        try:
+            with self.lock:
+                if self.capture is not capture:
+                    return
+
+            tsum = capture["sum"]
+            if tsum is None or tsum.shape != img.shape:
+                tsum = capture["sum"] = np.zeros(img.shape, dtype=np.float64)
+                with self.lock:
+                    capture["frames"] = 0
+
+            np.add(tsum, img, out=tsum)
+            with self.lock:
+                capture["frames"] += 1
+                frames = capture["frames"]
+                if frames < capture["count"]:
+                    return
+                if self.capture is capture:
+                    self.capture = None
+
+            tsum /= frames
+            if capture["kind"] == self.KIND_DARK:
+                ref = np.rint(tsum).astype(img.dtype)
+            else:
+                ref = tsum.astype(np.float32)
+            self.save(capture["kind"], ref, frames, capture["settings"])
+        except Exception as e:
+            self.error("Error while capturing the {} reference: {}".format(capture["kind"], e))
+        finally:
+            with self.lock:
+                capture["pending"] -= 1
+
+    def close(self):
+        """
+        Stops the capture worker, a reference being saved is finished
+        :return:
+        """
+        with self.lock:
+            self.capture = None
+            executor, self.executor = self.executor, None
+
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def process(self, img):
+        """
+        Corrects a frame in place - pipeline stage
+        :param img: np.ndarray() - integer frame
+        :return:
+        """
+        with self.lock:
+            dark = self.refs[self.KIND_DARK] if self.valid[self.KIND_DARK] else None
+            gain = self.gain
+
+        if dark is not None and dark.shape != img.shape:
+            dark = None
+        if gain is not None and gain.shape != img.shape:
+            gain = None
+        if dark is None and gain is None:
+            return None
+
+        if self.work is None or self.work.shape != img.shape:
+            self.work = np.empty(img.shape, dtype=np.int32)
+        work = self.work
+
+        if dark is not None:
+            np.subtract(img, dark, out=work, dtype=np.int32)
+            np.maximum(work, 0, out=work)
+        else:
+            np.copyto(work, img)
+
+        if gain is not None:
+            np.multiply(work, gain, out=work)
+            np.right_shift(work, self.SHIFT, out=work)
+            np.minimum(work, np.iinfo(img.dtype).max, out=work)
+
+        np.copyto(img, work, casting="unsafe")
+        return None
+
+    def get_state(self):
+        """
+        Returns state of the references
+        :return: dict()
+        """
+        res = {}
+        with self.lock:
+            for kind in self.KINDS:
+                res[kind] = {"loaded": self.refs[kind] is not None, "valid": self.valid[kind],
+                             "meta": copy.deepcopy(self.meta[kind])}
+
+            res["capture"] = None
+            if self.capture is not None:
+                res["capture"] = {k: self.capture[k] for k in ("kind", "count", "frames")}
+        return res
@@ -0,0 +1,290 @@
+from app.common.imports import *
+
+import importlib
+
+from app.worker.frame_queue import *
+
+__all__ = ["FramePipeline", "ThreadPipelineStage", "register_stage", "unregister_stage", "get_stage_names"]
+
+# registry of stage factories - name: callable(**params) returning callable(np.ndarray) -> np.ndarray or None
+PIPELINE_STAGES = {}
+
+def register_stage(name, factory):
+    """
+    Registers a factory of a pipeline stage
+    :param name: str() - name used in the configuration file
+    :param factory: callable(**params) - returns a callable processing a frame (np.ndarray) in place or returning a new array
+    :return:
+    """
+    PIPELINE_STAGES[name] = factory
+
+def unregister_stage(name):
+    """
+    Removes a factory of a pipeline stage
+    :param name: str()
+    :return: bool() - True if the stage was registered
+    """
+    return PIPELINE_STAGES.pop(name, None) is not None
+
+def get_stage_names():
+    """
+    Returns names of the registered stages
+    :return:
+    """
+    return sorted(PIPELINE_STAGES.keys())
+
+def stage_blur(ksize=3):
+    """
+    Gaussian blur - noise reduction
+    :param ksize: int() - odd kernel size
+    :return:
+    """
+    ksize = int(ksize) | 1
+    return lambda img: cv2.GaussianBlur(img, (ksize, ksize), 0, dst=img)
+
+def stage_invert():
+    """
+    Inverts the frame
+    :return:
+    """
+    return lambda img: cv2.bitwise_not(img, dst=img)
+
+register_stage("blur", stage_blur)
+register_stage("invert", stage_invert)
+
+
+class ThreadPipelineStage(threading.Thread, Tester):
+    """
+    Thread running a single stage of the pipeline
+    Frames are processed in the order of arrival; if frames pile up at the input, the stage is bypassed until it catches up
+    """
+    MILLISECONDS = 1000.
+    TIMING_WEIGHT = 0.1     # weight of the last frame in the mean processing time
+
+    def __init__(self, name, func, qin: FrameQueue, output, backlog=1, timeout=0.5):
+        """
+        Class constructor
+        :param name: str() - stage name
+        :param func: callable(np.ndarray) - processes a frame in place or returns a new array of the same shape
+        :param qin: FrameQueue() - input frames
+        :param output: callable(FrameBuffer) - next stage or the consumer of processed frames
+        :param backlog: int() - frames waiting at the input above which the stage is bypassed
+        :param timeout: float() - delay between tests for the stop event
+        """
+        threading.Thread.__init__(self)
+        Tester.__init__(self, def_file="{}-{}".format(self.__class__.__name__, threading.current_thread().name))
+
+        self.name = name
+        self.func = func
+        self.qin = qin
+        self.output = output
+        self.backlog = backlog
+        self.timeout = timeout
+
+        self.evstop = threading.Event()
+
+        self.stats_lock = threading.Lock()
+        self.processed = 0
+        self.bypassed = 0
+        self.errors = 0
+        self.time_last = 0.
+        self.time_mean = 0.
+
+        self.daemon = True
+
+    def run(self):
+        """
+        Main loop of the stage
+        :return:
+        """
+        while not self.evstop.is_set():
+            try:
+                img = self.qin.get(timeout=self.timeout)
+            except queue.Empty:
+                continue
+
+            if self.qin.qsize() >= self.backlog:
+                with self.stats_lock:
+                    self.bypassed += 1
+            else:
+                self.process(img)
+
+            try:
+                self.output(img)
+            except Exception as e:
+                # the next stage or the consumer failed - the stage keeps running
+                self.error("Error while passing a frame from stage ({}): {}".format(self.name, e))
+
+    def process(self, img):
+        """
+        Applies the stage function to a frame buffer, keeps track of the processing time
+        :param img: FrameBuffer()
+        :return:
+        """
+        ts = time.perf_counter()
+        berror = False
+        try:
+            res = self.func(img.data)
+            if res is not None and res is not img.data:
+                if res.shape != img.data.shape:
+                    raise ValueError("stage changes the frame shape {} -> {}".format(img.data.shape, res.shape))
+                np.copyto(img.data, res, casting="unsafe")
+        except (ValueError, TypeError, AttributeError, cv2.error) as e:
+            berror = True
+            self.error("Error in stage ({}): {}".format(self.name, e))
+
+        td = (time.perf_counter() - ts) * self.MILLISECONDS
+        with self.stats_lock:
+            self.processed += 1
+            if berror:
+                self.errors += 1
+            self.time_last = td
+            if self.processed == 1:
+                self.time_mean = td
+            else:
+                self.time_mean += (td - self.time_mean) * self.TIMING_WEIGHT
+
+    def get_stats(self):
+        """
+        Returns processing statistics of the stage - times in ms
+        :return: dict()
+        """
+        with self.stats_lock:
+            return {"processed": self.processed, "bypassed": self.bypassed, "errors": self.errors,
+                    "last": self.time_last, "mean": self.time_mean}
+
+    def stop(self):
+        """
+        Stops the stage and waits for it
+        :return:
+        """
+        self.evstop.set()
+        if self.is_alive() and threading.current_thread() != self:
+            self.join()
+
+
+class FramePipeline(Tester):
+    """
+    Chain of processing stages between acquisition and display
+    Each stage runs in its own thread connected by bounded frame queues - frames keep their order
+    """
+    QUEUE_SIZE = 4      # frames waiting at the input of a stage
+    BACKLOG = 2         # waiting frames above which a stage is bypassed
+
+    def __init__(self, stages, output, queue_size=QUEUE_SIZE, backlog=BACKLOG):
+        """
+        Class constructor
+        :param stages: list() - (name, callable) tuples
+        :param output: callable(FrameBuffer) - consumer of processed frames
+        :param queue_size: int() - frames waiting at the input of a stage, the oldest one is dropped on overflow
+        :param backlog: int() - waiting frames above which a stage is bypassed
+        """
+        Tester.__init__(self, def_file="{}".format(self.__class__.__name__.lower()))
+
+        self.queues = []
+        self.stages = []
+
+        # stages are chained from the end - every stage passes frames to the input queue of the next one
+        tout = output
+        for (name, func) in reversed(stages):
+            qin = FrameQueue(maxsize=queue_size, policy=FrameQueue.POLICY_DROP_OLDEST)
+            stage = ThreadPipelineStage(name, func, qin, tout, backlog=backlog)
+
+            self.queues.insert(0, qin)
+            self.stages.insert(0, stage)
+            tout = qin.put
+
+        self.debug("Pipeline stages ({})".format([stage.name for stage in self.stages]))
+
+    @classmethod
+    def create_stages(cls, spec, factories=None):
+        """
+        Creates stage callables from a configuration
+        :param spec: list() - stage names, [name, {params}] pairs or "module:factory" strings
+        :param factories: dict() - stage factories of the caller, take precedence over the registered ones
+        :return: list() - (name, callable) tuples
+        """
+        if not isinstance(factories, dict):
+            factories = {}
+
+        res = []
+        if not isinstance(spec, (list, tuple)):
+            return res
+
+        for item in spec:
+            params = {}
+            if isinstance(item, (list, tuple)) and len(item) > 0:
+                name = item[0]
+                if len(item) > 1 and isinstance(item[1], dict):
+                    params = item[1]
+            else:
+                name = item
+
+            if not isinstance(name, str):
+                raise ValueError("Invalid pipeline stage ({})".format(item))
+
+            if name in factories:
+                factory = factories[name]
+            elif name in PIPELINE_STAGES:
+                factory = PIPELINE_STAGES[name]
+            elif ":" in name:
+                (module, attr) = name.split(":", 1)
+                try:
+                    factory = getattr(importlib.import_module(module), attr)
+                except (ImportError, AttributeError) as e:
+                    raise ValueError("Cannot import pipeline stage ({}): {}".format(name, e))
+            else:
+                raise ValueError("Unknown pipeline stage ({}), available ({})".format(
+                    name, sorted(set(get_stage_names()) | set(factories.keys()))))
+
+            # a factory without parameters fails on the call itself - reported with the stage name
+            try:
+                func = factory(**params)
+            except TypeError as e:
+                raise ValueError("Invalid parameters ({}) of the pipeline stage ({}): {}".format(params, name, e))
+
+            if not callable(func):
+                raise ValueError("Factory of the pipeline stage ({}) did not return a callable".format(name))
+
+            res.append((name, func))
+        return res
+
+    def start(self):
+        for stage in self.stages:
+            stage.start()
+
+    def put(self, img):
+        """
+        Passes a frame to the first stage
+        :param img: FrameBuffer()
+        :return:
+        """
+        self.queues[0].put(img)
+
+    def test_empty(self):
+        return len(self.stages) == 0
+
+    def get_dropped(self):
+        """
+        Returns number of frames dropped at the inputs of the stages
+        :return:
+        """
+        return sum([q.get_dropped() for q in self.queues])
+
+    def get_stats(self):
+        """
+        Returns statistics per stage
+        :return: dict()
+        """
+        return {stage.name: stage.get_stats() for stage in self.stages}
+
+    def stop(self):
+        """
+        Stops the stages, frames waiting in the pipeline are released
+        :return:
+        """
+        for stage in self.stages:
+            stage.stop()
+
+        for q in self.queues:
+            q.clear()
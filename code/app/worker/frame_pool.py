@@ -0,0 +1,226 @@
+from app.common.imports import *
+
+__all__ = ["FrameBuffer", "FramePool"]
+
+class FrameBuffer(object):
+    """
+    Preallocated numpy frame buffer handed over between threads together with the metadata of the frame
+    Only one party owns the buffer at a time; the owner calls release() once it is done with the data
+    Records are reused by the pool - metadata is overwritten per frame, nothing is allocated for it
+    """
+    __slots__ = ("pool", "generation", "data", "bowned", "raw", "roi", "full", "view",
+                 "frame_id", "timestamp", "exposure", "gain", "pixel_format",
+                 "ts_capture", "ts_convert", "ts_emit", "ts_process", "ts_set")
+
+    def __init__(self, pool, shape, dtype, generation=0):
+        """
+        Class constructor
+        :param pool: FramePool() - pool the buffer returns to
+        :param shape: tuple() - shape of the frame
+        :param dtype: numpy dtype of the frame
+        :param generation: int() - pool generation the buffer belongs to
+        """
+        self.pool = pool
+        self.generation = generation
+
+        self.data = np.empty(shape, dtype=dtype)
+
+        # ownership flag - False while the buffer waits in the pool
+        self.bowned = False
+
+        # source buffer the frame was converted from (raw bayer frame), released together with the frame
+        self.raw = None
+
+        # acquired region [x, y, width, height, sensor width, sensor height] in unbinned sensor pixels, None - unknown
+        self.roi = None
+
+        # full resolution frame the view was converted from, released together with the view
+        self.full = None
+
+        # region [x, y, width, height, frame width, frame height] of the full frame shown by the view, None - full frame
+        self.view = None
+
+        # metadata of the vimba frame - id, device timestamp (ticks), exposure and gain at the capture, pixel format
+        self.frame_id = None
+        self.timestamp = None
+        self.exposure = None
+        self.gain = None
+        self.pixel_format = None
+
+        # time.perf_counter() stamps - vimba callback, converted for display, posted to the display, taken by the
+        # display, shown in the scene
+        self.ts_capture = None
+        self.ts_convert = None
+        self.ts_emit = None
+        self.ts_process = None
+        self.ts_set = None
+
+    def copy_meta(self, src):
+        """
+        Copies the acquired region and the metadata of the frame this one is converted from
+        :param src: FrameBuffer()
+        :return:
+        """
+        self.roi = src.roi
+        self.frame_id = src.frame_id
+        self.timestamp = src.timestamp
+        self.exposure = src.exposure
+        self.gain = src.gain
+        self.pixel_format = src.pixel_format
+        self.ts_capture = src.ts_capture
+
+    def get_meta(self):
+        """
+        Returns the metadata of the frame
+        :return: dict()
+        """
+        return {"frame_id": self.frame_id, "timestamp": self.timestamp, "exposure": self.exposure, "gain": self.gain,
+                "pixel_format": None if self.pixel_format is None else str(self.pixel_format), "roi": self.roi}
+
+    def release(self):
+        """
+        Returns the buffer to the pool
+        :return:
+        """
+        if self.raw is not None:
+            self.raw.release()
+            self.raw = None
+
+        if self.full is not None:
+            self.full.release()
+            self.full = None
+
+        if self.pool is not None:
+            self.pool.release(self)
+
+
+class FramePool(object):
+    """
+    Pool of preallocated frame buffers of the same shape and type
+    Buffers are allocated lazily up to the pool size; if all of them are in use the frame is dropped
+    Buffers are recycled explicitly - memory of the frames never depends on the garbage collector
+    """
+    DEFAULT_SIZE = 6
+
+    def __init__(self, size=DEFAULT_SIZE):
+        """
+        Class constructor
+        :param size: int() - maximum number of buffers
+        """
+        if not isinstance(size, int) or size < 1:
+            size = self.DEFAULT_SIZE
+
+        self.size = size
+
+        self._lock = threading.Lock()
+        self._free = []
+
+        # shape, type of the buffers; generation changes with a new shape, stale buffers are not recycled
+        self.shape = None
+        self.dtype = None
+        self.generation = 0
+
+        # buffers of all generations which are not discarded yet - stale buffers still in use count to the size
+        self.allocated = 0
+        self.dropped = 0
+
+        # memory held by the buffers of all generations which are not discarded yet
+        self.resident = 0
+        self.in_use = 0
+
+    def acquire(self, shape, dtype):
+        """
+        Returns a free buffer or None if the pool is exhausted
+        :param shape: tuple() - shape of the frame
+        :param dtype: numpy dtype of the frame
+        :return: FrameBuffer() or None
+        """
+        res = None
+        dtype = np.dtype(dtype)
+
+        with self._lock:
+            if shape != self.shape or dtype != self.dtype:
+                self._discard_free()
+                self.shape = shape
+                self.dtype = dtype
+
+            if len(self._free) > 0:
+                res = self._free.pop()
+            elif self.allocated < self.size:
+                res = FrameBuffer(self, shape, dtype, generation=self.generation)
+                self.allocated += 1
+                self.resident += res.data.nbytes
+            else:
+                self.dropped += 1
+                return res
+
+            res.bowned = True
+            self.in_use += 1
+        return res
+
+    def release(self, buf: FrameBuffer):
+        """
+        Gives a buffer back to the pool
+        :param buf:
+        :return:
+        """
+        with self._lock:
+            if not buf.bowned:
+                return
+
+            buf.bowned = False
+            self.in_use -= 1
+            if buf.generation == self.generation:
+                self._free.append(buf)
+            else:
+                # stale buffer of a previous shape - dropping the last reference frees the memory
+                self.allocated -= 1
+                self.resident -= buf.data.nbytes
+                buf.pool = None
+
+    def close(self):
+        """
+        Discards free buffers; buffers still in use are discarded on release
+        :return:
+        """
+        with self._lock:
+            self._discard_free()
+
+    def _discard_free(self):
+        """
+        Starts a new generation of buffers, free buffers of the old one are discarded
+        Buffers of the old one still in use keep counting to the size until they are released
+        Should be called with the lock acquired
+        :return:
+        """
+        for buf in self._free:
+            self.resident -= buf.data.nbytes
+            buf.pool = None
+
+        self.allocated -= len(self._free)
+        self._free = []
+        self.generation += 1
+
+    def get_resident_bytes(self):
+        """
+        Returns memory held by frame buffers - in the pool and in use
+        :return:
+        """
+        with self._lock:
+            return self.resident
+
+    def get_in_use(self):
+        """
+        Returns number of buffers owned outside of the pool
+        :return:
+        """
+        with self._lock:
+            return self.in_use
+
+    def get_dropped(self):
+        """
+        Returns number of frames dropped due to pool exhaustion
+        :return:
+        """
+        with self._lock:
+            return self.dropped
@@ -0,0 +1,237 @@
+from app.common.imports import *
+
+import collections
+
+__all__ = ["FrameQueue", "ThreadFrameConsumer", "FrameMailbox"]
+
+class FrameQueue(object):
+    """
+    Bounded queue passing frames from the vimba callback to a consumer
+    The producer never blocks - on overflow either the oldest or the newest frame is dropped
+    """
+    POLICY_DROP_OLDEST = "drop_oldest"
+    POLICY_DROP_NEWEST = "drop_newest"
+
+    POLICIES = (POLICY_DROP_OLDEST, POLICY_DROP_NEWEST)
+
+    def __init__(self, maxsize=2, policy=POLICY_DROP_OLDEST):
+        """
+        Class constructor
+        :param maxsize: int() - maximum number of frames waiting for the consumer
+        :param policy: str() - POLICY_DROP_OLDEST or POLICY_DROP_NEWEST
+        """
+        if policy not in self.POLICIES:
+            policy = self.POLICY_DROP_OLDEST
+
+        self.maxsize = max(1, int(maxsize))
+        self.policy = policy
+
+        self._items = collections.deque()
+        self._cond = threading.Condition(threading.Lock())
+
+        self.dropped = 0
+
+    def put(self, item):
+        """
+        Adds a frame without blocking
+        :param item:
+        :return: bool() - False if the item itself was dropped
+        """
+        res = True
+        tdrop = None
+        with self._cond:
+            if len(self._items) >= self.maxsize:
+                self.dropped += 1
+                if self.policy == self.POLICY_DROP_NEWEST:
+                    tdrop = item
+                    res = False
+                else:
+                    tdrop = self._items.popleft()
+
+            if res:
+                self._items.append(item)
+                self._cond.notify()
+
+        if tdrop is not None:
+            self._discard(tdrop)
+        return res
+
+    def get(self, timeout=None):
+        """
+        Returns the oldest frame waiting in the queue
+        :param timeout: float() - seconds to wait, None - wait forever
+        :return:
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: len(self._items) > 0, timeout=timeout):
+                raise queue.Empty
+            return self._items.popleft()
+
+    def clear(self):
+        """
+        Drops all frames waiting in the queue
+        :return:
+        """
+        with self._cond:
+            titems = list(self._items)
+            self._items.clear()
+
+        for item in titems:
+            self._discard(item)
+
+    def qsize(self):
+        with self._cond:
+            return len(self._items)
+
+    def get_dropped(self):
+        with self._cond:
+            return self.dropped
+
+    def _discard(self, item):
+        """
+        Gives a dropped frame back to its owner if it supports it
+        :param item:
+        :return:
+        """
+        try:
+            item.release()
+        except AttributeError:
+            pass
+
+
+class ThreadFrameConsumer(threading.Thread, Tester):
+    """
+    Thread taking frames out of a FrameQueue and passing them to a function
+    """
+    def __init__(self, qframes: FrameQueue, func, timeout=0.5):
+        """
+        Class constructor
+        :param qframes: FrameQueue() - source of the frames
+        :param func: callable() - function receiving a frame
+        :param timeout: float() - delay between tests for the stop event
+        """
+        threading.Thread.__init__(self)
+        Tester.__init__(self, def_file="{}-{}".format(self.__class__.__name__, threading.current_thread().name))
+
+        self.qframes = qframes
+        self.func = func
+        self.timeout = timeout
+
+        self.evstop = threading.Event()
+
+        self.daemon = True
+
+    def run(self):
+        """
+        Main loop of the consumer
+        :return:
+        """
+        while not self.evstop.is_set():
+            try:
+                item = self.qframes.get(timeout=self.timeout)
+            except queue.Empty:
+                continue
+
+            try:
+                self.func(item)
+            except Exception as e:
+                # processing of a frame failed - the consumer keeps running
+                self.error("Error while consuming a frame: {}".format(e))
+
+    def stop(self):
+        """
+        Stops the consumer and waits for it
+        :return:
+        """
+        self.evstop.set()
+        if self.is_alive() and threading.current_thread() != self:
+            self.join()
+
+
+class FrameMailbox(object):
+    """
+    Single slot hand-off of the latest frame - a frame which was not taken yet is superseded by a newer one
+    Keeps track of acquired, displayed and superseded frames
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._item = None
+
+        self.acquired = 0
+        self.displayed = 0
+        self.superseded = 0
+
+    def post(self, item):
+        """
+        Places a frame into the slot, an older frame is released
+        :param item:
+        :return: bool() - True if the slot was empty and the consumer has to be notified
+        """
+        with self._lock:
+            told, self._item = self._item, item
+            self.acquired += 1
+            if told is not None:
+                self.superseded += 1
+
+        if told is not None:
+            self._discard(told)
+        return told is None
+
+    def take(self):
+        """
+        Takes the latest frame out of the slot
+        :return: frame or None if the slot is empty
+        """
+        with self._lock:
+            res, self._item = self._item, None
+        return res
+
+    def test_pending(self):
+        """
+        Tests for a frame waiting in the slot
+        :return: bool()
+        """
+        with self._lock:
+            return self._item is not None
+
+    def mark_displayed(self):
+        """
+        Counts a frame taken from the slot and displayed
+        :return:
+        """
+        with self._lock:
+            self.displayed += 1
+
+    def clear(self):
+        """
+        Releases a frame waiting in the slot
+        :return:
+        """
+        item = self.take()
+        if item is not None:
+            self._discard(item)
+
+    def reset(self):
+        """
+        Clears the slot and the counters
+        :return:
+        """
+        self.clear()
+        with self._lock:
+            self.acquired = 0
+            self.displayed = 0
+            self.superseded = 0
+
+    def get_counters(self):
+        """
+        Returns acquired, displayed and superseded frame counters
+        :return: tuple()
+        """
+        with self._lock:
+            return (self.acquired, self.displayed, self.superseded)
+
+    def _discard(self, item):
+        try:
+            item.release()
+        except AttributeError:
+            pass
@@ -0,0 +1,149 @@
+from app.common.imports import *
+from app.common.keys import *
+
+from vimba import Camera, VimbaFeatureError
+
+__all__ = ["FrameRateGovernor"]
+
+class FrameRateGovernor(Tester):
+    """
+    Keeps acquisition at a target frame rate
+    The rate is set on the camera (AcquisitionFrameRateAbs/AcquisitionFrameRate) when available,
+    otherwise the acquisition loop is paced on the host
+    """
+    # features limiting the frame rate on the camera - GigE, USB3 naming
+    RATE_FEATURES = (CAMERA_ACQ_FRAMERATEABS, CAMERA_ACQ_FRAMERATE)
+
+    # rate <= 0 - maximum rate supported by the camera
+    RATE_MAX = 0.
+
+    def __init__(self, rate=RATE_MAX):
+        """
+        Class constructor
+        :param rate: float() - target frame rate (Hz), <=0 - maximum rate
+        """
+        Tester.__init__(self, def_file="{}".format(self.__class__.__name__.lower()))
+
+        self.lock = threading.Lock()
+
+        self.rate = self.RATE_MAX
+        self.period = 0.
+
+        # camera side rate control
+        self.feature = None
+        self.feature_enable = None
+
+        # time of the last paced frame
+        self.ts_last = None
+
+        self.set_period(rate)
+
+    def set_period(self, rate):
+        """
+        Sets the target rate used for host pacing
+        :param rate:
+        :return:
+        """
+        try:
+            rate = float(rate)
+        except (TypeError, ValueError):
+            rate = self.RATE_MAX
+
+        with self.lock:
+            self.rate = max(rate, self.RATE_MAX)
+            self.period = 1. / self.rate if self.rate > 0 else 0.
+
+    def open(self, cam: Camera):
+        """
+        Looks for camera side frame rate control and applies the target rate
+        :param cam: Camera() - opened camera
+        :return:
+        """
+        for name in self.RATE_FEATURES:
+            try:
+                self.feature = cam.get_feature_by_name(name)
+                self.debug("Camera frame rate feature ({})".format(name))
+                break
+            except VimbaFeatureError:
+                pass
+
+        # usb cameras ignore the rate unless it is explicitly enabled
+        try:
+            self.feature_enable = cam.get_feature_by_name(CAMERA_ACQ_FRAMERATE_ENABLE)
+        except VimbaFeatureError:
+            self.feature_enable = None
+
+        if self.feature is None:
+            self.info("Camera has no frame rate control, pacing on the host")
+
+        return self.set_rate(self.get_rate())
+
+    def close(self):
+        """
+        Forgets the camera side frame rate control
+        :return:
+        """
+        self.feature = None
+        self.feature_enable = None
+
+    def test_camera(self):
+        """
+        Tests if the frame rate is controlled by the camera
+        :return:
+        """
+        return self.feature is not None
+
+    def set_rate(self, rate):
+        """
+        Sets a new target frame rate
+        :param rate: float() - target frame rate (Hz), <=0 - maximum rate
+        :return: float() - rate set on the camera, target rate for host pacing
+        """
+        self.set_period(rate)
+        rate = self.get_rate()
+
+        res = rate
+        if self.test_camera():
+            try:
+                (fmin, fmax) = self.feature.get_range()
+
+                if self.feature_enable is not None:
+                    self.feature_enable.set(rate > 0)
+
+                if rate > 0:
+                    self.feature.set(min(max(rate, fmin), fmax))
+                elif self.feature_enable is None:
+                    self.feature.set(fmax)
+
+                res = self.feature.get()
+            except (AttributeError, VimbaFeatureError) as e:
+                self.error("Cannot set camera frame rate ({}), pacing on the host: {}".format(rate, e))
+                self.close()
+
+        self.info("Target frame rate ({} Hz); camera side ({}); applied ({})".format(rate, self.test_camera(), res))
+        return res
+
+    def get_rate(self):
+        """
+        Returns the target frame rate
+        :return:
+        """
+        with self.lock:
+            return self.rate
+
+    def wait(self, bforce=False):
+        """
+        Paces the acquisition loop on the host
+        Does nothing if the camera controls the rate, unless forced - frame by frame acquisition
+        :param bforce: bool() - pace even if the camera controls the rate
+        :return:
+        """
+        with self.lock:
+            period = self.period
+
+        if period > 0 and (bforce or not self.test_camera()) and self.ts_last is not None:
+            delay = self.ts_last + period - time.time()
+            if delay > 0:
+                time.sleep(delay)
+
+        self.ts_last = time.time()
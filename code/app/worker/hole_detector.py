@@ -0,0 +1,202 @@
+from app.common.imports import *
+from app.common.keys import *
+
+__all__ = ["HoleDetector"]
+
+class HoleDetector(Tester):
+    """
+    Gasket hole (sample chamber) detection on a decimated level of the image pyramid
+    The dark hole is segmented by Otsu thresholding and fitted by an ellipse, Hough circles are the fallback
+    The result is cached until the decimated frame changes significantly
+    """
+    METHOD_CONTOUR = "contour"
+    METHOD_HOUGH = "hough"
+
+    DEFAULT_LEVELS = 2          # pyramid levels, every level halves the frame size
+    MAX_LEVELS = 5
+
+    CHANGE_LEVEL = 6.           # mean absolute difference (8-bit counts) of the decimated frames triggering a detection
+
+    AREA_MIN = 0.002            # smallest hole area, fraction of the frame
+    CIRCULARITY_MIN = 0.7       # 4*pi*area/perimeter^2 of a hole contour
+
+    HOUGH_DP = 1.5
+    HOUGH_CANNY = 100
+    HOUGH_ACCUMULATOR = 30
+    HOUGH_RADIUS = (0.05, 0.5)  # radius range, fraction of the smaller frame dimension
+
+    MILLISECONDS = 1000.
+
+    def __init__(self, output=None, benabled=False, levels=DEFAULT_LEVELS, order=COLOR_ORDER_BGR):
+        """
+        Class constructor
+        :param output: callable(dict) - receives detection results
+        :param benabled: bool() - detection state
+        :param levels: int() - pyramid level of the detection
+        :param order: str() - channel order of color frames - bgr, rgb
+        """
+        Tester.__init__(self, def_file="{}".format(self.__class__.__name__.lower()))
+
+        self.output = output
+        self.gray = cv2.COLOR_RGB2GRAY if order == COLOR_ORDER_RGB else cv2.COLOR_BGR2GRAY
+
+        self.lock = threading.Lock()
+
+        self.benabled = False
+        self.levels = self.DEFAULT_LEVELS
+
+        # parameter generation - the cached result is dropped on change
+        self.generation = 0
+
+        # decimated frame of the last detection and its generation - owned by the processing thread
+        self.reference = None
+        self.reference_generation = None
+
+        self.kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+
+        self.set_params(benabled=benabled, levels=levels)
+
+    def set_params(self, benabled=None, levels=None):
+        """
+        Changes detection parameters
+        :param benabled: bool() - detection state
+        :param levels: int() - pyramid level of the detection
+        :return: bool() - True if the parameters are valid
+        """
+        res = True
+        bdisabled = False
+        with self.lock:
+            if benabled is not None:
+                bdisabled = self.benabled and not benabled
+                self.benabled = bool(benabled)
+
+            if levels is not None:
+                try:
+                    self.levels = min(max(0, int(levels)), self.MAX_LEVELS)
+                except (TypeError, ValueError):
+                    res = False
+
+            self.generation += 1
+
+        if not res:
+            self.error("Invalid hole detection parameters ({}, {})".format(benabled, levels))
+        self.info("Hole detection ({}); pyramid levels ({})".format(self.benabled, self.levels))
+
+        # the last result is withdrawn
+        if bdisabled:
+            self.report({})
+        return res
+
+    def test_enabled(self):
+        with self.lock:
+            return self.benabled
+
+    def report(self, res):
+        if self.output is not None:
+            try:
+                self.output(res)
+            except (RuntimeError, AttributeError) as e:
+                self.error("Error while reporting a hole: {}".format(e))
+
+    def decimate(self, img, levels):
+        """
+        Returns an 8-bit grayscale pyramid level of the frame - color is converted after the decimation
+        :param img: np.ndarray() - frame (H, W, C)
+        :param levels: int()
+        :return: np.ndarray() - (H / 2^levels, W / 2^levels)
+        """
+        res = img
+        if img.ndim == 3 and img.shape[2] == 1:
+            res = img[..., 0]
+
+        for i in range(levels):
+            res = cv2.pyrDown(res)
+
+        if res.ndim == 3:
+            res = cv2.cvtColor(res, self.gray)
+
+        # min-max stretch - exposure changes do not trigger a detection, 16-bit frames are thresholded as 8-bit
+        return cv2.normalize(res, None, 0, 255, cv2.NORM_MINMAX, cv2.CV_8U)
+
+    def process(self, img):
+        """
+        Detects the hole if the frame changed significantly since the last detection, reports the result - pipeline stage
+        :param img: np.ndarray() - frame (H, W, C)
+        :return:
+        """
+        with self.lock:
+            (benabled, levels, generation) = (self.benabled, self.levels, self.generation)
+
+        if not benabled:
+            self.reference = None
+            return None
+
+        ts = time.perf_counter()
+        small = self.decimate(img, levels)
+
+        if self.reference is not None and self.reference_generation == generation and self.reference.shape == small.shape:
+            if cv2.mean(cv2.absdiff(small, self.reference))[0] < self.CHANGE_LEVEL:
+                return None
+
+        self.reference = small
+        self.reference_generation = generation
+
+        res = self.detect(small)
+        if res["found"]:
+            # centers of the decimated pixels to the frame pixels
+            scale = float(1 << levels)
+            res.update({"x": (res["x"] + 0.5) * scale - 0.5, "y": (res["y"] + 0.5) * scale - 0.5,
+                        "width": res["width"] * scale, "height": res["height"] * scale})
+
+        res.update({"level": levels, "time": (time.perf_counter() - ts) * self.MILLISECONDS})
+        self.report(res)
+        return None
+
+    def detect(self, img):
+        """
+        Fits the dark hole by an ellipse, falls back to Hough circles
+        :param img: np.ndarray() - 8-bit decimated frame
+        :return: dict() - center, axes and angle (deg.) of the ellipse in the decimated pixels
+        """
+        (h, w) = img.shape[:2]
+        blurred = cv2.GaussianBlur(img, (5, 5), 0)
+
+        # the hole is dark - it becomes the foreground
+        (level, mask) = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, self.kernel)
+
+        contours = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)[-2]
+
+        best = None
+        for contour in contours:
+            area = cv2.contourArea(contour)
+            if area < self.AREA_MIN * w * h or len(contour) < 5:
+                continue
+
+            # the hole is surrounded by the gasket
+            (bx, by, bw, bh) = cv2.boundingRect(contour)
+            if bx <= 0 or by <= 0 or bx + bw >= w or by + bh >= h:
+                continue
+
+            perimeter = cv2.arcLength(contour, True)
+            if perimeter <= 0 or 4. * np.pi * area / (perimeter * perimeter) < self.CIRCULARITY_MIN:
+                continue
+
+            if best is None or area > best[0]:
+                best = (area, contour)
+
+        if best is not None:
+            ((x, y), (ew, eh), angle) = cv2.fitEllipse(best[1])
+            return {"found": True, "method": self.METHOD_CONTOUR, "x": x, "y": y, "width": ew, "height": eh,
+                    "angle": angle}
+
+        size = min(h, w)
+        circles = cv2.HoughCircles(blurred, cv2.HOUGH_GRADIENT, self.HOUGH_DP, size,
+                                   param1=self.HOUGH_CANNY, param2=self.HOUGH_ACCUMULATOR,
+                                   minRadius=int(size * self.HOUGH_RADIUS[0]), maxRadius=int(size * self.HOUGH_RADIUS[1]))
+        if circles is not None and len(circles[0]) > 0:
+            (x, y, r) = [float(v) for v in circles[0][0][:3]]
+            return {"found": True, "method": self.METHOD_HOUGH, "x": x, "y": y, "width": 2. * r, "height": 2. * r,
+                    "angle": 0.}
+
+        return {"found": False}
@@ -0,0 +1,110 @@
+from app.common.imports import *
+
+__all__ = ["LatencyStats"]
+
+class LatencyStats(object):
+    """
+    Rolling latency statistics of the displayed frames per stage between the sensor and the screen
+    Stamps (time.perf_counter()) are carried by the frame records; a frame is recorded once it is painted
+    The last WINDOW frames are kept in preallocated arrays, percentiles are computed only on request
+    """
+    STAGE_CONVERT = "convert"       # vimba callback to the frame converted for display - queue, pipeline, conversions
+    STAGE_EMIT = "emit"             # posting into the mailbox and the signal
+    STAGE_PROCESS = "process"       # waiting for the GUI thread - signal delivery or the display clock
+    STAGE_SET = "set"               # image or texture set in the scene
+    STAGE_PAINT = "paint"           # repaint of the view
+    STAGE_TOTAL = "total"           # vimba callback to the end of the paint
+
+    STAGES = (STAGE_CONVERT, STAGE_EMIT, STAGE_PROCESS, STAGE_SET, STAGE_PAINT, STAGE_TOTAL)
+
+    PERCENTILES = (50, 95, 99)
+
+    WINDOW = 512
+    MILLISECONDS = 1000.
+
+    def __init__(self, window=WINDOW):
+        """
+        Class constructor
+        :param window: int() - number of frames the statistics are calculated from
+        """
+        if not isinstance(window, int) or window < 2:
+            window = self.WINDOW
+
+        self.window = window
+
+        self._lock = threading.Lock()
+
+        # stage durations (s) per frame and the paint time of the frames - ring buffers
+        self._values = np.zeros((window, len(self.STAGES)), dtype=np.float64)
+        self._times = np.zeros(window, dtype=np.float64)
+
+        self.count = 0
+
+    def record(self, ts_capture, ts_convert, ts_emit, ts_process, ts_set, ts_paint):
+        """
+        Records the stamps of a painted frame
+        :param ts_capture: float() - vimba callback
+        :param ts_convert: float() - frame converted for display
+        :param ts_emit: float() - frame posted into the mailbox
+        :param ts_process: float() - frame taken by the GUI thread
+        :param ts_set: float() - image set in the scene
+        :param ts_paint: float() - end of the paint
+        :return:
+        """
+        if ts_capture is None or ts_convert is None:
+            return
+
+        with self._lock:
+            i = self.count % self.window
+            row = self._values[i]
+            row[0] = ts_convert - ts_capture
+            row[1] = ts_emit - ts_convert
+            row[2] = ts_process - ts_emit
+            row[3] = ts_set - ts_process
+            row[4] = ts_paint - ts_set
+            row[5] = ts_paint - ts_capture
+            self._times[i] = ts_paint
+            self.count += 1
+
+    def reset(self):
+        with self._lock:
+            self.count = 0
+
+    def get_stats(self):
+        """
+        Returns percentiles and the mean of every stage (ms) and the rate of the painted frames (Hz)
+        :return: dict()
+        """
+        with self._lock:
+            n = min(self.count, self.window)
+            values = self._values[:n].copy()
+            times = self._times[:n].copy()
+            count = self.count
+
+        res = {"frames": count, "window": n, "rate": 0.}
+        if n > 1 and times.max() > times.min():
+            res["rate"] = (n - 1) / float(times.max() - times.min())
+
+        if n > 0:
+            pct = np.percentile(values, self.PERCENTILES, axis=0) * self.MILLISECONDS
+            mean = np.mean(values, axis=0) * self.MILLISECONDS
+            for (j, stage) in enumerate(self.STAGES):
+                res[stage] = {"p{}".format(p): float(pct[k][j]) for (k, p) in enumerate(self.PERCENTILES)}
+                res[stage]["mean"] = float(mean[j])
+        return res
+
+    def format_stats(self, stats=None):
+        """
+        Returns the statistics as lines of text - on-screen overlay
+        :param stats: dict() - result of get_stats(), None - current statistics
+        :return: list()
+        """
+        if stats is None:
+            stats = self.get_stats()
+
+        res = ["Latency (ms) p50 / p95 / p99; {:.1f} Hz".format(stats["rate"])]
+        for stage in self.STAGES:
+            if stage in stats:
+                v = stats[stage]
+                res.append("{:>8}: {:7.2f} {:7.2f} {:7.2f}".format(stage, v["p50"], v["p95"], v["p99"]))
+        return res
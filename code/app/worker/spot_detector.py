@@ -0,0 +1,284 @@
+from app.common.imports import *
+from app.common.keys import *
+
+__all__ = ["SpotDetector"]
+
+class SpotDetector(Tester):
+    """
+    Laser spot detection - intensity weighted centroid of the thresholded frame within a region of interest
+    The centroid can be refined by a 2D gaussian fit; under load only every Nth frame is analysed
+    The frame is only read - detection runs inline on the acquisition thread or as a pipeline stage
+    """
+    DEFAULT_THRESHOLD = 0.5     # fraction of the peak above the background, 0.5 - half maximum
+
+    FWHM_SIGMA = 2. * np.sqrt(2. * np.log(2.))
+
+    CONTRAST_MIN = 8            # peak above the background (counts) required for a spot
+    LOAD_MAX = 0.5              # fraction of the frame period the detector may take before frames are skipped
+
+    FIT_SIGMAS = 3.             # half size of the gaussian fit window in sigmas
+    FIT_PIXELS = 4096           # pixels of the fit window above which the window is subsampled
+    FIT_LEVEL = 0.1             # fraction of the peak below which pixels are not fitted - log of noise
+
+    MILLISECONDS = 1000.
+    TIMING_WEIGHT = 0.1         # weight of the last frame in the mean timing
+
+    def __init__(self, output=None, benabled=False, threshold=DEFAULT_THRESHOLD, roi=None, bgauss=False, every=1,
+                 order=COLOR_ORDER_BGR):
+        """
+        Class constructor
+        :param output: callable(dict) - receives detection results
+        :param benabled: bool() - detection state
+        :param threshold: float() - fraction of the peak above the background
+        :param roi: list() - [x, y, width, height] in frame pixels, None - full frame
+        :param bgauss: bool() - refines the centroid by a 2D gaussian fit
+        :param every: int() - minimum frame step between analysed frames
+        :param order: str() - channel order of color frames - bgr, rgb
+        """
+        Tester.__init__(self, def_file="{}".format(self.__class__.__name__.lower()))
+
+        self.output = output
+        self.gray = cv2.COLOR_RGB2GRAY if order == COLOR_ORDER_RGB else cv2.COLOR_BGR2GRAY
+
+        self.lock = threading.Lock()
+
+        self.benabled = False
+        self.threshold = self.DEFAULT_THRESHOLD
+        self.roi = None
+        self.bgauss = False
+        self.every = 1
+
+        # scale of the sigma measured on the thresholded spot to the sigma of a gaussian spot
+        self.sigma_scale = 1.
+
+        # frame counters, current frame step and timing - owned by the processing thread
+        self.frames = 0
+        self.analysed = 0
+        self.step = 1
+        self.ts_last = None
+        self.interval_mean = 0.
+        self.time_mean = 0.
+
+        # background subtracted region of interest - owned by the processing thread
+        self.work = None
+
+        self.set_params(benabled=benabled, threshold=threshold, roi=roi, bgauss=bgauss, every=every)
+
+    def set_params(self, benabled=None, threshold=None, roi=None, bgauss=None, every=None):
+        """
+        Changes detection parameters
+        :param benabled: bool() - detection state
+        :param threshold: float() - fraction of the peak above the background
+        :param roi: list() - [x, y, width, height] in frame pixels, empty list - full frame
+        :param bgauss: bool() - gaussian refinement
+        :param every: int() - minimum frame step between analysed frames
+        :return: bool() - True if the parameters are valid
+        """
+        res = True
+        bdisabled = False
+        with self.lock:
+            if benabled is not None:
+                bdisabled = self.benabled and not benabled
+                self.benabled = bool(benabled)
+
+            if threshold is not None:
+                try:
+                    self.threshold = min(max(float(threshold), 0.), 0.95)
+                    self.sigma_scale = self.get_sigma_scale(self.threshold)
+                except (TypeError, ValueError):
+                    res = False
+
+            if roi is not None:
+                if isinstance(roi, (list, tuple)) and len(roi) == 0:
+                    self.roi = None
+                elif isinstance(roi, (list, tuple)) and len(roi) == 4 and all([self.testInt(v) or self.testFloat(v) for v in roi]):
+                    self.roi = [int(v) for v in roi]
+                else:
+                    res = False
+
+            if bgauss is not None:
+                self.bgauss = bool(bgauss)
+
+            if every is not None:
+                try:
+                    self.every = max(1, int(every))
+                except (TypeError, ValueError):
+                    res = False
+
+        if not res:
+            self.error("Invalid spot detection parameters ({}, {}, {}, {}, {})".format(benabled, threshold, roi, bgauss, every))
+        self.info("Spot detection ({}); threshold ({}); roi ({}); gaussian ({}); every ({})".format(
+            self.benabled, self.threshold, self.roi, self.bgauss, self.every))
+
+        # the last result is withdrawn
+        if bdisabled:
+            self.report({})
+        return res
+
+    @staticmethod
+    def get_sigma_scale(t):
+        """
+        Returns the ratio of the sigma of a gaussian spot to the one measured on the spot thresholded at t
+        Second moment of exp(-r^2/2s^2) - t within the threshold contour is s^2 * f(t)
+        :param t: float() - threshold, fraction of the peak
+        :return:
+        """
+        if t <= 0.:
+            return 1.
+        u = -np.log(t)
+        f = (1. - t * (1. + u + u * u / 2.)) / (1. - t * (1. + u))
+        return float(1. / np.sqrt(f))
+
+    def test_enabled(self):
+        with self.lock:
+            return self.benabled
+
+    def report(self, res):
+        if self.output is not None:
+            try:
+                self.output(res)
+            except (RuntimeError, AttributeError) as e:
+                self.error("Error while reporting a spot: {}".format(e))
+
+    def process(self, img):
+        """
+        Detects a spot on a frame, reports the result - pipeline stage
+        Frames are skipped while the detection takes more than LOAD_MAX of the frame period
+        :param img: np.ndarray() - frame (H, W, C)
+        :return:
+        """
+        with self.lock:
+            (benabled, threshold, roi, bgauss, every, scale) = (self.benabled, self.threshold, self.roi, self.bgauss,
+                                                                self.every, self.sigma_scale)
+        if not benabled:
+            self.ts_last = None
+            return None
+
+        ts = time.perf_counter()
+        if self.ts_last is not None:
+            self.interval_mean += (ts - self.ts_last - self.interval_mean) * self.TIMING_WEIGHT
+        self.ts_last = ts
+
+        self.frames += 1
+        if self.frames < max(self.step, every):
+            return None
+        self.frames = 0
+
+        res = self.detect(img, threshold, roi, bgauss, scale)
+
+        td = time.perf_counter() - ts
+        if self.analysed == 0:
+            self.time_mean = td
+        else:
+            self.time_mean += (td - self.time_mean) * self.TIMING_WEIGHT
+        self.analysed += 1
+
+        # frame step keeping the detector within its share of the frame period
+        self.step = every
+        if self.interval_mean > 0:
+            self.step = max(every, int(np.ceil(self.time_mean / (self.LOAD_MAX * self.interval_mean))))
+
+        res.update({"frame": self.analysed, "step": self.step, "time": td * self.MILLISECONDS})
+        self.report(res)
+        return None
+
+    def detect(self, img, threshold, roi, bgauss, scale):
+        """
+        Calculates the centroid, peak intensity and FWHM of a spot
+        :param img: np.ndarray() - frame (H, W, C)
+        :param threshold: float() - fraction of the peak above the background
+        :param roi: list() - [x, y, width, height] or None
+        :param bgauss: bool() - gaussian refinement
+        :param scale: float() - ratio of the gaussian sigma to the one of the thresholded spot
+        :return: dict()
+        """
+        (h, w) = img.shape[:2]
+        (x0, y0, x1, y1) = (0, 0, w, h)
+        if roi is not None:
+            (x0, y0) = (min(max(0, roi[0]), w - 1), min(max(0, roi[1]), h - 1))
+            (x1, y1) = (min(max(x0 + 1, roi[0] + roi[2]), w), min(max(y0 + 1, roi[1] + roi[3]), h))
+
+        timg = img[y0:y1, x0:x1]
+        if img.ndim == 3 and img.shape[2] == 3:
+            timg = cv2.cvtColor(timg, self.gray)
+        elif img.ndim == 3:
+            timg = timg[..., 0]
+
+        res = {"found": False, "roi": [x0, y0, x1 - x0, y1 - y0]}
+
+        (vmin, vmax, locmin, locmax) = cv2.minMaxLoc(timg)
+        if vmax - vmin < self.CONTRAST_MIN:
+            return res
+
+        # signal above the threshold level, saturates at zero for the integer frames
+        if self.work is None or self.work.shape != timg.shape or self.work.dtype != timg.dtype:
+            self.work = np.empty(timg.shape, dtype=timg.dtype)
+        level = vmin + threshold * (vmax - vmin)
+        cv2.subtract(timg, level, dst=self.work)
+
+        m = cv2.moments(self.work)
+        if m["m00"] <= 0:
+            return res
+
+        (cx, cy) = (m["m10"] / m["m00"], m["m01"] / m["m00"])
+        (sx, sy) = (np.sqrt(max(m["mu20"], 0.) / m["m00"]) * scale, np.sqrt(max(m["mu02"], 0.) / m["m00"]) * scale)
+
+        res.update({"found": True, "x": x0 + cx, "y": y0 + cy, "intensity": vmax - vmin, "background": vmin,
+                    "fwhm_x": sx * self.FWHM_SIGMA, "fwhm_y": sy * self.FWHM_SIGMA, "fit": False})
+
+        if bgauss:
+            fit = self.fit_gauss(timg, vmin, vmax, cx, cy, sx, sy)
+            if fit is not None:
+                (cx, cy, sx, sy, amplitude) = fit
+                res.update({"x": x0 + cx, "y": y0 + cy, "intensity": amplitude,
+                            "fwhm_x": sx * self.FWHM_SIGMA, "fwhm_y": sy * self.FWHM_SIGMA, "fit": True})
+        return res
+
+    def fit_gauss(self, img, vmin, vmax, cx, cy, sx, sy):
+        """
+        Fits an axis aligned 2D gaussian around the centroid
+        Weighted linear least squares on the logarithm: ln(I) = a + b*x + c*y + d*x^2 + e*y^2, weights I^2
+        :param img: np.ndarray() - region of interest (H, W)
+        :param vmin: background
+        :param vmax: peak
+        :param cx: centroid
+        :param cy:
+        :param sx: sigma from the moments
+        :param sy:
+        :return: tuple() - (x, y, sigma x, sigma y, amplitude) or None if the fit fails
+        """
+        (h, w) = img.shape[:2]
+        (rx, ry) = (max(2., self.FIT_SIGMAS * sx), max(2., self.FIT_SIGMAS * sy))
+        (x0, x1) = (max(0, int(cx - rx)), min(w, int(cx + rx) + 1))
+        (y0, y1) = (max(0, int(cy - ry)), min(h, int(cy + ry) + 1))
+
+        # large spots are subsampled - the fit cost stays bounded
+        step = max(1, int(np.ceil(np.sqrt((x1 - x0) * (y1 - y0) / float(self.FIT_PIXELS)))))
+
+        window = img[y0:y1:step, x0:x1:step].astype(np.float64) - vmin
+        (ys, xs) = np.mgrid[y0:y1:step, x0:x1:step]
+
+        mask = window > self.FIT_LEVEL * (vmax - vmin)
+        if np.count_nonzero(mask) < 6:
+            return None
+
+        v = window[mask]
+        (xs, ys) = (xs[mask] - cx, ys[mask] - cy)
+
+        a = np.stack((np.ones_like(v), xs, ys, xs * xs, ys * ys), axis=1) * v[:, None]
+        try:
+            coefs = np.linalg.lstsq(a, np.log(v) * v, rcond=None)[0]
+        except np.linalg.LinAlgError:
+            return None
+
+        (c0, bx, by, dx, dy) = coefs
+        if dx >= 0 or dy >= 0:
+            return None
+
+        (ox, oy) = (-bx / (2. * dx), -by / (2. * dy))
+        if abs(ox) > rx or abs(oy) > ry:
+            return None
+
+        amplitude = np.exp(c0 - bx * bx / (4. * dx) - by * by / (4. * dy))
+        return (float(cx + ox), float(cy + oy), float(np.sqrt(-1. / (2. * dx))), float(np.sqrt(-1. / (2. * dy))),
+                float(amplitude))
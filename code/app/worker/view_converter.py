@@ -0,0 +1,91 @@
+from app.common.imports import *
+from app.worker.frame_pool import *
+
+__all__ = ["ViewConverter"]
+
+class ViewConverter(Tester):
+    """
+    Conversion of frames to the visible region at the resolution of the display
+    The frame is cropped to the region visible in the view and downscaled by area averaging to the screen pixels
+    The full resolution frame stays attached to the converted one - snapshots are not affected
+    """
+    MARGIN = 1                  # frame pixels added around the visible region - no gaps at the borders
+
+    def __init__(self):
+        """
+        Class constructor
+        """
+        Tester.__init__(self, def_file="{}".format(self.__class__.__name__.lower()))
+
+        self.lock = threading.Lock()
+
+        # visible region [x, y, width, height] in frame pixels and screen pixels per frame pixel, None - full frame
+        self.region = None
+        self.zoom = 1.
+
+    def set_viewport(self, region=None, zoom=1.):
+        """
+        Changes the visible region - called by the display
+        :param region: list() - [x, y, width, height] in frame pixels, None - full frame
+        :param zoom: float() - screen pixels per frame pixel
+        :return:
+        """
+        with self.lock:
+            self.region = None if region is None else list(region)
+            self.zoom = zoom if zoom > 0 else 1.
+
+    def get_view(self, shape):
+        """
+        Returns the crop of a frame and the shape of its view
+        :param shape: tuple() - frame shape (H, W, C)
+        :return: tuple() - ([x0, y0, x1, y1], view shape) or None if the full frame is shown as it is
+        """
+        with self.lock:
+            (region, zoom) = (self.region, self.zoom)
+
+        (h, w) = shape[:2]
+        (x0, y0, x1, y1) = (0, 0, w, h)
+        if region is not None:
+            m = self.MARGIN
+            (x0, y0) = (min(max(0, int(np.floor(region[0])) - m), w - 1), min(max(0, int(np.floor(region[1])) - m), h - 1))
+            (x1, y1) = (min(max(x0 + 1, int(np.ceil(region[0] + region[2])) + m), w),
+                        min(max(y0 + 1, int(np.ceil(region[1] + region[3])) + m), h))
+
+        # only downscaling - Qt magnifies the crop
+        f = min(1., zoom)
+        (vw, vh) = (max(1, int(round((x1 - x0) * f))), max(1, int(round((y1 - y0) * f))))
+
+        if (x0, y0, x1, y1) == (0, 0, w, h) and (vw, vh) == (w, h):
+            return None
+        return [x0, y0, x1, y1], (vh, vw) + tuple(shape[2:])
+
+    def process(self, img: FrameBuffer, pool: FramePool):
+        """
+        Converts a frame to its view
+        :param img: FrameBuffer() - full resolution frame
+        :param pool: FramePool() - buffers of the views
+        :return: FrameBuffer() - view with the full frame attached, img if no conversion is needed, None - pool exhausted
+        """
+        src = img.data
+        view = self.get_view(src.shape)
+        if view is None:
+            return img
+
+        ((x0, y0, x1, y1), shape) = view
+        res = pool.acquire(shape, src.dtype)
+        if res is None:
+            return None
+
+        crop = src[y0:y1, x0:x1]
+        if crop.shape == shape:
+            np.copyto(res.data, crop)
+        elif src.ndim == 3 and src.shape[2] == 1:
+            # single channel frames are resized as 2D - the buffer is written in place
+            cv2.resize(crop[..., 0], (shape[1], shape[0]), dst=res.data[..., 0], interpolation=cv2.INTER_AREA)
+        else:
+            cv2.resize(crop, (shape[1], shape[0]), dst=res.data, interpolation=cv2.INTER_AREA)
+
+        res.full = img
+        res.copy_meta(img)
+        res.view = [x0, y0, x1 - x0, y1 - y0, src.shape[1], src.shape[0]]
+        return res
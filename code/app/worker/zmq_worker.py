@@ -86,6 +86,19 @@ class ZMQserver(Tester):
         if isinstance(self.proc, ZmqProcess) and self.proc.is_alive():
             self.proc.setData(data)
 
+    def getStats(self):
+        """
+        Returns the latency statistics of the controller - called by the zmq thread
+        :return: dict()
+        """
+        res = {}
+        if self.ctrl is not None:
+            try:
+                res = self.ctrl.getLatencyStats()
+            except AttributeError:
+                pass
+        return res
+
     def isRunning(self):
         """
         Returns status of the running process
@@ -113,6 +126,7 @@ class ZmqProcess(threading.Thread, Tester):
     REQUEST_READ = "read"
     REQUEST_CHANGE = "change"
     REQUEST_PARAMS = "parameters"
+    REQUEST_STATS = "stats"
 
     def __init__(self, zmqparams: str, msg_queue: queue.Queue, parent=None):
         threading.Thread.__init__(self)
@@ -151,6 +165,44 @@ class ZmqProcess(threading.Thread, Tester):
 
         return res
 
+    def getStats(self):
+        """
+        Returns the latency statistics computed on request
+        :return:
+        """
+        res = {}
+        if self.parent is not None:
+            try:
+                res = self.parent.getStats()
+            except AttributeError:
+                pass
+        return res
+
+    def dumps(self, data):
+        """
+        Serializes a reply - numpy scalars and arrays are converted, a reply which cannot be serialized is a fault
+        :param data:
+        :return: str()
+        """
+        try:
+            return json.dumps(data, default=self.to_json)
+        except (TypeError, ValueError) as e:
+            self.error("Cannot serialize a reply: {}".format(e))
+            return self.RESPONSE_FAULT
+
+    @staticmethod
+    def to_json(obj):
+        """
+        Converts numpy types which json does not serialize
+        :param obj:
+        :return:
+        """
+        if isinstance(obj, np.generic):
+            return obj.item()
+        elif isinstance(obj, np.ndarray):
+            return obj.tolist()
+        raise TypeError("Object of type {} is not JSON serializable".format(obj.__class__.__name__))
+
     def setError(self, v):
         """
         Sets the error state
@@ -211,7 +263,11 @@ class ZmqProcess(threading.Thread, Tester):
                                 if cmd == self.REQUEST_READ:
                                     data = self.getData()
                                     self.debug("Sending out data ({})".format(data))
-                                    response = json.dumps(data)
+                                    response = self.dumps(data)
+
+                                # latency of the frames per stage
+                                elif cmd == self.REQUEST_STATS:
+                                    response = self.dumps(self.getStats())
 
                                 elif cmd == self.REQUEST_CHANGE and self.REQUEST_PARAMS in keys and isinstance(value[self.REQUEST_PARAMS], dict):
                                     # passing value from zmq to camera thread
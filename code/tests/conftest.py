@@ -0,0 +1,26 @@
+import os
+import sys
+
+# the application package is imported as in VimbaApp.py - from the code directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# headless Qt and the software OpenGL of Mesa - set before Qt is loaded
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("LIBGL_ALWAYS_SOFTWARE", "1")
+
+# modules under test load numpy, OpenCV, Qt and pluginbase through app.common.imports - without them nothing is collected
+MISSING = None
+try:
+    import app.common.imports
+    from app.common.tester import Tester
+except ImportError as e:
+    MISSING = str(e)
+    collect_ignore_glob = ["test_*.py"]
+else:
+    # the tested classes log to the console only - no log files are written
+    Tester.setDefaultFileLogging(False)
+
+
+def pytest_report_header(config):
+    if MISSING is not None:
+        return "tests are not collected, the application cannot be imported: {}".format(MISSING)
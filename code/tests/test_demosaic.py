@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from app.common.keys import *
+from app.worker.demosaic import *
+
+(R, G, B) = (200, 100, 50)
+
+
+def make_mosaic(h=128, w=64, dtype=np.uint8):
+    """
+    BayerRG mosaic of a uniform color - red at even rows and columns, blue at odd ones
+    """
+    src = np.empty((h, w), dtype=dtype)
+    src[0::2, 0::2] = R
+    src[0::2, 1::2] = G
+    src[1::2, 0::2] = G
+    src[1::2, 1::2] = B
+    return src
+
+
+@pytest.fixture
+def demosaic():
+    res = BayerDemosaic(bands=4, order=COLOR_ORDER_RGB)
+    yield res
+    res.close()
+
+
+@pytest.mark.parametrize("mode", [BayerDemosaic.MODE_BILINEAR, BayerDemosaic.MODE_NEAREST,
+                                  BayerDemosaic.MODE_SUPERPIXEL, BayerDemosaic.MODE_VNG])
+def test_phase(demosaic, mode):
+    src = make_mosaic()
+    dst = np.zeros(demosaic.get_shape(src.shape, mode), dtype=np.uint8)
+    demosaic.process(src, dst, mode)
+
+    # interior pixels - borders depend on the OpenCV extrapolation
+    (h, w) = dst.shape[:2]
+    assert tuple(dst[h // 2, w // 2]) == (R, G, B)
+    assert tuple(dst[h // 2 + 1, w // 2 + 1]) == (R, G, B)
+
+
+def test_order_bgr():
+    demosaic = BayerDemosaic(bands=1, order=COLOR_ORDER_BGR)
+    src = make_mosaic()
+    for mode in (BayerDemosaic.MODE_BILINEAR, BayerDemosaic.MODE_SUPERPIXEL):
+        dst = np.zeros(demosaic.get_shape(src.shape, mode), dtype=np.uint8)
+        demosaic.process(src, dst, mode)
+        assert tuple(dst[10, 10]) == (B, G, R)
+
+
+def test_shape():
+    demosaic = BayerDemosaic(bands=1)
+    assert demosaic.get_shape((128, 64, 1), BayerDemosaic.MODE_BILINEAR) == (128, 64, 3)
+    assert demosaic.get_shape((128, 64), BayerDemosaic.MODE_SUPERPIXEL) == (64, 32, 3)
+    assert demosaic.test_mode("unknown") == BayerDemosaic.MODE_BILINEAR
+
+
+@pytest.mark.parametrize("mode", [BayerDemosaic.MODE_BILINEAR, BayerDemosaic.MODE_NEAREST,
+                                  BayerDemosaic.MODE_SUPERPIXEL])
+@pytest.mark.parametrize("shape", [(256, 64), (258, 66), (257, 65)])
+def test_bands_match_single(demosaic, mode, shape):
+    rng = np.random.RandomState(0)
+    src = rng.randint(0, 256, size=shape).astype(np.uint8)
+
+    single = BayerDemosaic(bands=1, order=COLOR_ORDER_RGB)
+    ref = np.zeros(single.get_shape(src.shape, mode), dtype=np.uint8)
+    single.process(src, ref, mode)
+
+    dst = np.zeros_like(ref)
+    demosaic.process(src, dst, mode)
+    assert np.array_equal(dst, ref)
+
+
+def test_16bit():
+    demosaic = BayerDemosaic(bands=1, order=COLOR_ORDER_RGB)
+    src = make_mosaic(dtype=np.uint16) * 64
+    dst = np.zeros(demosaic.get_shape(src.shape, BayerDemosaic.MODE_BILINEAR), dtype=np.uint16)
+    demosaic.process(src, dst, BayerDemosaic.MODE_BILINEAR)
+    assert tuple(dst[10, 10]) == (R * 64, G * 64, B * 64)
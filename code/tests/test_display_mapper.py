@@ -0,0 +1,47 @@
+import numpy as np
+
+from app.worker.display_mapper import *
+
+
+def test_full_range():
+    mapper = DisplayMapper(bits=12)
+    assert mapper.get_state() == {"bits": 12, "window": [0, 4095], "gamma": 1.}
+    assert mapper.lut.shape == (DisplayMapper.LUT_SIZE,) and mapper.lut.dtype == np.uint8
+    assert mapper.lut[0] == 0 and mapper.lut[4095] == 255
+
+    # values above the bit depth saturate
+    assert mapper.lut[65535] == 255
+    assert np.all(np.diff(mapper.lut.astype(np.int32)) >= 0)
+
+
+def test_window():
+    mapper = DisplayMapper(bits=16)
+    assert mapper.set_params(window=[200, 100])
+    assert mapper.get_state()["window"] == [100, 200]
+    assert (mapper.lut[99], mapper.lut[100], mapper.lut[150], mapper.lut[200], mapper.lut[201]) == (0, 0, 128, 255, 255)
+
+    # empty window - full range again
+    assert mapper.set_params(window=[])
+    assert mapper.get_state()["window"] == [0, 65535]
+
+
+def test_gamma():
+    mapper = DisplayMapper(bits=16, window=[0, 400], gamma=2.)
+    assert mapper.lut[100] == 128
+    assert mapper.set_params(gamma=100.)
+    assert mapper.get_state()["gamma"] == DisplayMapper.GAMMA_MAX
+
+
+def test_process():
+    mapper = DisplayMapper(bits=10)
+    src = np.array([[0, 511, 1023, 4000]], dtype=np.uint16)[..., None]
+    dst = np.zeros(src.shape, dtype=np.uint8)
+    mapper.process(src, dst)
+    assert dst[..., 0].tolist() == [[0, 127, 255, 255]]
+
+
+def test_invalid():
+    mapper = DisplayMapper(bits=16, window=[10, 20])
+    assert not mapper.set_params(window=[1])
+    assert not mapper.set_params(gamma="x")
+    assert mapper.get_state()["window"] == [10, 20]
@@ -0,0 +1,69 @@
+import numpy as np
+import cv2
+import pytest
+
+from app.common.keys import *
+from app.worker.focus_metric import *
+
+
+def make_pattern(sigma=0.):
+    """
+    Checkerboard of 8 pixel squares, blurred by a gaussian of sigma
+    """
+    (ys, xs) = np.mgrid[0:64, 0:96]
+    img = np.where(((xs // 8) + (ys // 8)) % 2 == 0, 200, 50).astype(np.uint8)
+    if sigma > 0:
+        img = cv2.GaussianBlur(img, (0, 0), sigma)
+    return img[..., None]
+
+
+@pytest.mark.parametrize("method", [FocusMetric.METHOD_LAPLACIAN, FocusMetric.METHOD_TENENGRAD,
+                                    FocusMetric.METHOD_BRENNER])
+def test_sharper_is_higher(method):
+    res = []
+    metric = FocusMetric(output=res.append, method=method)
+    for sigma in (0., 1., 2., 4.):
+        metric.process(make_pattern(sigma))
+
+    values = [r["value"] for r in res]
+    assert values == sorted(values, reverse=True)
+    assert values[-1] < values[0]
+    assert [r["frame"] for r in res] == [1, 2, 3, 4]
+    assert metric.get_frames() == 4
+
+
+def test_flat():
+    metric = FocusMetric(method=FocusMetric.METHOD_LAPLACIAN)
+    img = np.full((16, 16), 100, dtype=np.uint8)
+    for method in (FocusMetric.METHOD_LAPLACIAN, FocusMetric.METHOD_TENENGRAD, FocusMetric.METHOD_BRENNER):
+        assert metric.measure(img, method) == 0.
+
+
+def test_roi_and_color():
+    res = []
+    metric = FocusMetric(output=res.append, method=FocusMetric.METHOD_BRENNER, roi=[8, 8, 32, 16],
+                         order=COLOR_ORDER_RGB)
+    img = np.repeat(make_pattern(), 3, axis=2)
+    metric.process(img)
+    assert res[0]["roi"] == [8, 8, 32, 16] and res[0]["value"] > 0
+
+    # the region of a flat part of the frame
+    img[:32, :48] = 100
+    metric.set_params(roi=[0, 0, 40, 24])
+    metric.process(img)
+    assert res[1]["value"] == 0.
+
+
+def test_off():
+    res = []
+    metric = FocusMetric(output=res.append)
+    assert not metric.test_enabled()
+    metric.process(make_pattern())
+    assert res == []
+
+    metric.set_params(method=FocusMetric.METHOD_TENENGRAD)
+    metric.set_params(method=FocusMetric.METHOD_OFF)
+    assert res == [{}]
+
+    assert not metric.set_params(method="unknown")
+    assert not metric.set_params(roi=[1, 2, 3])
@@ -0,0 +1,53 @@
+import numpy as np
+
+from app.worker.frame_average import *
+
+
+def run(averager, values, shape=(4, 6), dtype=np.uint8):
+    res = []
+    for v in values:
+        img = np.full(shape, v, dtype=dtype)
+        assert averager.process(img) is None
+        res.append(int(img[0, 0]))
+    return res
+
+
+def test_off():
+    averager = FrameAverager()
+    assert not averager.test_active()
+    assert run(averager, [3, 6, 9]) == [3, 6, 9]
+
+
+def test_boxcar():
+    averager = FrameAverager(mode=FrameAverager.MODE_BOXCAR, length=3)
+    assert averager.test_active()
+    # partial window at the start, then the oldest frame leaves the sum
+    assert run(averager, [3, 6, 9, 12, 15]) == [3, 4, 6, 9, 12]
+
+
+def test_boxcar_16bit():
+    averager = FrameAverager(mode=FrameAverager.MODE_BOXCAR, length=2)
+    assert run(averager, [65535, 65535, 1], dtype=np.uint16) == [65535, 65535, 32768]
+
+
+def test_ema():
+    averager = FrameAverager(mode=FrameAverager.MODE_EMA, alpha=0.5)
+    assert run(averager, [10, 20, 20]) == [10, 15, 18]
+
+
+def test_params_reset():
+    averager = FrameAverager(mode=FrameAverager.MODE_BOXCAR, length=2)
+    run(averager, [100, 100])
+    assert averager.set_params(length=4)
+    assert run(averager, [10]) == [10]
+
+    # shape change restarts the average
+    assert run(averager, [20], shape=(2, 2)) == [20]
+
+
+def test_invalid_params():
+    averager = FrameAverager()
+    assert not averager.set_params(mode="unknown")
+    assert not averager.set_params(length="x")
+    assert averager.set_params(length=10000, alpha=5.)
+    assert averager.get_state() == {"mode": FrameAverager.MODE_OFF, "length": FrameAverager.MAX_LENGTH, "alpha": 1.}
@@ -0,0 +1,107 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from app.worker.frame_correction import *
+
+SETTINGS = {"exposure": 1000., "gain": 0., "pixel_format": "Mono8"}
+
+
+def capture(correction, kind, frames):
+    assert correction.request(kind, len(frames))
+    state = correction.capture
+    for img in frames:
+        correction.accumulate(img)
+        # frames above the pending limit are skipped - wait for the worker
+        while state["pending"] > 0:
+            time.sleep(0.001)
+    correction.close()
+
+
+@pytest.fixture
+def correction(tmp_path):
+    res = FrameCorrection("cam", str(tmp_path))
+    res.set_settings(SETTINGS)
+    yield res
+    res.close()
+
+
+def test_dark_save_load(correction, tmp_path):
+    dark = [np.full((4, 6), 10, dtype=np.uint8), np.full((4, 6), 12, dtype=np.uint8)]
+    capture(correction, FrameCorrection.KIND_DARK, dark)
+
+    state = correction.get_state()
+    assert state["dark"]["valid"] and state["dark"]["meta"]["frames"] == 2
+    assert state["capture"] is None
+
+    # files replaced atomically - no temporary files left, the reference is memory-mapped
+    assert sorted(os.listdir(str(tmp_path))) == ["cam_dark.json", "cam_dark.npy"]
+    assert isinstance(correction.refs["dark"], np.memmap)
+
+    img = np.full((4, 6), 100, dtype=np.uint8)
+    correction.process(img)
+    assert np.all(img == 89)
+
+    img = np.full((4, 6), 5, dtype=np.uint8)
+    correction.process(img)
+    assert np.all(img == 0)
+
+    # references are not applied before the camera settings are known
+    loaded = FrameCorrection("cam", str(tmp_path))
+    loaded.load()
+    assert loaded.get_state()["dark"]["loaded"] and not loaded.get_state()["dark"]["valid"]
+
+    img = np.full((4, 6), 100, dtype=np.uint8)
+    loaded.process(img)
+    assert np.all(img == 100)
+
+    loaded.set_settings(SETTINGS)
+    loaded.process(img)
+    assert np.all(img == 89)
+
+
+def test_settings_invalidate(correction):
+    capture(correction, FrameCorrection.KIND_DARK, [np.full((4, 6), 10, dtype=np.uint8)])
+
+    correction.set_settings(dict(SETTINGS, exposure=2000.))
+    assert not correction.get_state()["dark"]["valid"]
+
+    # numeric settings within the tolerance
+    correction.set_settings(dict(SETTINGS, exposure=1000.0001))
+    assert correction.get_state()["dark"]["valid"]
+
+
+def test_flat(correction):
+    flat = np.full((4, 6), 100, dtype=np.uint16)
+    flat[:, :3] = 50
+    capture(correction, FrameCorrection.KIND_FLAT, [flat])
+
+    gain = correction.gain
+    assert gain is not None
+
+    img = np.full((4, 6), 100, dtype=np.uint16)
+    img[:, :3] = 50
+    correction.process(img)
+    assert np.all(np.abs(img.astype(np.int32) - 75) <= 1)
+
+    # the gain map is kept while the references stay valid
+    correction.set_settings(dict(SETTINGS, exposure=1000.0001))
+    assert correction.gain is gain
+
+    correction.set_settings(dict(SETTINGS, exposure=2000.))
+    assert correction.gain is None
+
+
+def test_clear(correction, tmp_path):
+    capture(correction, FrameCorrection.KIND_DARK, [np.full((4, 6), 10, dtype=np.uint8)])
+    correction.clear("all")
+    assert os.listdir(str(tmp_path)) == []
+    assert not correction.get_state()["dark"]["loaded"]
+
+
+def test_invalid_request(correction):
+    assert not correction.request("unknown", 2)
+    assert not correction.request(FrameCorrection.KIND_DARK, 0)
+    assert not correction.request(FrameCorrection.KIND_DARK, "x")
@@ -0,0 +1,122 @@
+import numpy as np
+import pytest
+
+from qtpy import QtWidgets, QtCore, QtGui
+
+# app.gui loads the main window and with it the camera worker
+pytest.importorskip("vimba")
+
+from app.common.keys import *
+from app.gui.gui_frame_item import FrameItem
+
+RED = (255, 0, 0)
+BLUE = (0, 0, 255)
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    QtCore.QCoreApplication.setAttribute(QtCore.Qt.AA_ShareOpenGLContexts)
+    app = QtWidgets.QApplication.instance()
+    if app is None:
+        app = QtWidgets.QApplication([])
+    yield app
+
+
+def make_frame(order=COLOR_ORDER_RGB):
+    """
+    Left half red, right half blue in the channel order of the item
+    """
+    img = np.zeros((16, 32, 3), dtype=np.uint8)
+    img[:, :16] = RED
+    img[:, 16:] = BLUE
+    if order == COLOR_ORDER_BGR:
+        img = np.ascontiguousarray(img[:, :, ::-1])
+    return img
+
+
+def pixel(image, x, y):
+    c = QtGui.QColor(image.pixel(x, y))
+    return (c.red(), c.green(), c.blue())
+
+
+def make_scene(img, order):
+    scene = QtWidgets.QGraphicsScene()
+    item = FrameItem(order=order)
+    item.setFrame(img)
+    scene.addItem(item)
+    scene.setSceneRect(item.boundingRect())
+    return scene, item
+
+
+def test_raster(qapp):
+    img = make_frame()
+    scene, item = make_scene(img, COLOR_ORDER_RGB)
+    assert item.boundingRect() == QtCore.QRectF(0, 0, 32, 16)
+
+    image = QtGui.QImage(32, 16, QtGui.QImage.Format_RGB32)
+    image.fill(QtCore.Qt.black)
+    painter = QtGui.QPainter(image)
+    scene.render(painter, QtCore.QRectF(0, 0, 32, 16), QtCore.QRectF(0, 0, 32, 16))
+    painter.end()
+
+    assert pixel(image, 4, 8) == RED
+    assert pixel(image, 28, 8) == BLUE
+
+
+def test_raster_mono(qapp):
+    img = np.full((16, 32, 1), 200, dtype=np.uint8)
+    scene, item = make_scene(img, COLOR_ORDER_RGB)
+
+    image = QtGui.QImage(32, 16, QtGui.QImage.Format_RGB32)
+    painter = QtGui.QPainter(image)
+    scene.render(painter, QtCore.QRectF(0, 0, 32, 16), QtCore.QRectF(0, 0, 32, 16))
+    painter.end()
+
+    assert pixel(image, 16, 8) == (200, 200, 200)
+
+
+@pytest.mark.parametrize("order", [COLOR_ORDER_RGB, COLOR_ORDER_BGR])
+def test_opengl_viewport(qapp, order):
+    if order == COLOR_ORDER_BGR and not hasattr(QtGui.QImage, "Format_BGR888"):
+        pytest.skip("BGR frames need Qt 5.14")
+
+    # without OpenGL the viewport aborts the interpreter - probed before it is created
+    ctx = QtGui.QOpenGLContext()
+    if not ctx.create():
+        pytest.skip("OpenGL is not available")
+
+    img = make_frame(order)
+    scene, item = make_scene(img, order)
+
+    view = QtWidgets.QGraphicsView(scene)
+    viewport = QtWidgets.QOpenGLWidget()
+    view.setViewport(viewport)
+    view.setViewportUpdateMode(QtWidgets.QGraphicsView.FullViewportUpdate)
+    view.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
+    view.setVerticalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
+    view.setFrameShape(QtWidgets.QFrame.NoFrame)
+    view.resize(64, 32)
+    view.scale(2., 2.)
+    view.show()
+    qapp.processEvents()
+
+    assert viewport.context() is not None and viewport.context().isValid()
+
+    # the native path or the raster fallback must give the same picture
+    image = viewport.grabFramebuffer()
+    view.close()
+
+    (w, h) = (image.width(), image.height())
+    assert pixel(image, w // 4, h // 2) == RED
+    assert pixel(image, 3 * w // 4, h // 2) == BLUE
+
+
+@pytest.mark.parametrize("ratio", [1., 2.])
+def test_region(qapp, ratio):
+    item = FrameItem()
+    item.setFrame(make_frame(), ratio=ratio)
+
+    # visible part of the frame with a texel of margin, clipped to the frame
+    assert item.getRegion(QtCore.QRectF(4 / ratio, 2 / ratio, 8 / ratio, 4 / ratio)) == (3, 1, 13, 7)
+    assert item.getRegion(QtCore.QRectF(-10, -10, 100, 100)) == (0, 0, 32, 16)
+    assert item.getRegion(QtCore.QRectF(100, 100, 10, 10)) is None
@@ -0,0 +1,131 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from app.worker.frame_pool import *
+from app.worker.frame_pipeline import *
+
+
+def stage_add(value=1):
+    return lambda img: np.add(img, value, out=img)
+
+
+def test_create_registered():
+    stages = FramePipeline.create_stages(["invert", ["blur", {"ksize": 5}]])
+    assert [name for (name, func) in stages] == ["invert", "blur"]
+    assert all(callable(func) for (name, func) in stages)
+
+
+def test_create_factories_take_precedence():
+    stages = FramePipeline.create_stages([["invert", {"value": 3}]], factories={"invert": stage_add})
+    img = np.zeros((2, 2), dtype=np.uint8)
+    stages[0][1](img)
+    assert np.all(img == 3)
+
+
+def test_create_import():
+    stages = FramePipeline.create_stages(["app.worker.frame_pipeline:stage_invert"])
+    img = np.zeros((2, 2), dtype=np.uint8)
+    stages[0][1](img)
+    assert np.all(img == 255)
+
+
+def test_create_invalid():
+    assert FramePipeline.create_stages(None) == []
+
+    with pytest.raises(ValueError):
+        FramePipeline.create_stages(["unknown"])
+    with pytest.raises(ValueError):
+        FramePipeline.create_stages([1])
+    with pytest.raises(ValueError):
+        FramePipeline.create_stages(["app.worker.unknown:stage"])
+
+    # parameters a factory does not accept and factories returning no callable
+    with pytest.raises(ValueError):
+        FramePipeline.create_stages([["invert", {"ksize": 3}]])
+    with pytest.raises(ValueError):
+        FramePipeline.create_stages(["none"], factories={"none": lambda: None})
+
+
+@pytest.fixture
+def registered():
+    register_stage("add", stage_add)
+    yield "add"
+    unregister_stage("add")
+
+
+def test_register(registered):
+    assert registered in get_stage_names()
+    assert FramePipeline.create_stages([[registered, {"value": 2}]])[0][0] == registered
+
+    assert unregister_stage(registered)
+    assert registered not in get_stage_names()
+    assert not unregister_stage(registered)
+
+
+def test_pipeline_order():
+    pool = FramePool(size=8)
+    res = []
+    evdone = threading.Event()
+
+    def output(img):
+        res.append(int(img.data[0, 0]))
+        img.release()
+        if len(res) == 3:
+            evdone.set()
+
+    stages = FramePipeline.create_stages([["one", {"value": 1}], ["ten", {"value": 10}]],
+                                         factories={"one": stage_add, "ten": stage_add})
+    pipeline = FramePipeline(stages, output, queue_size=8, backlog=8)
+    pipeline.start()
+    try:
+        for i in range(3):
+            img = pool.acquire((2, 2), np.uint8)
+            img.data[:] = i
+            pipeline.put(img)
+        assert evdone.wait(5.)
+    finally:
+        pipeline.stop()
+
+    assert res == [11, 12, 13]
+    assert pool.get_in_use() == 0
+
+    stats = pipeline.get_stats()
+    assert sorted(stats.keys()) == ["one", "ten"]
+    assert stats["one"]["processed"] == 3
+    assert pipeline.get_dropped() == 0
+
+
+def test_stage_output_error():
+    pool = FramePool(size=4)
+    res = []
+    evdone = threading.Event()
+
+    def output(img):
+        img.release()
+        res.append(None)
+        if len(res) == 2:
+            evdone.set()
+        raise ValueError("consumer failure")
+
+    pipeline = FramePipeline(FramePipeline.create_stages(["invert"]), output)
+    pipeline.start()
+    try:
+        # the stage keeps running after a failing consumer
+        for i in range(2):
+            pipeline.put(pool.acquire((2, 2), np.uint8))
+            time.sleep(0.05)
+        assert evdone.wait(5.)
+        assert all(stage.is_alive() for stage in pipeline.stages)
+    finally:
+        pipeline.stop()
+
+
+def test_stage_shape_error():
+    pool = FramePool(size=1)
+    img = pool.acquire((2, 2), np.uint8)
+    stage = ThreadPipelineStage("crop", lambda data: data[:1], None, None)
+    stage.process(img)
+    assert stage.get_stats()["errors"] == 1
@@ -0,0 +1,95 @@
+import numpy as np
+
+from app.worker.frame_pool import *
+
+
+def test_recycle():
+    pool = FramePool(size=2)
+    a = pool.acquire((4, 6), np.uint8)
+    b = pool.acquire((4, 6), np.uint8)
+    assert a is not None and b is not None
+    assert pool.acquire((4, 6), np.uint8) is None
+    assert pool.get_dropped() == 1
+    assert pool.get_in_use() == 2
+    assert pool.get_resident_bytes() == 2 * 24
+
+    a.release()
+    c = pool.acquire((4, 6), np.uint8)
+    assert c is a
+    assert c.data.shape == (4, 6) and c.data.dtype == np.uint8
+
+
+def test_double_release():
+    pool = FramePool(size=2)
+    a = pool.acquire((4, 6), np.uint8)
+    a.release()
+    a.release()
+    assert pool.get_in_use() == 0
+    assert pool.acquire((4, 6), np.uint8) is a
+    assert pool.acquire((4, 6), np.uint8) is not a
+
+
+def test_invalid_size():
+    assert FramePool(size=0).size == FramePool.DEFAULT_SIZE
+
+
+def test_shape_change_keeps_bound():
+    pool = FramePool(size=2)
+    old = [pool.acquire((4, 6), np.uint8), pool.acquire((4, 6), np.uint8)]
+
+    # old buffers still in use count to the size of the pool
+    assert pool.acquire((8, 6), np.uint8) is None
+    assert pool.get_resident_bytes() == 2 * 24
+
+    old[0].release()
+    assert old[0].pool is None
+    assert pool.get_resident_bytes() == 24
+
+    new = pool.acquire((8, 6), np.uint8)
+    assert new is not None and new.data.shape == (8, 6)
+    assert pool.acquire((8, 6), np.uint8) is None
+
+    old[1].release()
+    assert pool.acquire((8, 6), np.uint8) is not None
+    assert pool.get_resident_bytes() == 2 * 48
+    assert pool.get_in_use() == 2
+
+
+def test_shape_change_discards_free():
+    pool = FramePool(size=2)
+    a = pool.acquire((4, 6), np.uint8)
+    a.release()
+
+    b = pool.acquire((4, 6), np.uint16)
+    assert b is not a and b.data.dtype == np.uint16
+    assert a.pool is None
+    assert pool.get_resident_bytes() == 48
+
+
+def test_chained_release():
+    pool = FramePool(size=1)
+    raw = FramePool(size=1)
+    full = FramePool(size=1)
+
+    buf = pool.acquire((2, 2), np.uint8)
+    buf.raw = raw.acquire((2, 2), np.uint8)
+    buf.full = full.acquire((2, 2), np.uint8)
+    buf.release()
+
+    assert buf.raw is None and buf.full is None
+    assert pool.get_in_use() == 0 and raw.get_in_use() == 0 and full.get_in_use() == 0
+
+
+def test_copy_meta():
+    pool = FramePool(size=2)
+    src = pool.acquire((2, 2), np.uint8)
+    src.frame_id = 7
+    src.exposure = 1000.
+    src.roi = [0, 0, 2, 2, 4, 4]
+    src.ts_capture = 1.5
+
+    dst = pool.acquire((2, 2), np.uint8)
+    dst.copy_meta(src)
+    assert dst.frame_id == 7 and dst.ts_capture == 1.5
+    assert dst.get_meta()["roi"] == [0, 0, 2, 2, 4, 4]
+    assert dst.get_meta()["pixel_format"] is None
@@ -0,0 +1,154 @@
+import queue
+import threading
+
+import pytest
+
+from app.worker.frame_queue import *
+
+
+class Item(object):
+    def __init__(self, value):
+        self.value = value
+        self.released = False
+
+    def release(self):
+        self.released = True
+
+
+def test_fifo():
+    q = FrameQueue(maxsize=3)
+    for i in range(3):
+        assert q.put(Item(i))
+    assert q.qsize() == 3
+    assert [q.get(timeout=0).value for i in range(3)] == [0, 1, 2]
+
+
+def test_drop_oldest():
+    q = FrameQueue(maxsize=2, policy=FrameQueue.POLICY_DROP_OLDEST)
+    items = [Item(i) for i in range(3)]
+    for item in items:
+        assert q.put(item)
+
+    assert q.get_dropped() == 1
+    assert items[0].released
+    assert [q.get(timeout=0).value for i in range(2)] == [1, 2]
+
+
+def test_drop_newest():
+    q = FrameQueue(maxsize=2, policy=FrameQueue.POLICY_DROP_NEWEST)
+    items = [Item(i) for i in range(3)]
+    assert q.put(items[0]) and q.put(items[1])
+    assert not q.put(items[2])
+
+    assert q.get_dropped() == 1
+    assert items[2].released and not items[0].released
+    assert [q.get(timeout=0).value for i in range(2)] == [0, 1]
+
+
+def test_invalid_parameters():
+    q = FrameQueue(maxsize=0, policy="unknown")
+    assert q.maxsize == 1
+    assert q.policy == FrameQueue.POLICY_DROP_OLDEST
+
+
+def test_get_timeout():
+    q = FrameQueue()
+    with pytest.raises(queue.Empty):
+        q.get(timeout=0.01)
+
+
+def test_clear_releases():
+    q = FrameQueue(maxsize=2)
+    items = [Item(0), Item(1)]
+    for item in items:
+        q.put(item)
+    q.clear()
+    assert q.qsize() == 0
+    assert all(item.released for item in items)
+
+
+def test_items_without_release():
+    q = FrameQueue(maxsize=1)
+    q.put(1)
+    q.put(2)
+    q.clear()
+    assert q.get_dropped() == 1
+
+
+def test_consumer():
+    q = FrameQueue(maxsize=4)
+    res = []
+    evdone = threading.Event()
+
+    def consume(item):
+        res.append(item.value)
+        if len(res) == 3:
+            evdone.set()
+
+    th = ThreadFrameConsumer(q, consume, timeout=0.05)
+    th.start()
+    for i in range(3):
+        q.put(Item(i))
+
+    assert evdone.wait(5.)
+    th.stop()
+    assert not th.is_alive()
+    assert res == [0, 1, 2]
+
+
+def test_consumer_error():
+    q = FrameQueue(maxsize=4)
+    res = []
+    evdone = threading.Event()
+
+    def consume(item):
+        res.append(item.value)
+        if len(res) == 2:
+            evdone.set()
+        raise ValueError("stage failure")
+
+    # a failing frame is logged, the consumer keeps running
+    th = ThreadFrameConsumer(q, consume, timeout=0.05)
+    th.start()
+    q.put(Item(0))
+    q.put(Item(1))
+
+    assert evdone.wait(5.)
+    assert th.is_alive()
+    th.stop()
+    assert res == [0, 1]
+
+
+def test_mailbox_latest():
+    box = FrameMailbox()
+    items = [Item(i) for i in range(3)]
+
+    # only the first post into an empty slot notifies the consumer
+    assert box.post(items[0])
+    assert not box.post(items[1])
+    assert not box.post(items[2])
+    assert items[0].released and items[1].released and not items[2].released
+
+    assert box.take() is items[2]
+    assert box.take() is None
+    box.mark_displayed()
+    assert box.get_counters() == (3, 1, 2)
+
+
+def test_mailbox_reset():
+    box = FrameMailbox()
+    item = Item(0)
+    box.post(item)
+    box.reset()
+    assert item.released
+    assert box.take() is None
+    assert box.get_counters() == (0, 0, 0)
+
+
+def test_mailbox_pending():
+    box = FrameMailbox()
+    assert not box.test_pending()
+    box.post(Item(0))
+    assert box.test_pending()
+    box.take()
+    assert not box.test_pending()
@@ -0,0 +1,75 @@
+import numpy as np
+import cv2
+import pytest
+
+from app.worker.hole_detector import *
+
+(CX, CY, AX, AY) = (170, 110, 60, 45)
+
+
+def make_gasket(shape=(240, 320), dtype=np.uint8, bright=200, dark=30):
+    """
+    Bright gasket with a dark elliptical hole
+    """
+    img = np.full(shape, bright, dtype=dtype)
+    cv2.ellipse(img, (CX, CY), (AX, AY), 0, 0, 360, dark, -1)
+    return img[..., None]
+
+
+@pytest.mark.parametrize("levels", [0, 1, 2])
+def test_ellipse(levels):
+    res = []
+    detector = HoleDetector(output=res.append, benabled=True, levels=levels)
+    detector.process(make_gasket())
+
+    assert len(res) == 1 and res[0]["found"]
+    assert res[0]["method"] == HoleDetector.METHOD_CONTOUR and res[0]["level"] == levels
+
+    # frame pixels independent of the pyramid level
+    tol = 1. + (1 << levels)
+    assert res[0]["x"] == pytest.approx(CX, abs=tol)
+    assert res[0]["y"] == pytest.approx(CY, abs=tol)
+    assert sorted([res[0]["width"], res[0]["height"]]) == pytest.approx([2 * AY, 2 * AX], abs=2 * tol)
+
+
+def test_16bit_color():
+    res = []
+    detector = HoleDetector(output=res.append, benabled=True)
+    img = np.repeat(make_gasket(dtype=np.uint16, bright=40000, dark=3000), 3, axis=2)
+    detector.process(img)
+
+    assert res[0]["found"]
+    assert res[0]["x"] == pytest.approx(CX, abs=5.)
+
+
+def test_cached():
+    res = []
+    detector = HoleDetector(output=res.append, benabled=True)
+    img = make_gasket()
+    detector.process(img)
+    detector.process(img.copy())
+    assert len(res) == 1
+
+    # a parameter change drops the cached result
+    detector.set_params(levels=1)
+    detector.process(img)
+    assert len(res) == 2
+
+
+def test_no_hole():
+    res = []
+    detector = HoleDetector(output=res.append, benabled=True)
+    detector.process(np.full((240, 320, 1), 100, dtype=np.uint8))
+    assert res[0]["found"] is False
+
+
+def test_disabled():
+    res = []
+    detector = HoleDetector(output=res.append)
+    detector.process(make_gasket())
+    assert res == []
+
+    detector.set_params(benabled=True)
+    detector.set_params(benabled=False)
+    assert res == [{}]
+    assert not detector.set_params(levels="x")
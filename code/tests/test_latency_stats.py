@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from app.worker.latency_stats import *
+
+
+def record(stats, t, convert=0.010, emit=0.001, process=0.002, setv=0.003, paint=0.004):
+    ts = [t]
+    for d in (convert, emit, process, setv, paint):
+        ts.append(ts[-1] + d)
+    stats.record(*ts)
+
+
+def test_empty():
+    res = LatencyStats().get_stats()
+    assert res == {"frames": 0, "window": 0, "rate": 0.}
+
+
+def test_stages():
+    stats = LatencyStats()
+    for i in range(10):
+        record(stats, i * 0.1)
+
+    res = stats.get_stats()
+    assert res["frames"] == 10 and res["window"] == 10
+    assert res["rate"] == pytest.approx(10.)
+    assert res["convert"]["p50"] == pytest.approx(10.)
+    assert res["emit"]["mean"] == pytest.approx(1.)
+    assert res["paint"]["p99"] == pytest.approx(4.)
+    assert res["total"]["p95"] == pytest.approx(20.)
+
+
+def test_percentiles():
+    stats = LatencyStats(window=200)
+    # convert latencies 1..100 ms
+    for i in range(100):
+        record(stats, i * 0.1, convert=(i + 1) / 1000.)
+
+    res = stats.get_stats()["convert"]
+    assert res["p50"] == pytest.approx(50.5)
+    assert res["p95"] == pytest.approx(95.05)
+    assert res["p99"] == pytest.approx(99.01)
+    assert res["mean"] == pytest.approx(50.5)
+
+
+def test_window():
+    stats = LatencyStats(window=4)
+    for i in range(4):
+        record(stats, i, convert=1.)
+    for i in range(4, 8):
+        record(stats, i, convert=0.002)
+
+    # only the last frames of the window
+    res = stats.get_stats()
+    assert res["frames"] == 8 and res["window"] == 4
+    assert res["convert"]["p99"] == pytest.approx(2.)
+    assert res["rate"] == pytest.approx(1.)
+
+
+def test_incomplete_and_reset():
+    stats = LatencyStats()
+    stats.record(None, 1., 1., 1., 1., 1.)
+    assert stats.get_stats()["frames"] == 0
+
+    record(stats, 0.)
+    stats.reset()
+    assert stats.get_stats()["window"] == 0
+    assert LatencyStats(window=1).window == LatencyStats.WINDOW
+
+
+def test_format():
+    stats = LatencyStats()
+    record(stats, 0.)
+    lines = stats.format_stats()
+    assert len(lines) == 1 + len(LatencyStats.STAGES)
+    assert lines[1].split()[0] == "convert:"
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from app.common.keys import *
+from app.worker.spot_detector import *
+
+SIGMA = 5.
+(CX, CY) = (40.3, 30.7)
+
+
+def make_spot(shape=(64, 96), amplitude=10000., background=100., dtype=np.uint16):
+    (ys, xs) = np.mgrid[0:shape[0], 0:shape[1]]
+    img = background + amplitude * np.exp(-((xs - CX) ** 2 + (ys - CY) ** 2) / (2. * SIGMA ** 2))
+    return np.rint(img).astype(dtype)[..., None]
+
+
+@pytest.mark.parametrize("t", [0.1, 0.3, 0.5, 0.8])
+def test_sigma_scale(t):
+    # second moment of a unit gaussian cut at t, sampled on a fine grid
+    (ys, xs) = np.mgrid[-6:6:1201j, -6:6:1201j]
+    v = np.maximum(np.exp(-(xs * xs + ys * ys) / 2.) - t, 0.)
+    sigma = np.sqrt((v * xs * xs).sum() / v.sum())
+    assert SpotDetector.get_sigma_scale(t) == pytest.approx(1. / sigma, rel=1e-3)
+
+
+def test_sigma_scale_no_threshold():
+    assert SpotDetector.get_sigma_scale(0.) == 1.
+
+
+@pytest.mark.parametrize("threshold", [0.2, 0.5])
+def test_centroid(threshold):
+    res = []
+    detector = SpotDetector(output=res.append, benabled=True, threshold=threshold)
+    detector.process(make_spot())
+
+    assert len(res) == 1 and res[0]["found"]
+    assert res[0]["x"] == pytest.approx(CX, abs=0.05)
+    assert res[0]["y"] == pytest.approx(CY, abs=0.05)
+    assert res[0]["fwhm_x"] == pytest.approx(SIGMA * SpotDetector.FWHM_SIGMA, rel=0.03)
+    assert res[0]["fwhm_y"] == pytest.approx(SIGMA * SpotDetector.FWHM_SIGMA, rel=0.03)
+    assert res[0]["background"] == pytest.approx(100, abs=1)
+    assert not res[0]["fit"]
+
+
+def test_gauss_fit():
+    res = []
+    detector = SpotDetector(output=res.append, benabled=True, bgauss=True)
+    detector.process(make_spot())
+
+    assert res[0]["fit"]
+    assert res[0]["x"] == pytest.approx(CX, abs=0.05)
+    assert res[0]["fwhm_x"] == pytest.approx(SIGMA * SpotDetector.FWHM_SIGMA, rel=0.02)
+    assert res[0]["intensity"] == pytest.approx(10000., rel=0.02)
+
+
+def test_roi_and_color():
+    res = []
+    detector = SpotDetector(output=res.append, benabled=True, roi=[20, 10, 40, 40], order=COLOR_ORDER_RGB)
+    img = np.repeat(make_spot(amplitude=200., background=10., dtype=np.uint8), 3, axis=2)
+    detector.process(img)
+
+    assert res[0]["found"] and res[0]["roi"] == [20, 10, 40, 40]
+    assert res[0]["x"] == pytest.approx(CX, abs=0.1)
+    assert res[0]["y"] == pytest.approx(CY, abs=0.1)
+
+
+def test_flat_frame():
+    res = []
+    detector = SpotDetector(output=res.append, benabled=True)
+    detector.process(np.full((16, 16, 1), 50, dtype=np.uint8))
+    assert res[0]["found"] is False
+
+
+def test_disabled():
+    res = []
+    detector = SpotDetector(output=res.append)
+    detector.process(make_spot())
+    assert res == []
+
+    # disabling withdraws the last result
+    detector.set_params(benabled=True)
+    detector.set_params(benabled=False)
+    assert res == [{}]
+
+
+def test_invalid_params():
+    detector = SpotDetector()
+    assert not detector.set_params(roi=[1, 2])
+    assert not detector.set_params(threshold="x")
+    assert detector.set_params(roi=[], threshold=2.)
+    assert detector.roi is None and detector.threshold == 0.95
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from app.worker.frame_pool import *
+from app.worker.view_converter import *
+
+SHAPE = (100, 200, 3)
+
+
+def test_full_frame():
+    converter = ViewConverter()
+    assert converter.get_view(SHAPE) is None
+
+    # magnification is left to Qt
+    converter.set_viewport(region=None, zoom=4.)
+    assert converter.get_view(SHAPE) is None
+
+
+def test_downscale():
+    converter = ViewConverter()
+    converter.set_viewport(region=None, zoom=0.5)
+    assert converter.get_view(SHAPE) == ([0, 0, 200, 100], (50, 100, 3))
+
+
+def test_region_margin():
+    converter = ViewConverter()
+    converter.set_viewport(region=[10.5, 20.2, 50., 30.], zoom=2.)
+    assert converter.get_view(SHAPE) == ([9, 19, 62, 52], (33, 53, 3))
+
+
+def test_region_clipped():
+    converter = ViewConverter()
+    converter.set_viewport(region=[-50, 90, 100, 50], zoom=1.)
+    assert converter.get_view(SHAPE) == ([0, 89, 51, 100], (11, 51, 3))
+
+    # a region outside of the frame keeps at least one pixel
+    converter.set_viewport(region=[500, 500, 10, 10], zoom=1.)
+    assert converter.get_view(SHAPE[:2]) == ([199, 99, 200, 100], (1, 1))
+
+
+def test_invalid_zoom():
+    converter = ViewConverter()
+    converter.set_viewport(region=None, zoom=0.)
+    assert converter.get_view(SHAPE) is None
+
+
+@pytest.mark.parametrize("channels", [1, 3])
+def test_process(channels):
+    frames = FramePool(size=1)
+    views = FramePool(size=1)
+
+    img = frames.acquire((100, 200, channels), np.uint8)
+    img.data[:] = 7
+    img.data[:, 100:] = 200
+    img.frame_id = 5
+
+    converter = ViewConverter()
+    converter.set_viewport(region=[100, 0, 100, 100], zoom=0.5)
+    res = converter.process(img, views)
+
+    assert res is not img and res.full is img
+    assert res.data.shape == (50, 50, channels)
+    assert res.view == [99, 0, 101, 100, 200, 100]
+    assert res.frame_id == 5
+    assert np.all(res.data[:, 1:] == 200)
+
+    # pool exhausted
+    assert converter.process(img, views) is None
+
+    res.release()
+    assert frames.get_in_use() == 0 and views.get_in_use() == 0
+
+
+def test_process_unchanged():
+    frames = FramePool(size=1)
+    img = frames.acquire(SHAPE, np.uint8)
+    assert ViewConverter().process(img, FramePool(size=1)) is img
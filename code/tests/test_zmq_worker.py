@@ -0,0 +1,19 @@
+import json
+import queue
+
+import numpy as np
+
+from app.worker.zmq_worker import ZmqProcess
+
+
+def test_dumps_numpy():
+    process = ZmqProcess("tcp://127.0.0.1:0", queue.Queue())
+    data = {"value": np.float32(1.5), "count": np.int64(3), "flag": np.bool_(True), "roi": np.arange(3),
+            "nested": {"p50": np.float64(2.)}}
+    assert json.loads(process.dumps(data)) == {"value": 1.5, "count": 3, "flag": True, "roi": [0, 1, 2],
+                                               "nested": {"p50": 2.}}
+
+
+def test_dumps_fault():
+    process = ZmqProcess("tcp://127.0.0.1:0", queue.Queue())
+    assert process.dumps({"object": object()}) == ZmqProcess.RESPONSE_FAULT
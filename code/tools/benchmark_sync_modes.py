@@ -0,0 +1,71 @@
+"""
+Benchmark of the synchronous acquisition modes - frames per second of the per frame generator and of the continuous stream
+Run from the code folder with a camera visible to Vimba:
+
+    python3 -m tools.benchmark_sync_modes --id DEV_1AB22C004C6D --frames 200
+"""
+from app.common.imports import *
+from app.worker.allied_camera import *
+from app.worker.frame_rate import *
+
+
+class BenchmarkFeedback(object):
+    """
+    Minimal feedback object counting frames delivered by the acquisition thread
+    """
+    def __init__(self):
+        self.frames = 0
+        self.tstart = None
+        self.tstop = None
+
+    def reportNewFrame(self, img):
+        img.release()
+        if self.tstart is None:
+            self.tstart = time.time()
+        self.tstop = time.time()
+        self.frames += 1
+
+    def get_frame_rate(self):
+        res = 0.
+        if self.tstart is not None and self.frames > 1 and self.tstop > self.tstart:
+            res = float(self.frames - 1) / (self.tstop - self.tstart)
+        return res
+
+
+def benchmark_sync_modes(camid, frame_count=100):
+    """
+    Compares the frame rate of the per frame generator with the continuous stream
+    :param camid: str() - camera ID
+    :param frame_count: int() - number of frames to acquire in each mode
+    :return: dict() - frame rate (Hz) per mode, frames/s gained by the continuous stream
+    """
+    res = {}
+    for (name, bstream) in (("single", False), ("stream", True)):
+        feedback = BenchmarkFeedback()
+        # benchmark measures the camera limit - no pacing on the camera or the host
+        th = ThreadCameraAllied(camid, feedback, queue.Queue(), frame_count=frame_count, bstream=bstream,
+                                frame_rate=FrameRateGovernor.RATE_MAX)
+        th.start()
+        th.join()
+
+        res[name] = feedback.get_frame_rate()
+        print("Mode ({}): {} frames at ({:.02f} Hz)".format(name, feedback.frames, res[name]))
+
+    res["gain"] = res["stream"] - res["single"]
+    if res["single"] > 0:
+        print("Continuous streaming gain: {:+.02f} frames/s (x{:.02f})".format(res["gain"], res["stream"] / res["single"]))
+    return res
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark of synchronous acquisition modes")
+    parser.add_argument('--id', required=True)
+    parser.add_argument('--frames', type=int, default=100)
+    params = parser.parse_args()
+
+    Tester.setDefaultLogging(logging.INFO)
+    Tester.setDefaultFileLogging(False)
+    benchmark_sync_modes(params.id, frame_count=params.frames)
+
+if __name__ == "__main__":
+    main()
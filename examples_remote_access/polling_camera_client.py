@@ -16,12 +16,22 @@ class CameraZMQClient(object):
 
     EXPOSURE = "Exposure"
     GAIN = "Gain"
+    FRAMERATE = "FrameRate"
+    BURST = "Burst"
+    AVERAGE = "Average"
+    SPOT = "Spot"
+    HOLE = "Hole"
+    ROI = "Roi"
+    BINNING = "Binning"
+    FOCUS = "Focus"
+    FRAME_META = "FrameMeta"
 
     # communication
     REQUEST_CMD = "cmd"
     REQUEST_READ = "read"
     REQUEST_CHANGE = "change"
     REQUEST_PARAMS = "parameters"
+    REQUEST_STATS = "stats"
 
     def __init__(self, zmqserver):
         self.server = zmqserver
@@ -41,7 +51,7 @@ class CameraZMQClient(object):
             self.handle_error()
             raise ValueError("ZMQ server format ({}) is invalid".format(self.server))
 
-    def send_data(self, data=None, breport=False, bread=False):
+    def send_data(self, data=None, breport=False, bread=False, bstats=False):
         """
         Sends data
         :param data:
@@ -50,13 +60,15 @@ class CameraZMQClient(object):
         if self.is_error():
             return
 
-        if not isinstance(data, dict) and not bread:
+        if not isinstance(data, dict) and not bread and not bstats:
             return
 
         if data is not None:
             packet = self.prep_packet(data)
         elif bread:
             packet = self.prep_read()
+        elif bstats:
+            packet = self.prep_stats()
         else:
             return
 
@@ -107,6 +119,13 @@ class CameraZMQClient(object):
         """
         self.send_data(bread=True, breport=breport)
 
+    def read_stats(self, breport=False):
+        """
+        Reads latency statistics of the displayed frames
+        :return:
+        """
+        self.send_data(bstats=True, breport=breport)
+
     def handle_error(self, msg=None):
         """
         Handles error
@@ -138,6 +157,13 @@ class CameraZMQClient(object):
         """
         return {self.REQUEST_CMD: self.REQUEST_READ}
 
+    def prep_stats(self):
+        """
+        Prepares a packet to read out latency statistics
+        :return:
+        """
+        return {self.REQUEST_CMD: self.REQUEST_STATS}
+
 def main():
     z = CameraZMQClient("tcp://131.169.45.56:5555")
     z.read_data(breport=True)